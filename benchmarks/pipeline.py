@@ -0,0 +1,231 @@
+"""
+Benchmark of the scrape-and-format pipeline on synthetic venues of 10 to 1M records,
+served by a local fake dblp server with configurable latency:
+
+- scrape: Scraper.scrape_entries_and_bibtex (dblp API pages and bulk bibtex export)
+- generate: Scraper.generate_bibtex_string
+- cache_load_jsonl and cache_load_sqlite: loading a bibtex cache and looking up all records
+
+Each benchmark and size runs in a fresh process, which reports its runtime and its peak memory
+(resident set size) before and after the measured step. Results are written as JSON.
+
+python -m benchmarks.pipeline --sizes 10 1000 100000 --latency 0.01 --output benchmark_results.json
+"""
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from json import dump, dumps
+from multiprocessing import get_context
+from os.path import exists, sep
+from platform import platform, python_version
+from resource import getrusage, RUSAGE_SELF
+from shutil import rmtree
+from subprocess import run
+from sys import platform as sys_platform
+from tempfile import mkdtemp
+from time import perf_counter
+
+from scripts.dblp.bibtex_cache import open_bibtex_cache
+from scripts.scraper import Scraper
+from tests.fake_dblp_server import FakeDblpServer
+from utils.rate_limiter import RateLimiter
+
+BENCHMARKS = ["scrape", "generate", "cache_load_jsonl", "cache_load_sqlite"]
+
+
+def generate_dataset(size, venue="bench", year=2023):
+    """
+    Generate a synthetic venue and year of one proceedings and size - 1 papers,
+    shaped like the entries of the dblp API and the bibtex of dblp.
+
+    Args:
+        size: The number of records.
+        venue: The name of the venue.
+        year: The year of the venue.
+    Returns:
+        A tuple of entry and bibtex lists.
+    """
+    year = str(year)
+    booktitle = "Proceedings of the " + venue.upper() + " Benchmark Symposium, Leipzig, Germany, " + year
+    entry_list = [{"info":{"authors":{"author":[{"@pid":"99/1", "text":"Jack Dö"}]},
+                           "title":booktitle + ".", "venue":venue.upper(), "publisher":"ACM", "year":year,
+                           "type":"Editorship", "key":"conf/" + venue + "/" + year,
+                           "url":"https://dblp.org/rec/conf/" + venue + "/" + year}}]
+    bibtex_list = ["@proceedings{DBLP:conf/" + venue + "/" + year + ",\n" +
+                   "  editor       = {Jack D{\\\"{o}}},\n" +
+                   "  title        = {" + booktitle + "},\n" +
+                   "  publisher    = {{ACM}},\n" +
+                   "  year         = {" + year + "},\n" +
+                   "  biburl       = {https://dblp.org/rec/conf/" + venue + "/" + year + ".bib},\n" +
+                   "  bibsource    = {dblp computer science bibliography, https://dblp.org}\n}"]
+    for index in range(1, size):
+        key = "conf/" + venue + "/P" + str(index)
+        # A SMALL POOL OF FIRST AUTHORS, SO BIBKEYS NEED SUFFIXES AS IN REAL VENUES
+        first_author = ("Jürgen Müller", "Anna Smith", "Łukasz Nowak", "José García")[index % 4] + " " + str(index % 997)
+        authors = [{"@pid":str(index % 997) + "/" + str(index % 4), "text":first_author},
+                   {"@pid":str(index) + "/1", "text":"Author " + str(index)}]
+        entry_list.append({"info":{"authors":{"author":authors},
+                                   "title":"Synthetic Paper Number " + str(index) + ".", "venue":venue.upper(),
+                                   "pages":str(index) + "-" + str(index + 9), "year":year,
+                                   "type":"Conference and Workshop Papers", "key":key,
+                                   "doi":"10.1234/" + str(index), "ee":"https://doi.org/10.1234/" + str(index),
+                                   "url":"https://dblp.org/rec/" + key}})
+        bibtex_list.append("@inproceedings{DBLP:" + key + ",\n" +
+                           "  author       = {" + " and ".join(author["text"] for author in authors) + "},\n" +
+                           "  editor       = {Jack D{\\\"{o}}},\n" +
+                           "  title        = {Synthetic Paper Number " + str(index) + "},\n" +
+                           "  booktitle    = {" + booktitle + "},\n" +
+                           "  pages        = {" + str(index) + "--" + str(index + 9) + "},\n" +
+                           "  publisher    = {{ACM}},\n" +
+                           "  year         = {" + year + "},\n" +
+                           "  doi          = {10.1234/" + str(index) + "},\n" +
+                           "  biburl       = {https://dblp.org/rec/" + key + ".bib},\n" +
+                           "  bibsource    = {dblp computer science bibliography, https://dblp.org}\n}")
+    return entry_list, bibtex_list
+
+def get_dataset_urls(size, venue="bench", year=2023):
+    """
+    Get the URLs of the records of a synthetic venue and year, as generated by generate_dataset.
+
+    Args:
+        size: The number of records.
+        venue: The name of the venue.
+        year: The year of the venue.
+    Returns:
+        A list of URLs.
+    """
+    return (["https://dblp.org/rec/conf/" + venue + "/" + str(year)] +
+            ["https://dblp.org/rec/conf/" + venue + "/P" + str(index) for index in range(1, size)])
+
+def get_peak_memory():
+    """
+    Get the peak resident set size of the current process.
+
+    Returns:
+        The peak resident set size in bytes.
+    """
+    # ON LINUX, RU_MAXRSS KEEPS THE PEAK OF THE PARENT A PROCESS WAS SPAWNED FROM
+    if exists("/proc/self/status"):
+        with open("/proc/self/status") as file:
+            for line in file:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    return getrusage(RUSAGE_SELF).ru_maxrss * (1 if sys_platform == "darwin" else 1024)
+
+def write_bibtex_cache(cache_filepath, size):
+    """
+    Write the bibtex of a synthetic venue and year to a bibtex cache.
+
+    Args:
+        cache_filepath: The path of the bibtex cache (JSON lines or SQLite).
+        size: The number of records.
+    """
+    entry_list, bibtex_list = generate_dataset(size)
+    bibtex_cache = open_bibtex_cache(cache_filepath, batch_size=10000)
+    for entry, bibtex in zip(entry_list, bibtex_list):
+        bibtex_cache.put(entry["info"]["url"], bibtex + "\n\n\n")
+    bibtex_cache.close()
+
+def run_benchmark(benchmark, size, latency, cache_filepath=None):
+    """
+    Run one benchmark on a synthetic venue and year of the given size.
+
+    Args:
+        benchmark: The name of the benchmark (one of BENCHMARKS).
+        size: The number of records.
+        latency: Seconds each response of the fake dblp server is delayed by.
+        cache_filepath: The path of the bibtex cache loaded by the cache benchmarks,
+                        written by write_bibtex_cache.
+    Returns:
+        A dictionary of the results.
+    """
+    output_directory = mkdtemp()
+    try:
+        result = {"benchmark":benchmark, "records":size}
+        if benchmark in ["scrape", "generate"]:
+            entry_list, bibtex_list = generate_dataset(size)
+        if benchmark == "scrape":
+            with FakeDblpServer(entry_list, bibtex_list, latency=latency) as fake_dblp:
+                scraper = Scraper(venuetype="conf",
+                                  output_directory=output_directory,
+                                  bibtex_cache_filepath=output_directory + sep + "dblp_bibtex_cache.sqlite",
+                                  rate_limiter=RateLimiter(default_rate=None))
+                scraper.dblp_entry_scraper.api_endpoint = fake_dblp.api_endpoint
+                scraper.dblp_bibtex_scraper.bulk_endpoint = fake_dblp.api_endpoint
+                result["baseline_memory_bytes"] = get_peak_memory()
+                start = perf_counter()
+                scraped_entry_list, scraped_bibtex_list = scraper.scrape_entries_and_bibtex("bench", 2023)
+                result["seconds"] = perf_counter() - start
+                result["requests"] = len(fake_dblp.requests)
+                scraper.close()
+            assert len(scraped_entry_list) == size and all(scraped_bibtex_list)
+        elif benchmark == "generate":
+            scraper = Scraper(venuetype="conf",
+                              output_directory=output_directory,
+                              bibtex_cache_filepath=None)
+            result["baseline_memory_bytes"] = get_peak_memory()
+            start = perf_counter()
+            bibtex = scraper.generate_bibtex_string(entry_list, bibtex_list)
+            result["seconds"] = perf_counter() - start
+            result["bytes"] = len(bibtex.encode("utf-8"))
+            scraper.close()
+        else:
+            urls = get_dataset_urls(size)
+            result["baseline_memory_bytes"] = get_peak_memory()
+            start = perf_counter()
+            bibtex_cache = open_bibtex_cache(cache_filepath)
+            result["load_seconds"] = perf_counter() - start
+            assert all(bibtex_cache.get(url) for url in urls)
+            result["seconds"] = perf_counter() - start
+            bibtex_cache.close()
+        result["records_per_second"] = size / result["seconds"] if result["seconds"] else None
+        result["peak_memory_bytes"] = get_peak_memory()
+        return result
+    finally:
+        rmtree(output_directory)
+
+def get_version():
+    """
+    Get the git revision of the benchmarked code.
+
+    Returns:
+        The output of git describe, or None outside of a git repository.
+    """
+    process = run(["git", "describe", "--always", "--dirty"], capture_output=True, text=True)
+    return process.stdout.strip() if process.returncode == 0 else None
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Benchmark the scrape-and-format pipeline against a local fake dblp server.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1000, 100000],
+                        help="numbers of records of the synthetic venues (default: 10 1000 100000)")
+    parser.add_argument("--benchmarks", nargs="+", choices=BENCHMARKS, default=BENCHMARKS,
+                        help="benchmarks to run (default: all)")
+    parser.add_argument("--latency", type=float, default=0,
+                        help="seconds each response of the fake dblp server is delayed by (default: 0)")
+    parser.add_argument("--output", default="benchmark_results.json",
+                        help="path of the JSON results file (default: benchmark_results.json)")
+    args = parser.parse_args()
+
+    results = {"version":get_version(),
+               "timestamp":datetime.now(timezone.utc).isoformat(),
+               "python":python_version(),
+               "platform":platform(),
+               "latency":args.latency,
+               "results":[]}
+    cache_directory = mkdtemp()
+    for size in args.sizes:
+        for benchmark in args.benchmarks:
+            cache_filepath = None
+            if benchmark.startswith("cache_load"):
+                # THE CACHE IS WRITTEN BEFOREHAND, SO ONLY LOADING COUNTS TOWARDS PEAK MEMORY
+                cache_filepath = cache_directory + sep + str(size) + ("-dblp_bibtex_cache.txt" if benchmark == "cache_load_jsonl"
+                                                                      else "-dblp_bibtex_cache.sqlite")
+                write_bibtex_cache(cache_filepath, size)
+            # A FRESH PROCESS PER BENCHMARK, SO PEAK MEMORY IS NOT INHERITED FROM PREVIOUS RUNS
+            with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as executor:
+                result = executor.submit(run_benchmark, benchmark, size, args.latency, cache_filepath).result()
+            print(dumps(result))
+            results["results"].append(result)
+    rmtree(cache_directory)
+    with open(args.output, "w") as file:
+        dump(results, file, indent=4)
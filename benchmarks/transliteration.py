@@ -0,0 +1,55 @@
+"""
+Microbenchmark of the transliteration of author names to ASCII last names as used for
+IR-Anthology bibkeys: the character-wise conversion replaced by the translation table,
+the translation table without memoization, and the memoized conversion.
+
+python -m benchmarks.transliteration [number of names] [number of distinct names]
+"""
+from json import load
+from random import Random
+from sys import argv
+from time import perf_counter
+from unicodedata import normalize
+
+from utils.utils import convert_string_to_ascii, get_ascii_last_name
+
+
+def convert_string_to_ascii_characterwise(string):
+    return "".join([{"ä":"ae","ö":"oe","ü":"ue","ß":"ss"}.get(character,
+                                                             normalize("NFD", character).encode("ASCII", "ignore").decode("ASCII"))
+                    for character in string])
+
+def get_last_name(name, convert):
+    return convert("".join([c for c in name if (c.isalpha() or c == " ")]).strip().split(" ")[-1].lower())
+
+def get_names(number, distinct):
+    names = []
+    for filepath in ["tests/resources/sigir_1971_dblp.json", "tests/resources/PotthastGBBBFKN21_dblp.json",
+                     "tests/resources/mocked_dblp.json"]:
+        with open(filepath) as file:
+            for entry in load(file):
+                authors = entry["info"].get("authors", {"author":[]})["author"]
+                names += [author["text"] for author in (authors if type(authors) is list else [authors])]
+    random = Random(0)
+    # DISTINCT NAMES ARE VARIANTS OF THE NAMES OF THE TEST RESOURCES, RECURRING AT RANDOM
+    names = [names[index % len(names)] + " " + "".join(random.choice("äöüßéèçñøåłřșžÉÖabc") for _ in range(4))
+             for index in range(distinct)]
+    return [random.choice(names) for _ in range(number)]
+
+def run(name, function, names):
+    start = perf_counter()
+    last_names = [function(name) for name in names]
+    seconds = perf_counter() - start
+    print(name.ljust(36) + "{:8.3f} s {:10.0f} names/s".format(seconds, len(names) / seconds))
+    return last_names
+
+if __name__ == "__main__":
+    number = int(argv[1]) if len(argv) > 1 else 1000000
+    distinct = int(argv[2]) if len(argv) > 2 else 100000
+    names = get_names(number, distinct)
+    print(str(number) + " names, " + str(distinct) + " distinct")
+    expected = run("character-wise", lambda name: get_last_name(name, convert_string_to_ascii_characterwise), names)
+    assert run("translation table", lambda name: get_last_name(name, convert_string_to_ascii.__wrapped__), names) == expected
+    get_ascii_last_name.cache_clear()
+    assert run("translation table, memoized", get_ascii_last_name, names) == expected
+    assert run("translation table, memoized (warm)", get_ascii_last_name, names) == expected
@@ -1,45 +1,109 @@
-from os.path import dirname, exists, sep
-from os import makedirs
+from argparse import ArgumentParser
+from os import getpid, makedirs
+from os.path import sep
 from shutil import copyfile
-from json import load
+from socket import gethostname
+from sys import argv, executable
+from json import dumps, load
 
+from scripts.bibkey_registry import BibkeyRegistry
+from scripts.coordinator import Coordinator
+from scripts.dblp.api_cache import ApiCache
+from scripts.scheduler import Scheduler
 from scripts.scraper import Scraper
+from scripts.work_queue import WorkQueue
+from scripts.worker import Worker
+from utils.mirrors import MirrorRouter
+from utils.rate_limiter import RateLimiter
+from utils.session import Session
 
 
 if __name__ == "__main__":
 
+    parser = ArgumentParser(description="Scrape dblp and generate IR-Anthology bibtex files.")
+    parser.add_argument("--incremental", action="store_true",
+                        help="only scrape new or changed entries and rewrite affected bibtex files")
+    parser.add_argument("--resume", action="store_true",
+                        help="skip venues and years finished by previous runs and retry the others")
+    parser.add_argument("--dump", metavar="DBLP_XML",
+                        help="generate bibtex from a local dblp XML dump (dblp.xml or dblp.xml.gz) instead of the dblp API")
+    parser.add_argument("--coordinator", action="store_true",
+                        help="distribute venues and years to workers via the work queue and merge their results")
+    parser.add_argument("--worker", action="store_true",
+                        help="run venues and years leased from the work queue of a coordinator")
+    parser.add_argument("--local-workers", type=int, default=0,
+                        help="number of worker processes started by the coordinator on this machine (default: 0)")
+    parser.add_argument("--queue", metavar="WORK_QUEUE",
+                        help="path of the work queue (default: [output_directory]/[venuetype]/work_queue.sqlite)")
+    parser.add_argument("--worker-id",
+                        help="id of the worker, naming its output directory (default: [hostname]-[pid])")
+    parser.add_argument("--rate-share", type=int, default=1,
+                        help="number of workers sharing the rate limits of this machine (default: 1)")
+    args = parser.parse_args()
+
     venuetype = "conf"
     output_directory = "output"
     config_filepath = "config.json"
     bibtex_cache_filepath = None#"output/conf/dblp_bibtex_cache.txt"
+    workers = 4
+    format_workers = 1
+    group_entry_queries = True
+    timeout = 30
+    api_cache_ttl = 24 * 60 * 60
+    api_cache_force_refresh = False
+    adaptive_rate = True
+    export_metrics = True
 
     with open(config_filepath) as file:
         config = load(file)
         assert venuetype == config["venuetype"]
 
-    scraper = Scraper(venuetype, output_directory, bibtex_cache_filepath)
-
-    copyfile(config_filepath, scraper.logger.logger_directory + sep + "config.json")
+    queue_filepath = args.queue or sep.join([output_directory, venuetype, "work_queue.sqlite"])
+    worker_id = args.worker_id or gethostname() + "-" + str(getpid())
+    # WORKERS WRITE TO OUTPUT DIRECTORIES OF THEIR OWN, BUT SHARE THE BIBKEY REGISTRY
+    scraper_directory = sep.join([output_directory, "_workers", worker_id]) if args.worker else output_directory
+    bibkey_registry = BibkeyRegistry(sep.join([output_directory, venuetype, "bibkey_registry.sqlite"])) if args.worker else None
+    if args.worker:
+        bibtex_cache_filepath = sep.join([scraper_directory, venuetype, "dblp_bibtex_cache.sqlite"])
 
-    for venue, years in config["venues"].items():
+    makedirs(sep.join([scraper_directory, venuetype]), exist_ok=True)
+    if args.rate_share > 1:
+        rate_limiter = RateLimiter({host:rate / args.rate_share for host, rate in config.get("rate_limits", {}).items()},
+                                   default_rate=1/3 / args.rate_share, max_rate=1 / args.rate_share, adaptive=adaptive_rate)
+    else:
+        rate_limiter = RateLimiter(config.get("rate_limits", {}), adaptive=adaptive_rate)
+    session = Session(timeout=timeout,
+                      pool_size=workers,
+                      validators_filepath=sep.join([scraper_directory, venuetype, "dblp_http_validators.sqlite"]))
+    mirror_router = MirrorRouter(config["mirrors"]) if config.get("mirrors") else None
+    api_cache = ApiCache(sep.join([scraper_directory, venuetype, "dblp_api_cache.sqlite"]),
+                         ttl=api_cache_ttl,
+                         force_refresh=api_cache_force_refresh)
+    scraper = Scraper(venuetype, scraper_directory, bibtex_cache_filepath, rate_limiter=rate_limiter, session=session,
+                      api_cache=api_cache, mirror_router=mirror_router, bibkey_registry=bibkey_registry,
+                      format_workers=format_workers, group_entry_queries=group_entry_queries)
 
-        for year in years:
-
-            entry_list, bibtex_list = scraper.scrape_entries_and_bibtex(venue, year)
-            
-            if entry_list:
-                bibtex_string = scraper.generate_bibtex_string(entry_list, bibtex_list)
+    copyfile(config_filepath, scraper.logger.logger_directory + sep + "config.json")
 
-                bib_filepath = sep.join([output_directory,
-                                         venuetype,
-                                         venue,
-                                         str(year),
-                                         (venuetype + "-" + venue + "-" + str(year) + ".bib")])
+    if args.dump:
+        scraper.write_bibtex_from_dump(args.dump, config["venues"])
+    elif args.worker:
+        work_queue = WorkQueue(queue_filepath)
+        Worker(work_queue, scraper, worker_id, incremental=args.incremental).run()
+        work_queue.close()
+    elif args.coordinator:
+        work_queue = WorkQueue(queue_filepath)
+        worker_command = ([executable, argv[0], "--worker", "--queue", queue_filepath,
+                           "--rate-share", str(max(args.local_workers, 1))] +
+                          (["--incremental"] if args.incremental else []))
+        Coordinator(scraper, work_queue, worker_command, args.local_workers).run(config["venues"], args.resume)
+        work_queue.close()
+    else:
+        Scheduler(scraper, workers, args.incremental, args.resume).run(config["venues"])
 
-                if not exists(dirname(bib_filepath)):
-                    makedirs(dirname(bib_filepath))
-                if exists(bib_filepath):
-                    print("Bibtex file for venue " + venue + " and year " + str(year) + " already exists!")
-                else:
-                    with open(bib_filepath, "w") as file:
-                        file.write(bibtex_string)
+    scraper.logger.log("HTTP session summary: " + str(session.summary()))
+    scraper.logger.log("Metrics summary: " + dumps(scraper.logger.metrics.summary(), indent=4))
+    if export_metrics:
+        scraper.logger.metrics.write_prometheus(scraper.logger.logger_directory + sep + "metrics.prom")
+    # CLOSING THE SCRAPER CLOSES THE LOG FILES
+    scraper.close()
@@ -0,0 +1,13 @@
+from scripts.rebuild import rebuild
+
+
+if __name__ == "__main__":
+
+    venuetype = "conf"
+    output_directory = "output"
+    bibtex_cache_filepath = None#"output/conf/dblp_bibtex_cache.txt"
+    processes = None
+
+    for (venue, year), bib_filepath in rebuild(venuetype, output_directory, bibtex_cache_filepath, processes).items():
+        if not bib_filepath:
+            print("Bibtex file for venue " + venue + " and year " + str(year) + " could not be rebuilt!")
@@ -0,0 +1,108 @@
+import sqlite3
+from threading import Lock
+
+
+class BibkeyRegistry:
+    """
+    Registry of the IR-Anthology bibkeys of all dblp keys, stored in an SQLite database.
+    A dblp key is assigned its bibkey once and keeps it across runs, regardless of the
+    order of the entries returned by the dblp API. Bibkeys are unique across the whole
+    anthology: the first dblp key of a given base bibkey receives no suffix, the second
+    ends in -2, the third ends in -3, and so on.
+
+    Bibkeys are allocated in immediate transactions, so threads and processes sharing the
+    registry never allocate the same bibkey twice; bibkeys already assigned are looked up
+    by primary key without a write transaction. Bibkeys of many dblp keys are allocated
+    in one transaction with allocate_many.
+
+    Attributes:
+        filepath: The path to the database file.
+    """
+
+    def __init__(self, filepath):
+        self.filepath = filepath
+        self.lock = Lock()
+        self.connection = sqlite3.connect(filepath, timeout=60, check_same_thread=False, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute("CREATE TABLE IF NOT EXISTS bibkeys (dblp_key TEXT PRIMARY KEY, " +
+                                "bibkey TEXT NOT NULL UNIQUE)")
+        self.connection.execute("CREATE TABLE IF NOT EXISTS bases (base TEXT PRIMARY KEY, count INTEGER NOT NULL)")
+
+    def get(self, dblp_key):
+        """
+        Get the bibkey assigned to a dblp key.
+
+        Args:
+            dblp_key: The dblp key, e.g. 'conf/sigir/PotthastGBBBFKN21'.
+        Returns:
+            The IR-Anthology bibkey, or None if no bibkey is assigned to the dblp key.
+        """
+        with self.lock:
+            return self._get(dblp_key)
+
+    def allocate(self, dblp_key, base):
+        """
+        Get the bibkey assigned to a dblp key, assigning the next free bibkey of the
+        base bibkey if the dblp key has none yet.
+
+        Args:
+            dblp_key: The dblp key, e.g. 'conf/sigir/PotthastGBBBFKN21'.
+            base: The IR-Anthology bibkey without suffix, e.g. 'conf-sigir-2021-potthast'.
+        Returns:
+            The IR-Anthology bibkey of the dblp key.
+        """
+        return self.allocate_many([(dblp_key, base)])[0]
+
+    def allocate_many(self, dblp_keys_and_bases):
+        """
+        Get the bibkeys assigned to dblp keys, assigning bibkeys to dblp keys without one
+        in order, all in one transaction.
+
+        Args:
+            dblp_keys_and_bases: List of (dblp key, base bibkey) tuples.
+        Returns:
+            The list of IR-Anthology bibkeys of the dblp keys.
+        """
+        with self.lock:
+            bibkeys = [self._get(dblp_key) for dblp_key, _ in dblp_keys_and_bases]
+            if all(bibkeys):
+                return bibkeys
+            self.connection.execute("BEGIN IMMEDIATE")
+            try:
+                for index, (dblp_key, base) in enumerate(dblp_keys_and_bases):
+                    # ANOTHER PROCESS MAY HAVE ASSIGNED A BIBKEY SINCE THE LOOKUP
+                    bibkeys[index] = bibkeys[index] or self._get(dblp_key) or self._assign(dblp_key, base)
+                self.connection.execute("COMMIT")
+            except:
+                self.connection.execute("ROLLBACK")
+                raise
+        return bibkeys
+
+    def __len__(self):
+        with self.lock:
+            return self.connection.execute("SELECT COUNT(*) FROM bibkeys").fetchone()[0]
+
+    def close(self):
+        """
+        Close the registry.
+        """
+        with self.lock:
+            self.connection.close()
+
+    def _get(self, dblp_key):
+        row = self.connection.execute("SELECT bibkey FROM bibkeys WHERE dblp_key = ?", (dblp_key,)).fetchone()
+        return row[0] if row else None
+
+    def _assign(self, dblp_key, base):
+        row = self.connection.execute("SELECT count FROM bases WHERE base = ?", (base,)).fetchone()
+        count = row[0] if row else 0
+        while True:
+            count += 1
+            bibkey = base if count == 1 else base + "-" + str(count)
+            # SKIP SUFFIXED BIBKEYS THAT CLASH WITH THE BIBKEY OF ANOTHER BASE
+            if not self.connection.execute("SELECT 1 FROM bibkeys WHERE bibkey = ?", (bibkey,)).fetchone():
+                break
+        self.connection.execute("INSERT INTO bibkeys VALUES (?, ?)", (dblp_key, bibkey))
+        self.connection.execute("INSERT OR REPLACE INTO bases VALUES (?, ?)", (base, count))
+        return bibkey
@@ -0,0 +1,223 @@
+from time import perf_counter
+
+from scripts.bibtex_record import BibtexRecord
+from utils.utils import get_ascii_last_name
+
+
+class BibtexFormatter:
+    """
+    Formatter of the bibtex entries of the IR-Anthology: adds the dblp bibkey, venue,
+    author and editor ids (and, where missing, authors and editors) to the bibtex of an
+    entry as provided by the dblp website.
+
+    Formatting an entry only depends on the entry (decoded from the dblp API JSON, see
+    Entry), its bibtex and the editor map of its
+    venue and year, so entries can be formatted in any order and in other processes
+    (see format_bibtex_records); the IR-Anthology bibkey is assigned afterwards by
+    replacing BIBKEY_PLACEHOLDER in the formatted entry.
+
+    Attributes:
+        venuetype: "conf" for conference or "journals" for journals.
+        bibtex_padding: Padding between bibtex entries.
+    """
+
+    BIBKEY_PLACEHOLDER = "\0"
+
+    def __init__(self, venuetype, bibtex_padding):
+        self.venuetype = venuetype
+        self.bibtex_padding = bibtex_padding
+
+    def format_record(self, entry, bibtex, editor_map):
+        """
+        Format the bibtex of an entry.
+
+        Persons missing from the entry are set on a new entry (see Entry.with_authors).
+
+        Args:
+            entry: The entry (see Entry).
+            bibtex: The bibtex string of the entry as provided by the dblp website.
+            editor_map: Dictionary of editor strings and dictionaries of editor id string
+                        and persons (tuple of (person id, name) tuples) of the editorships
+                        of the venue and year.
+        Returns:
+            A tuple of the formatted bibtex entry (with BIBKEY_PLACEHOLDER in place of the
+            IR-Anthology bibkey), the IR-Anthology bibkey without deduplication suffix, and
+            the list of messages to log.
+        """
+        record = BibtexRecord(bibtex)
+        bibtex_lines = record.lines
+        messages = []
+
+        dblp_bibkey = self._get_dblp_bibkey_from_entry(entry)
+        appended_lines = ["  dblpbibkey   = " + "{" + dblp_bibkey + "}"]
+        
+        venue_string = self._get_venue_string_from_entry(entry)
+        if venue_string:
+            appended_lines.append("  venue        = " + "{" + venue_string + "}")
+
+        editorship = entry.type == "Editorship"
+
+        # GET AUTHOR AND EDITOR STRING FROM BIBTEX
+        author = record.author is not None
+        author_string = record.author if author else ""
+        authorid = False
+        authorid_string = ""
+        editor = record.editor is not None
+        editor_string = record.editor if editor else ""
+        editorid = False
+        editorid_string = ""
+        entry_string = venue_string + " " + entry.year + " " + entry.url + ".html?view=bibtex"
+
+        # SET EDITOR AND EDITOR ID STRING
+        if editor:
+            if editor_string in editor_map:
+                editorid_string = editor_map[editor_string]["editorid_string"]
+                editorid = True
+            else:
+                editorid_string = "{ERROR: NO EDITORID}"
+                messages.append("No editorid for entry " + entry_string)
+        else:
+            editor_string = "{ERROR: NO EDITORS}"
+            messages.append("No editor for entry " + entry_string)
+            editorid_string = "{ERROR: NO EDITORID}"
+            messages.append("No editorid for entry " + entry_string)
+
+        # SET AUTHOR AND AUTHOR ID STRING
+        if author:
+            authorid_string = "{" + self._get_personid_string_from_entry(entry) + "}"
+            authorid = True
+        else:
+            if not editorship:
+                if editor:
+                    author_string = editor_string
+                    if editorid:
+                        authorid_string = editorid_string
+                        authorid = True
+                    else:
+                        authorid_string = "{ERROR: NO EDITORID}"
+                        messages.append("No authorid for entry " + entry_string)
+                else:
+                    author_string = "{ERROR: NO EDITORS}"
+                    messages.append("No author for entry " + entry_string)
+                    authorid_string = "{ERROR: NO EDITORID}"
+                    messages.append("No authorid for entry " + entry_string)
+
+        # HANDLE PERSON DATA OF THE ENTRY
+        if editorship:
+            if entry.authors is not None:
+                entry = entry.with_authors(None)
+        else:
+            if entry.authors is None:
+                if editor and editor_string in editor_map:
+                    entry = entry.with_authors(editor_map[editor_string]["persons"])
+                else:
+                    messages.append("No persons for entry " + entry_string + ". Trying to obtain persons from bibtex instead.")
+                    if editor:
+                        entry = entry.with_authors(tuple(("PERSONIDERROR", author_text.strip())
+                                                         for author_text in editor_string[1:-1].split(" and ")))
+                    else:
+                        messages.append("Unable to get persons from bibtex for entry " + entry_string)
+                        entry = entry.with_authors((("PERSONIDERROR", "PERSONTEXTERROR"),))
+
+        # EDITOR IS ADDED AFTER THE AUTHOR LINE (IF ANY), AUTHOR IS ADDED AS FIRST LINE
+        if not editor and editor_string:
+            editor_line = "  editor       = " + editor_string
+            bibtex_lines = (bibtex_lines[:1] + [editor_line] + bibtex_lines[1:]) if author else [editor_line] + bibtex_lines
+            editor = True
+        if not author and author_string:
+            bibtex_lines = ["  author       = " + author_string] + bibtex_lines
+            author = True
+        if author: 
+            appended_lines.append("  authorid     = " + authorid_string)
+        if editor:
+            appended_lines.append("  editorid     = " + editorid_string)
+
+        # REPLACE DBLP BIBKEY WITH PLACEHOLDER OF IR-ANTHOLOGY BIBKEY AND RENDER
+        return (record.render(record.header.replace(dblp_bibkey, self.BIBKEY_PLACEHOLDER),
+                              bibtex_lines + appended_lines,
+                              self.bibtex_padding),
+                self._get_ir_anthology_bibkey_from_entry(entry),
+                messages)
+
+    def _get_personid_string_from_entry(self, entry):
+        """
+        Generate author ID string from entry with the format
+        [ID-OF-FIRST-AUTHOR] and [ID-OF-SECOND-AUTHOR] and ...
+
+        Args:
+            entry: The entry (see Entry).
+        Returns:
+            String of author IDs, separated by " and ".
+        """
+        return " and ".join(person_id for person_id, _ in entry.authors or ())
+
+    def _get_venue_string_from_entry(self, entry):
+        """
+        Generate venue string from entry with the format
+        [FIRST-VENUE] and [SECOND-AUTHOR] and ...
+
+        Args:
+            entry: The entry (see Entry).
+        Returns:
+            String of venues, separated by " and ".
+        """
+        return " and ".join(entry.venues)
+
+    def _get_dblp_bibkey_from_entry(self, entry):
+        """
+        Generate dblp bibkey string string from entry as used in the bibtex
+        as provided by the dblp website. As entry as provided by the dblp API
+        does not contain the full dblp bibkey, "DBLP:" is prefixed.        
+
+        Args:
+            entry: The entry (see Entry).
+        Returns:
+            String representation of the dblp bibkey of this entry.
+        """
+        return "DBLP" + ":" + entry.key
+    
+    def _get_ir_anthology_bibkey_from_entry(self, entry):
+        """
+        Generate IR-Anthology bibkey from entry with the format
+        [VENUE]-[YEAR]-[ASCII-LAST-NAME-OF-FIRST-AUTHOR](-[index]
+
+        Args:
+            entry: The entry (see Entry).
+        Returns:
+            String representation of the IR-Anthology bibkey of this entry.
+        """
+        last_name_of_first_author = self._get_last_name_of_first_author_from_entry(entry)
+        return "-".join([{"conf":"conf","journals":"jrnl"}[self.venuetype],
+                         entry.key.split("/")[1].lower(),
+                         entry.year] +
+                        ([last_name_of_first_author] if last_name_of_first_author else []))                
+
+    def _get_last_name_of_first_author_from_entry(self, entry):
+        """
+        Get last name of first author of entry (ASCII formatted).
+
+        Args:
+            entry: The entry (see Entry).
+        Returns:
+            String representing the last name of the first author.
+        """
+        return get_ascii_last_name(entry.authors[0][1] if entry.authors else "")
+
+
+def format_bibtex_records(bibtex_formatter, editor_map, entries_and_bibtex):
+    """
+    Format the bibtex of a chunk of entries, e.g. in a worker process.
+
+    Args:
+        bibtex_formatter: The BibtexFormatter used.
+        editor_map: The editor map of the venue and year of the entries.
+        entries_and_bibtex: List of (entry, bibtex string) tuples (see Entry).
+    Returns:
+        A list of the results of BibtexFormatter.format_record, each extended by the
+        seconds spent formatting the entry.
+    """
+    results = []
+    for entry, bibtex in entries_and_bibtex:
+        start = perf_counter()
+        results.append(bibtex_formatter.format_record(entry, bibtex, editor_map) + (perf_counter() - start,))
+    return results
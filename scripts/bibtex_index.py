@@ -0,0 +1,185 @@
+from re import compile
+import sqlite3
+from threading import Lock
+
+
+class BibtexIndex:
+    """
+    Index of the formatted bibtex entries written to bibtex files, stored in an SQLite
+    database. Each entry is indexed by its IR-Anthology bibkey, dblp key, venue, year and
+    the person ids of its authors and editors, and located by bibtex file, byte offset
+    and byte length, so an entry is read with one seek instead of a scan of the files.
+
+    Attributes:
+        filepath: The path to the database file.
+    """
+
+    HEADER = compile(r"@\w+\{([^,]+),")
+    FIELD = compile(r"\n  (dblpbibkey|authorid|editorid) += \{([^\n]*)\},?(?=\n)")
+
+    def __init__(self, filepath):
+        self.filepath = filepath
+        self.lock = Lock()
+        self.connection = sqlite3.connect(filepath, timeout=60, check_same_thread=False)
+        with self.connection:
+            self.connection.execute("CREATE TABLE IF NOT EXISTS records (bibkey TEXT PRIMARY KEY, dblp_key TEXT, " +
+                                    "venue TEXT NOT NULL, year INTEGER NOT NULL, filepath TEXT NOT NULL, " +
+                                    "offset INTEGER NOT NULL, length INTEGER NOT NULL)")
+            self.connection.execute("CREATE TABLE IF NOT EXISTS persons (pid TEXT NOT NULL, bibkey TEXT NOT NULL, " +
+                                    "PRIMARY KEY (pid, bibkey))")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS records_dblp_key ON records (dblp_key)")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS records_venue_year ON records (venue, year)")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS records_filepath ON records (filepath)")
+
+    def parse(self, bibtex):
+        """
+        Get the fields of a formatted bibtex entry used for indexing.
+
+        Args:
+            bibtex: A formatted bibtex entry.
+        Returns:
+            A tuple of IR-Anthology bibkey, dblp key (or None) and list of person ids;
+            placeholders of missing person ids are skipped.
+        """
+        bibkey = self.HEADER.match(bibtex.lstrip()).group(1)
+        dblp_key = None
+        pids = []
+        for name, value in self.FIELD.findall(bibtex):
+            if name == "dblpbibkey":
+                dblp_key = value[len("DBLP:"):] if value.startswith("DBLP:") else value
+            else:
+                pids += [pid for pid in value.split(" and ")
+                         if pid and pid not in pids and "ERROR" not in pid]
+        return bibkey, dblp_key, pids
+
+    def add(self, venue, year, filepath, records):
+        """
+        Index the entries of a bibtex file, replacing all entries indexed for the file before.
+
+        Args:
+            venue: The name of the venue, e.g. 'sigir'.
+            year: The year of the conference or journal, e.g. 1971.
+            filepath: The path of the bibtex file.
+            records: Iterable of (bibtex, offset, length) tuples of the formatted bibtex entries
+                     of the file, with offset and length in bytes.
+        """
+        rows = []
+        persons = []
+        for bibtex, offset, length in records:
+            bibkey, dblp_key, pids = self.parse(bibtex)
+            rows.append((bibkey, dblp_key, venue, year, filepath, offset, length))
+            persons += [(pid, bibkey) for pid in pids]
+        with self.lock, self.connection:
+            self.connection.execute("DELETE FROM persons WHERE bibkey IN (SELECT bibkey FROM records WHERE filepath = ?)",
+                                    (filepath,))
+            self.connection.execute("DELETE FROM records WHERE filepath = ?", (filepath,))
+            self.connection.executemany("INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            self.connection.executemany("INSERT OR IGNORE INTO persons VALUES (?, ?)", persons)
+
+    def add_file(self, venue, year, filepath):
+        """
+        Index the entries of an existing bibtex file.
+
+        Args:
+            venue: The name of the venue, e.g. 'sigir'.
+            year: The year of the conference or journal, e.g. 1971.
+            filepath: The path of the bibtex file.
+        """
+        with open(filepath, "rb") as file:
+            content = file.read()
+        records = []
+        starts = [match.start() for match in compile(rb"(?m)^@").finditer(content)] + [len(content)]
+        for start, end in zip(starts, starts[1:]):
+            records.append((content[start:end].decode("utf-8"), start, end - start))
+        self.add(venue, year, filepath, records)
+
+    def locate(self, bibkey):
+        """
+        Locate an entry by its IR-Anthology bibkey.
+
+        Args:
+            bibkey: The IR-Anthology bibkey, e.g. 'conf-sigir-2021-potthast'.
+        Returns:
+            A tuple of bibtex filepath, byte offset and byte length, or None if the entry is not indexed.
+        """
+        with self.lock:
+            return self.connection.execute("SELECT filepath, offset, length FROM records WHERE bibkey = ?",
+                                           (bibkey,)).fetchone()
+
+    def get(self, bibkey):
+        """
+        Get an entry by its IR-Anthology bibkey.
+
+        Args:
+            bibkey: The IR-Anthology bibkey, e.g. 'conf-sigir-2021-potthast'.
+        Returns:
+            The formatted bibtex entry (including padding), or None if the entry is not indexed.
+        """
+        location = self.locate(bibkey)
+        return self.read(*location) if location else None
+
+    def get_by_dblp_key(self, dblp_key):
+        """
+        Get the entries of a dblp key.
+
+        Args:
+            dblp_key: The dblp key, e.g. 'conf/sigir/PotthastGBBBFKN21'.
+        Returns:
+            A list of formatted bibtex entries.
+        """
+        return self._get("SELECT filepath, offset, length FROM records WHERE dblp_key = ?", (dblp_key,))
+
+    def get_by_pid(self, pid):
+        """
+        Get the entries authored or edited by a person.
+
+        Args:
+            pid: The dblp person id, e.g. '87/6573'.
+        Returns:
+            A list of formatted bibtex entries, ordered by bibtex file and position.
+        """
+        return self._get("SELECT filepath, offset, length FROM records JOIN persons USING (bibkey) " +
+                         "WHERE pid = ? ORDER BY filepath, offset", (pid,))
+
+    def get_by_venue(self, venue, year=None):
+        """
+        Get the entries of a venue, optionally of one year only.
+
+        Args:
+            venue: The name of the venue, e.g. 'sigir'.
+            year: The year of the conference or journal, e.g. 1971 (optional).
+        Returns:
+            A list of formatted bibtex entries, ordered by year and position.
+        """
+        if year is None:
+            return self._get("SELECT filepath, offset, length FROM records WHERE venue = ? " +
+                             "ORDER BY year, offset", (venue,))
+        return self._get("SELECT filepath, offset, length FROM records WHERE venue = ? AND year = ? " +
+                         "ORDER BY offset", (venue, year))
+
+    def read(self, filepath, offset, length):
+        """
+        Read an entry from a bibtex file.
+
+        Args:
+            filepath: The path of the bibtex file.
+            offset: The byte offset of the entry.
+            length: The byte length of the entry.
+        Returns:
+            The formatted bibtex entry.
+        """
+        with open(filepath, "rb") as file:
+            file.seek(offset)
+            return file.read(length).decode("utf-8")
+
+    def close(self):
+        """
+        Close the index.
+        """
+        with self.lock:
+            self.connection.close()
+
+    def _get(self, query, parameters):
+        with self.lock:
+            locations = self.connection.execute(query, parameters).fetchall()
+        return [self.read(*location) for location in locations]
@@ -0,0 +1,71 @@
+from re import compile
+
+
+class BibtexRecord:
+    """
+    Bibtex record as provided by the dblp website, parsed once into its header line
+    (e.g. '@inproceedings{DBLP:conf/sigir/C71,'), its field lines and its closing line.
+    Fields spanning multiple lines are joined into one line.
+
+    Attributes:
+        header: The header line of the record.
+        lines: List of field lines of the record.
+        closing: The closing line of the record.
+        author: The author value (including braces) or None if the record has no author.
+        editor: The editor value (including braces) or None if the record has no editor.
+    """
+
+    __slots__ = ("header", "lines", "closing", "author", "editor")
+
+    CONTINUATION = "\n                  "
+    VALUE = compile(r"\{.*\}")
+
+    def __init__(self, bibtex):
+        bibtex_lines = bibtex.replace(self.CONTINUATION, " ").strip().split("\n")
+        self.header = bibtex_lines[0]
+        self.lines = bibtex_lines[1:-1]
+        self.closing = bibtex_lines[-1]
+        self.author = None
+        self.editor = None
+        for line in self.lines:
+            field = line.lstrip()
+            if field.startswith("author"):
+                match = self.VALUE.search(line)
+                if match:
+                    self.author = match.group()
+            if field.startswith("editor"):
+                match = self.VALUE.search(line)
+                if match:
+                    self.editor = match.group()
+
+    def render(self, header, lines, padding):
+        """
+        Render the record with a new header line and new field lines.
+
+        Args:
+            header: The header line.
+            lines: List of field lines.
+            padding: Padding appended to the end of the record.
+        Returns:
+            The bibtex entry.
+        """
+        return join_bibtex_lines([header] + lines + [self.closing], padding)
+
+
+def join_bibtex_lines(bibtex_lines, padding):
+    """
+    Concatenates a list of bibtex lines to a bibentry. Empty lines are
+    skipped, field lines except the last one are terminated by a comma.
+
+    Args:
+        bibtex_lines: List of bibtex lines (header, fields and closing line).
+        padding: Padding appended to the end of the bibentry.
+    Returns:
+        A bibtex entry.
+    """
+    lines = [bibtex_lines[0]]
+    lines += [line if line.endswith(",") else line + "," for line in bibtex_lines[1:-2] if line]
+    if bibtex_lines[-2]:
+        lines.append(bibtex_lines[-2])
+    lines.append(bibtex_lines[-1] + padding)
+    return "\n".join(lines)
@@ -0,0 +1,180 @@
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from os import makedirs, remove, replace
+from os.path import dirname, exists, sep
+from threading import Lock
+
+from scripts.bibtex_formatter import BibtexFormatter, format_bibtex_records
+from scripts.bibtex_record import BibtexRecord
+from scripts.dblp.entry import Entry
+
+
+class BibtexWriter(BibtexFormatter):
+    """
+    Writer generating the formatted bibtex entries of venues and years (as by BibtexFormatter)
+    and writing them to their bibtex files, with the IR-Anthology bibkeys assigned by the
+    bibkey registry. Besides the formatter, writing only needs the bibkey registry, a logger
+    and (optionally) the bibtex index, so bibtex files can be written without a scraper,
+    e.g. by the worker processes rebuilding bibtex files (see rebuild).
+
+    Attributes:
+        venuetype: "conf" for conference or "journals" for journals.
+        output_directory: The directory of the bibtex files (output_directory/venuetype).
+        bibtex_padding: Padding between bibtex entries.
+        logger: The logger used; any object with a log method and metrics.
+        bibkey_registry: The registry of the IR-Anthology bibkeys assigned to dblp keys.
+        bibtex_index: The index the entries of the bibtex files written are added to
+                      (optional; None if bibtex files are not indexed).
+        format_workers: The number of processes formatting the entries of large volumes (default: 1,
+                        i.e. entries are formatted in the writing process).
+        format_chunk_size: The number of entries formatted per chunk by a format worker.
+    """
+
+    def __init__(self, venuetype, output_directory, bibtex_padding, logger, bibkey_registry, bibtex_index=None,
+                 format_workers=1):
+        super().__init__(venuetype, bibtex_padding)
+        self.output_directory = output_directory
+        self.logger = logger
+        self.bibkey_registry = bibkey_registry
+        self.bibtex_index = bibtex_index
+        self.format_workers = format_workers
+        self.format_chunk_size = 1000
+        self.format_executor = None
+        self.format_executor_lock = Lock()
+
+    def generate_bibtex_records(self, entry_list, get_bibtex):
+        """
+        Generate formatted bibtex entries one by one from a list of entries as provided
+        by the dblp API and a function providing the bibtex of each entry as provided
+        and scraped from the dblp website.
+
+        The editor map is built in a first pass over the editorships. The entries are then
+        formatted in order, either one by one or, with more than one format worker and more
+        entries than fit into one chunk, in chunks of format_chunk_size entries fanned out
+        over a process pool (at most two chunks per worker in flight). In both cases, the
+        IR-Anthology bibkeys are assigned by the bibkey registry and the messages of each
+        entry are logged in the order of the entries, so the output is the same.
+
+        Bibtex strings are requested from get_bibtex when needed and are not kept in memory
+        (beyond the chunks in flight); only the editor map is kept across entries. Each entry
+        is decoded once into an Entry, which is formatted (and sent to the format workers)
+        instead of the entry-as-dictionary.
+
+        Args:
+            entry_list: List of entries-as-dictionaries.
+            get_bibtex: Function taking the index and entry-as-dictionary of an entry
+                        and returning its bibtex string.
+        Returns:
+            A generator of bibtex entries which have been formatted.
+        """
+        editor_map = {}
+        # GET EDITOR STRING AND MATCH WITH EDITOR ID STRING AND PERSONS JSON
+        for index, entry in enumerate(entry_list):
+            if entry["info"]["type"] == "Editorship":
+                editor = BibtexRecord(get_bibtex(index, entry)).editor
+                if editor:
+                    editorship = Entry.from_dict(entry)
+                    editor_map[editor] = {"editorid_string":"{" + self._get_personid_string_from_entry(editorship) + "}",
+                                          "persons":editorship.authors}
+        if editor_map == {}:
+            self.logger.log("No editors found.")
+
+        if self.format_workers > 1 and len(entry_list) > self.format_chunk_size:
+            chunks = self._format_records_in_parallel(entry_list, get_bibtex, editor_map)
+        else:
+            chunks = (format_bibtex_records(self, editor_map, [(Entry.from_dict(entry), get_bibtex(index, entry))])
+                      for index, entry in enumerate(entry_list))
+
+        start = 0
+        for results in chunks:
+            entries = entry_list[start:start + len(results)]
+            start += len(results)
+            ir_anthology_bibkeys = self.bibkey_registry.allocate_many([(entry["info"]["key"], result[1])
+                                                                       for entry, result in zip(entries, results)])
+            for (bibtex_record, _, messages, seconds), ir_anthology_bibkey in zip(results, ir_anthology_bibkeys):
+                for message in messages:
+                    self.logger.log(message)
+                self.logger.metrics.observe("format_bibtex_seconds", seconds)
+                yield bibtex_record.replace(self.BIBKEY_PLACEHOLDER, ir_anthology_bibkey)
+
+    def _format_records_in_parallel(self, entry_list, get_bibtex, editor_map):
+        """
+        Format entries in chunks in the format worker processes.
+
+        Args:
+            entry_list: List of entries-as-dictionaries.
+            get_bibtex: Function taking the index and entry-as-dictionary of an entry
+                        and returning its bibtex string.
+            editor_map: The editor map of the entries.
+        Returns:
+            A generator of the lists of results of format_bibtex_records of the chunks,
+            in the order of entry_list.
+        """
+        # VENUES AND YEARS WRITTEN BY SEVERAL THREADS SHARE ONE PROCESS POOL
+        with self.format_executor_lock:
+            if self.format_executor is None:
+                self.format_executor = ProcessPoolExecutor(max_workers=self.format_workers)
+        bibtex_formatter = BibtexFormatter(self.venuetype, self.bibtex_padding)
+        futures = deque()
+        for start in range(0, len(entry_list), self.format_chunk_size):
+            chunk = [(Entry.from_dict(entry), get_bibtex(index, entry))
+                     for index, entry in enumerate(entry_list[start:start + self.format_chunk_size], start)]
+            futures.append(self.format_executor.submit(format_bibtex_records, bibtex_formatter, editor_map, chunk))
+            if len(futures) >= 2 * self.format_workers:
+                yield futures.popleft().result()
+        while futures:
+            yield futures.popleft().result()
+
+    def get_bibtex_filepath(self, venue, year):
+        """
+        Get the path of the bibtex file of venue and year, i.e.
+        output_directory/venue/year/venuetype-venue-year.bib
+
+        Args:
+            venue: The name of the venue, e.g. 'sigir'.
+            year: The year of the conference or journal, e.g. 1971.
+        Returns:
+            The path of the bibtex file.
+        """
+        return sep.join([self.output_directory,
+                         venue,
+                         str(year),
+                         (self.venuetype + "-" + venue + "-" + str(year) + ".bib")])
+
+    def write_bibtex_file(self, venue, year, bibtex_records, overwrite=False):
+        """
+        Write the bibtex entries of venue and year to its bibtex file as they are generated.
+        The entries are written to a temporary file which replaces the bibtex file once all
+        entries are written, so the bibtex file is never partially written. The entries are
+        then added to the bibtex index (if any) with their byte offsets in the bibtex file.
+
+        Args:
+            venue: The name of the venue, e.g. 'sigir'.
+            year: The year of the conference or journal, e.g. 1971.
+            bibtex_records: Iterable of formatted bibtex entries.
+            overwrite: Whether to replace an existing bibtex file (default: False).
+        Returns:
+            The path of the bibtex file written, or None if the file already exists.
+        """
+        bib_filepath = self.get_bibtex_filepath(venue, year)
+        if not exists(dirname(bib_filepath)):
+            makedirs(dirname(bib_filepath), exist_ok=True)
+        if exists(bib_filepath) and not overwrite:
+            print("Bibtex file for venue " + venue + " and year " + str(year) + " already exists!")
+            return None
+        index_records = []
+        offset = 0
+        try:
+            with open(bib_filepath + ".tmp", "w", encoding="utf-8") as file:
+                for bibtex_record in bibtex_records:
+                    file.write(bibtex_record)
+                    length = len(bibtex_record.encode("utf-8"))
+                    index_records.append((bibtex_record, offset, length))
+                    offset += length
+        except:
+            remove(bib_filepath + ".tmp")
+            raise
+        replace(bib_filepath + ".tmp", bib_filepath)
+        if self.bibtex_index is not None:
+            self.bibtex_index.add(venue, year, bib_filepath, index_records)
+        return bib_filepath
@@ -0,0 +1,166 @@
+from os import makedirs, replace
+from os.path import dirname, exists, sep
+from shutil import copyfile, rmtree
+from subprocess import Popen
+from tempfile import mkdtemp
+from time import sleep
+
+from scripts.dblp.bibtex_cache import open_bibtex_cache
+from scripts.journal import Journal
+from scripts.work_queue import WorkQueue
+from utils.bibtex_cache_combiner import combine_bibtex_caches
+
+
+class Coordinator:
+    """
+    Coordinator distributing the scrape tasks of venues and years to workers (see Worker)
+    via a work queue, and merging the results of the workers into its output directory:
+    the bibtex files and stored entries of completed tasks are copied to where the scraper
+    of the coordinator would have written them (and the bibtex files are indexed), and the
+    bibtex caches of the workers are merged into the bibtex cache of the scraper.
+
+    Workers run on the same machine (started by the coordinator as local worker processes,
+    which are restarted if they crash) or on machines sharing the file system of the work
+    queue. The task of a crashed worker is leased to another worker once its lease expires.
+
+    Attributes:
+        scraper: The scraper of the coordinator.
+        work_queue: The work queue.
+        worker_command: The command starting a local worker process (e.g. main.py --worker),
+                        to which '--worker-id' and the id of the worker are appended.
+        local_workers: The number of local worker processes.
+        poll_seconds: The number of seconds between checks for completed tasks.
+    """
+
+    def __init__(self, scraper, work_queue, worker_command=None, local_workers=0, poll_seconds=5):
+        self.scraper = scraper
+        self.work_queue = work_queue
+        self.worker_command = worker_command
+        self.local_workers = local_workers
+        self.poll_seconds = poll_seconds
+        self.processes = {}
+
+    def run(self, venues, resume=False):
+        """
+        Submit the tasks of the given venues and years, wait for the workers to run them
+        and merge their results.
+
+        Args:
+            venues: Dictionary of venue and list-of-years key-value pairs,
+                    e.g. {"sigir":[1971],"www":[2021,2023]}.
+            resume: Whether to skip venues and years finished according to the journal
+                    of the scraper, e.g. by a previous run that failed.
+        Returns:
+            A dictionary of (venue, year) and bibtex filepath key-value pairs; the
+            filepath is None if no bibtex file was written for venue and year.
+            Venues and years skipped when resuming are not included.
+        """
+        jobs = [(venue, year) for venue, years in venues.items() for year in years
+                if not (resume and self.scraper.journal.is_finished(venue, year))]
+        self.work_queue.put(jobs)
+        results = {}
+        bibtex_cache_filepaths = []
+        drained = False
+        try:
+            while True:
+                drained = self.work_queue.is_drained()
+                for task_id, venue, year, result in self.work_queue.get_tasks(WorkQueue.DONE):
+                    results[(venue, year)] = self.merge_task(venue, year, result)
+                    if result["bibtex_cache_filepath"] not in bibtex_cache_filepaths:
+                        bibtex_cache_filepaths.append(result["bibtex_cache_filepath"])
+                    self.work_queue.mark_merged(task_id)
+                if drained:
+                    break
+                self._supervise_local_workers()
+                sleep(self.poll_seconds)
+        finally:
+            # WORKERS EXIT ONCE THE QUEUE IS DRAINED, OTHERWISE THE COORDINATOR FAILED
+            self._stop_local_workers(terminate=not drained)
+        for task_id, venue, year, _ in self.work_queue.get_tasks(WorkQueue.FAILED):
+            if (venue, year) in jobs:
+                self.scraper.logger.log("Task " + venue + " " + str(year) + " failed.")
+                self.scraper.journal.record(venue, year, Journal.FAILED)
+        self.merge_bibtex_caches(bibtex_cache_filepaths)
+        return {job:results.get(job) for job in jobs}
+
+    def merge_task(self, venue, year, result):
+        """
+        Copy the bibtex file and stored entries of a completed task to the output directory
+        of the scraper, index the bibtex file and record the task in the journal.
+
+        Args:
+            venue: The name of the venue, e.g. 'sigir'.
+            year: The year of the conference or journal, e.g. 1971.
+            result: The result of the task (see Worker.run_task).
+        Returns:
+            The path of the bibtex file, or None if no bibtex file was written.
+        """
+        if result["entries_filepath"]:
+            self._copy(result["entries_filepath"], self.scraper.entry_store.get_filepath(venue, year))
+        if not result["bib_filepath"]:
+            self.scraper.journal.record(venue, year, Journal.NO_ENTRIES)
+            return None
+        bib_filepath = self.scraper.get_bibtex_filepath(venue, year)
+        self._copy(result["bib_filepath"], bib_filepath)
+        self.scraper.bibtex_index.add_file(venue, year, bib_filepath)
+        self.scraper.journal.record(venue, year, Journal.FILE_WRITTEN)
+        return bib_filepath
+
+    def merge_bibtex_caches(self, bibtex_cache_filepaths):
+        """
+        Merge bibtex caches of workers (cache fragments) into the bibtex cache of the scraper.
+        Conflicting bibtex of the fragments is reported in the log directory
+        (bibtex_cache_conflicts.jsonl); bibtex of the fragments replaces differing cached bibtex.
+
+        Args:
+            bibtex_cache_filepaths: List of paths to the bibtex caches of the workers.
+        Returns:
+            The number of records added to or changed in the bibtex cache.
+        """
+        bibtex_cache_filepaths = [filepath for filepath in bibtex_cache_filepaths if filepath and exists(filepath)]
+        if not bibtex_cache_filepaths:
+            return 0
+        merge_directory = mkdtemp()
+        try:
+            merged_filepath = merge_directory + sep + "dblp_bibtex_cache.sqlite"
+            combine_bibtex_caches(bibtex_cache_filepaths, merged_filepath,
+                                  self.scraper.logger.logger_directory + sep + "bibtex_cache_conflicts.jsonl")
+            merged_cache = open_bibtex_cache(merged_filepath)
+            bibtex_cache = self.scraper.dblp_bibtex_scraper.bibtex_cache
+            count = 0
+            for url, bibtex in merged_cache.items():
+                if bibtex_cache.get(url) != bibtex:
+                    bibtex_cache.put(url, bibtex)
+                    count += 1
+            bibtex_cache.flush()
+            merged_cache.close()
+        finally:
+            rmtree(merge_directory)
+        self.scraper.logger.log(str(count) + " bibtex records merged from " + str(len(bibtex_cache_filepaths)) + " workers.")
+        return count
+
+    def _copy(self, source_filepath, filepath):
+        makedirs(dirname(filepath), exist_ok=True)
+        copyfile(source_filepath, filepath + ".tmp")
+        replace(filepath + ".tmp", filepath)
+
+    def _supervise_local_workers(self):
+        """
+        Start the local worker processes, restarting those which crashed.
+        """
+        if not self.worker_command:
+            return
+        for index in range(self.local_workers):
+            process = self.processes.get(index)
+            if process is None or (process.poll() is not None and process.returncode != 0):
+                if process is not None:
+                    self.scraper.logger.log("Local worker " + str(index) + " exited with code " +
+                                            str(process.returncode) + ", restarting.")
+                self.processes[index] = Popen(self.worker_command + ["--worker-id", "local-" + str(index)])
+
+    def _stop_local_workers(self, terminate):
+        for process in self.processes.values():
+            if terminate and process.poll() is None:
+                process.terminate()
+            process.wait()
+        self.processes = {}
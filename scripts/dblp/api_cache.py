@@ -0,0 +1,87 @@
+import json
+import sqlite3
+from threading import Lock
+from time import time
+from zlib import compress, decompress
+
+from utils.utils import loads_json
+
+
+class ApiCache:
+    """
+    Cache of the hits returned by the dblp API, stored in an SQLite database and keyed
+    by query and offset. Hits are stored as zlib-compressed compact JSON.
+
+    Attributes:
+        filepath: The path to the database file.
+        ttl: Number of seconds after which cached hits expire (None: never).
+        force_refresh: Whether to ignore cached hits (they are still updated).
+    """
+
+    def __init__(self, filepath, ttl=None, force_refresh=False):
+        self.filepath = filepath
+        self.ttl = ttl
+        self.force_refresh = force_refresh
+        self.lock = Lock()
+        self.connection = sqlite3.connect(filepath, check_same_thread=False)
+        self.connection.execute("CREATE TABLE IF NOT EXISTS hits (query TEXT NOT NULL, offset INTEGER NOT NULL, " +
+                                "fetched REAL NOT NULL, hits BLOB NOT NULL, PRIMARY KEY (query, offset))")
+        self.connection.commit()
+
+    def get(self, query, offset, expired=False):
+        """
+        Get the cached hits of a query and offset.
+
+        Args:
+            query: The query, e.g. 'streamid:conf/sigir:year:1971'.
+            offset: The offset of the first hit.
+            expired: Whether to get the cached hits even if they expired or force_refresh
+                     is set, e.g. to revalidate them with a conditional request (default: False).
+        Returns:
+            List of hits, or None if no hits are cached, the cached hits
+            expired or force_refresh is set.
+        """
+        if self.force_refresh and not expired:
+            return None
+        with self.lock:
+            row = self.connection.execute("SELECT fetched, hits FROM hits WHERE query = ? AND offset = ?",
+                                          (query, offset)).fetchone()
+        if not row or (not expired and self.ttl is not None and time() - row[0] > self.ttl):
+            return None
+        return loads_json(decompress(row[1]))
+
+    def contains(self, query, offset):
+        """
+        Check whether hits of a query and offset are cached, without decoding them.
+
+        Args:
+            query: The query, e.g. 'streamid:conf/sigir:year:1971'.
+            offset: The offset of the first hit.
+        Returns:
+            Whether get returns the cached hits.
+        """
+        if self.force_refresh:
+            return False
+        with self.lock:
+            row = self.connection.execute("SELECT fetched FROM hits WHERE query = ? AND offset = ?",
+                                          (query, offset)).fetchone()
+        return bool(row) and (self.ttl is None or time() - row[0] <= self.ttl)
+
+    def put(self, query, offset, hits):
+        """
+        Add the hits of a query and offset to the cache, replacing previously cached hits.
+
+        Args:
+            query: The query, e.g. 'streamid:conf/sigir:year:1971'.
+            offset: The offset of the first hit.
+            hits: List of hits.
+        """
+        with self.lock, self.connection:
+            self.connection.execute("INSERT OR REPLACE INTO hits (query, offset, fetched, hits) VALUES (?, ?, ?, ?)",
+                                    (query, offset, time(), compress(json.dumps(hits, separators=(",", ":")).encode("utf-8"))))
+
+    def close(self):
+        """
+        Close the cache.
+        """
+        self.connection.close()
@@ -0,0 +1,263 @@
+from abc import ABC, abstractmethod
+import json
+import sqlite3
+from os.path import exists
+from pathlib import Path
+from threading import Lock
+from zlib import compress, decompress
+
+
+class BibtexCache(ABC):
+    """
+    Base class of bibtex caches, mapping dblp URLs to bibtex strings.
+
+    Writes are buffered and written in batches of batch_size records;
+    flush() writes all pending records. Subclasses implement get(), items() and _write().
+
+    Attributes:
+        filepath: The path to the cache file.
+        batch_size: The number of records buffered before being written.
+    """
+
+    def __init__(self, filepath, batch_size=100):
+        self.filepath = filepath
+        self.batch_size = batch_size
+        self.pending = {}
+        self.lock = Lock()
+
+    def __contains__(self, url):
+        return self.get(url) is not None
+
+    def __getitem__(self, url):
+        bibtex = self.get(url)
+        if bibtex is None:
+            raise KeyError(url)
+        return bibtex
+
+    @abstractmethod
+    def get(self, url, default=None):
+        """
+        Get the bibtex of a URL.
+
+        Args:
+            url: The dblp URL of the entry.
+            default: The value returned if the URL is not cached.
+        Returns:
+            The bibtex string, or default if the URL is not cached.
+        """
+        raise NotImplementedError
+
+    def put(self, url, bibtex):
+        """
+        Add the bibtex of a URL to the cache, replacing any previous bibtex.
+
+        Args:
+            url: The dblp URL of the entry.
+            bibtex: The bibtex string.
+        """
+        with self.lock:
+            self.pending[url] = bibtex
+            if len(self.pending) >= self.batch_size:
+                self._write(self.pending)
+                self.pending = {}
+
+    def flush(self):
+        """
+        Write all pending records.
+        """
+        with self.lock:
+            if self.pending:
+                self._write(self.pending)
+                self.pending = {}
+
+    def close(self):
+        """
+        Write all pending records and close the cache.
+        """
+        self.flush()
+
+    @abstractmethod
+    def items(self):
+        """
+        Iterate over all cached records.
+
+        Returns:
+            An iterator of (url, bibtex) tuples.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def _write(self, records):
+        """
+        Write records to the cache file.
+
+        Args:
+            records: Dictionary of URL and bibtex key-value pairs.
+        """
+        raise NotImplementedError
+
+    def import_jsonl(self, filepath):
+        """
+        Import records from a JSON lines cache file.
+
+        Args:
+            filepath: The path to the JSON lines file; each line is a
+                      list of two elements, URL and bibtex string.
+        Returns:
+            The number of records imported.
+        """
+        count = 0
+        with open(filepath) as file:
+            for line in file:
+                try:
+                    url, bibtex = json.loads(line)
+                except json.decoder.JSONDecodeError:
+                    # partially written record of an interrupted run
+                    continue
+                self.put(url, bibtex)
+                count += 1
+        self.flush()
+        return count
+
+    def export_jsonl(self, filepath):
+        """
+        Export all records to a JSON lines cache file.
+
+        Args:
+            filepath: The path to the JSON lines file.
+        Returns:
+            The number of records exported.
+        """
+        self.flush()
+        count = 0
+        with open(filepath, "w") as file:
+            for url, bibtex in self.items():
+                file.write(json.dumps([url,bibtex]) + "\n")
+                count += 1
+        return count
+
+
+class JsonlBibtexCache(BibtexCache):
+    """
+    Bibtex cache held in memory and persisted to a JSON lines file, e.g.
+
+    ["https://dblp.org/rec/conf/sigir/C71", "@inproceedings{DBLP:conf/sigir/C71,\\n..."]
+
+    Attributes:
+        filepath: The path to the cache file.
+        batch_size: The number of records buffered before being written.
+        bibtex_cache: Dictionary of URL and bibtex key-value pairs.
+    """
+
+    def __init__(self, filepath, batch_size=100, load=True):
+        super().__init__(filepath, batch_size)
+        self.bibtex_cache = {}
+        if load and filepath and exists(filepath):
+            with open(filepath) as file:
+                for line in file:
+                    try:
+                        url, bibtex = json.loads(line)
+                    except json.decoder.JSONDecodeError:
+                        # partially written record of an interrupted run
+                        continue
+                    self.bibtex_cache[url] = bibtex
+
+    def __len__(self):
+        return len(self.bibtex_cache)
+
+    def get(self, url, default=None):
+        return self.bibtex_cache.get(url, default)
+
+    def put(self, url, bibtex):
+        self.bibtex_cache[url] = bibtex
+        super().put(url, bibtex)
+
+    def items(self):
+        return iter(list(self.bibtex_cache.items()))
+
+    def _write(self, records):
+        if self.filepath:
+            with open(self.filepath, "a") as file:
+                file.write("".join(json.dumps([url,bibtex]) + "\n" for url, bibtex in records.items()))
+
+
+class SqliteBibtexCache(BibtexCache):
+    """
+    Bibtex cache stored in an SQLite database with the URL as primary key;
+    bibtex strings are stored zlib-compressed. Records are looked up on demand,
+    so the cache is not loaded into memory.
+
+    Attributes:
+        filepath: The path to the database file.
+        batch_size: The number of records buffered before being written.
+        read_only: Whether the database is opened read-only, e.g. by processes only
+                   looking up records (default: False).
+    """
+
+    def __init__(self, filepath, batch_size=100, read_only=False):
+        super().__init__(filepath, batch_size)
+        self.read_only = read_only
+        if read_only:
+            self.connection = sqlite3.connect(Path(filepath).absolute().as_uri() + "?mode=ro", uri=True, check_same_thread=False)
+        else:
+            self.connection = sqlite3.connect(filepath, check_same_thread=False)
+            self.connection.execute("CREATE TABLE IF NOT EXISTS bibtex (url TEXT PRIMARY KEY, bibtex BLOB NOT NULL)")
+            self.connection.commit()
+
+    def __len__(self):
+        self.flush()
+        with self.lock:
+            return self.connection.execute("SELECT COUNT(*) FROM bibtex").fetchone()[0]
+
+    def get(self, url, default=None):
+        with self.lock:
+            if url in self.pending:
+                return self.pending[url]
+            row = self.connection.execute("SELECT bibtex FROM bibtex WHERE url = ?", (url,)).fetchone()
+        return decompress(row[0]).decode("utf-8") if row else default
+
+    def __contains__(self, url):
+        with self.lock:
+            if url in self.pending:
+                return True
+            return self.connection.execute("SELECT 1 FROM bibtex WHERE url = ?", (url,)).fetchone() is not None
+
+    def items(self):
+        self.flush()
+        connection = sqlite3.connect(self.filepath)
+        try:
+            rows = connection.execute("SELECT url, bibtex FROM bibtex ORDER BY url")
+            while True:
+                batch = rows.fetchmany(self.batch_size)
+                if not batch:
+                    break
+                for url, bibtex in batch:
+                    yield url, decompress(bibtex).decode("utf-8")
+        finally:
+            connection.close()
+
+    def close(self):
+        super().close()
+        self.connection.close()
+
+    def _write(self, records):
+        with self.connection:
+            self.connection.executemany("INSERT OR REPLACE INTO bibtex (url, bibtex) VALUES (?, ?)",
+                                        [(url, compress(bibtex.encode("utf-8"))) for url, bibtex in records.items()])
+
+
+def open_bibtex_cache(filepath, batch_size=100, load=True):
+    """
+    Open the bibtex cache stored at filepath; the backend is chosen by file
+    extension: '.sqlite' or '.db' for SqliteBibtexCache, JsonlBibtexCache otherwise.
+
+    Args:
+        filepath: The path to the cache file.
+        batch_size: The number of records buffered before being written.
+        load: Whether to load existing records of a JSON lines cache file.
+    Returns:
+        The bibtex cache.
+    """
+    if filepath and filepath.endswith((".sqlite", ".db")):
+        return SqliteBibtexCache(filepath, batch_size)
+    return JsonlBibtexCache(filepath, batch_size, load)
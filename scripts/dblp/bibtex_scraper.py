@@ -1,7 +1,9 @@
-import json
 from os.path import exists, sep
-from time import sleep
+from re import compile
 
+from tqdm import tqdm
+from scripts.dblp.bibtex_cache import open_bibtex_cache
+from utils.rate_limiter import RateLimiter
 from utils.utils import get
 
 
@@ -13,29 +15,45 @@ class BibtexScraper:
         venuetype: "conf" for conference or "journals" for journals.
         logger: The logger used.
         output_directory: The output directory for the purpose of storing bibtex cache.
-        bibtex_cache_filepath: The path to the file of previously scraped bibtex.
+        bibtex_cache_filepath: The path to the file of previously scraped bibtex; the cache
+                               backend is chosen by file extension ('.sqlite' or '.db'
+                               for SQLite, JSON lines otherwise).
         bibtex_cache: The cache of previously scraped bibtex.
         bibtex_padding: Padding between bibtex entries; usually '\n\n\n'.
+        bulk_endpoint: The dblp API endpoint URL used for bulk bibtex export.
+        bulk_format: The bibtex export format requested from the bulk endpoint.
+        bulk_batch_size: Maximum number of bibtex records per bulk request.
+        rate_limiter: The rate limiter shared by all requests to dblp.
+        session: The HTTP session used for requests to dblp (optional).
+        mirror_router: The router spreading requests to dblp across mirrors (optional).
     """
 
-    def __init__(self, venuetype, logger, output_directory, bibtex_cache_filepath, bibtex_padding):
+    BULK_RECORD_SEPARATOR = compile(r"\n(?=@)")
+    BULK_RECORD_KEY = compile(r"^@\w+\{DBLP:([^,\s]+),")
+
+    def __init__(self, venuetype, logger, output_directory, bibtex_cache_filepath, bibtex_padding, rate_limiter=None, session=None,
+                 mirror_router=None):
         self.venuetype = venuetype
         self.logger = logger
         self.output_directory = output_directory 
         self.bibtex_cache_filepath = bibtex_cache_filepath
-        self.bibtex_cache = {}
+        self.bibtex_cache = None
         self._load_bibtex_cache()
         self.bibtex_padding = bibtex_padding
+        self.bulk_endpoint = "https://dblp.org/search/publ/api"
+        self.bulk_format = "bib1"
+        self.bulk_batch_size = 1000
+        self.rate_limiter = rate_limiter if rate_limiter else RateLimiter()
+        self.session = session
+        self.mirror_router = mirror_router
 
     def _load_bibtex_cache(self):
         """
         Load bibtex cache from file.
         """
-        if self.bibtex_cache_filepath and exists(self.bibtex_cache_filepath):
-            with open(self.bibtex_cache_filepath) as file:
-                for line in file:
-                    url, bibtex = json.loads(line)
-                    self.bibtex_cache[url] = bibtex
+        if self.bibtex_cache_filepath and (exists(self.bibtex_cache_filepath) or
+                                           self.bibtex_cache_filepath.endswith((".sqlite", ".db"))):
+            self.bibtex_cache = open_bibtex_cache(self.bibtex_cache_filepath)
         else:
             
             self.bibtex_cache_filepath = self.output_directory + sep + "dblp_bibtex_cache.txt"
@@ -47,29 +65,156 @@ class BibtexScraper:
                     check == input("Bibtex will be appended to existing cache file. Are you sure? [y/n] ")
                     if check == "y":
                         print("Bibtex will be appended to cache - manually check for duplicate!")
+                        self.bibtex_cache = open_bibtex_cache(self.bibtex_cache_filepath, load=False)
                     else:
                         print("Loading existing bibtex cache file.")
                         self._load_bibtex_cache()
+            else:
+                self.bibtex_cache = open_bibtex_cache(self.bibtex_cache_filepath)
+
+    def _cache_bibtex(self, url, bibtex):
+        """
+        Add bibtex to the bibtex cache.
+
+        Args:
+            url: The dblp URL of the entry.
+            bibtex: The bibtex string (including padding).
+        """
+        self.bibtex_cache.put(url, bibtex)
 
-    def scrape_bibtex(self, entry):
+    def flush(self):
+        """
+        Write pending records of the bibtex cache to file.
+        """
+        self.bibtex_cache.flush()
+
+    def close(self):
+        """
+        Write pending records of the bibtex cache to file and close it.
+        """
+        self.bibtex_cache.close()
+
+    def get_cached_bibtex(self, entry):
+        """
+        Get the bibtex for a given entry from the bibtex cache.
+
+        Args:
+            entry: An entry-as-dictionary as provided by the dblp API.
+        Returns:
+            A bibtex string with three linebreaks added as padding to the end.
+        Throws:
+            KeyError if the bibtex of the entry is not cached.
+        """
+        return self.bibtex_cache[entry["info"]["url"]].strip() + self.bibtex_padding
+
+    def scrape_bibtex(self, entry, refresh=False):
         """
         Scrape the bibtex for a given entry from dblp.
 
-        Calls to the API require minimum of 3 second courtesy delay to avoid ERROR 429.
+        Calls to the API require minimum of 3 second courtesy delay to avoid ERROR 429,
+        which is enforced by the rate limiter. Cached bibtex scraped again is requested
+        conditionally, so unchanged bibtex is not downloaded again.
 
         Args:
             entry: An entry-as-dictionary as provided by the dblp API.
+            refresh: Whether to scrape the bibtex even if it is cached (default: False).
         Returns:
             A bibtex string with three linebreaks added as padding to the end.
         """
         try:
-            return self.bibtex_cache[entry["info"]["url"]].strip() + self.bibtex_padding
+            if refresh:
+                raise KeyError(entry["info"]["url"])
+            bibtex = self.get_cached_bibtex(entry)
+            self.logger.metrics.increment("bibtex_cache_lookups_total", result="hit")
+            return bibtex
         except KeyError:
-            response = get(self.logger, entry["info"]["url"] + ".bib")
+            self.logger.metrics.increment("bibtex_cache_lookups_total", result="miss")
+            with self.logger.metrics.span("scrape_bibtex"):
+                response = get(self.logger, entry["info"]["url"] + ".bib", rate_limiter=self.rate_limiter, session=self.session,
+                               mirror_router=self.mirror_router, cached_text=lambda: self.bibtex_cache.get(entry["info"]["url"]))
             bibtex = response.text.strip() + self.bibtex_padding
-            if self.bibtex_cache_filepath:
-                with open(self.bibtex_cache_filepath, "a") as file:
-                    file.write(json.dumps([entry["info"]["url"],bibtex]) + "\n")
-            sleep(3)
+            self._cache_bibtex(entry["info"]["url"], bibtex)
             return bibtex
 
+    def scrape_bibtex_bulk(self, venue, year, entry_list):
+        """
+        Scrape the bibtex for all entries of a given venue and year from dblp.
+
+        The bibtex is prefetched from the bulk export of dblp (see prefetch_bibtex_bulk);
+        entries missing from the bulk export are scraped one by one as a fallback.
+
+        Args:
+            venue: Name of the venue of the entries, e.g. 'sigir'.
+            year: Year of the entries, e.g. 1971.
+            entry_list: List of entries-as-dictionaries as provided by the dblp API.
+        Returns:
+            A list of bibtex strings (in the order of entry_list) with three linebreaks
+            added as padding to the end.
+        """
+        self.prefetch_bibtex_bulk(venue, year, entry_list)
+        missing_entries = [entry for entry in entry_list if entry["info"]["url"] not in self.bibtex_cache]
+        for entry in tqdm(missing_entries, total=len(missing_entries)):
+            self.scrape_bibtex(entry)
+        return [self.scrape_bibtex(entry) for entry in entry_list]
+
+    def prefetch_bibtex_bulk(self, venue, year, entry_list, offset=0):
+        """
+        Add the bibtex of all entries of a given venue and year to the bibtex cache.
+
+        Instead of requesting one bibtex record per entry, the bibtex of the whole
+        venue and year is exported from the dblp API in batches of up to
+        bulk_batch_size records. The export is split into records which are matched
+        to the entries via their dblp key and added to the bibtex cache. The export starts
+        at offset, e.g. the offset of a batch of hits of the dblp API whose bibtex is
+        prefetched (the export lists the records in the order of the hits).
+
+        Calls to the API require minimum of 3 second courtesy delay to avoid ERROR 429,
+        which is enforced by the rate limiter.
+
+        Args:
+            venue: Name of the venue of the entries, e.g. 'sigir'.
+            year: Year of the entries, e.g. 1971.
+            entry_list: List of entries-as-dictionaries as provided by the dblp API.
+            offset: The offset of the first record exported (default: 0).
+        Returns:
+            The number of entries missing from the bulk export.
+        """
+        missing_urls = {entry["info"]["key"]:entry["info"]["url"] for entry in entry_list
+                        if entry["info"]["url"] not in self.bibtex_cache}
+        if missing_urls:
+            payload = {"q": ("streamid:" + self.venuetype + sep + venue + ":" +
+                             "year" + ":" + str(year)),
+                       "format": self.bulk_format,
+                       "h": str(self.bulk_batch_size),
+                       "f": str(offset)}
+            while True:
+                with self.logger.metrics.span("scrape_bibtex_bulk"):
+                    response = get(self.logger, self.bulk_endpoint, payload, self.rate_limiter, self.session,
+                                   mirror_router=self.mirror_router)
+                records = self._split_bulk_bibtex(response.text)
+                for key, bibtex in records.items():
+                    if key in missing_urls:
+                        self._cache_bibtex(missing_urls.pop(key), bibtex.strip() + self.bibtex_padding)
+                self.logger.log(str(len(records)) + " bibtex records scraped from dblp API.")
+                if len(records) < self.bulk_batch_size or not missing_urls:
+                    break
+                payload["f"] = str(int(payload["f"]) + self.bulk_batch_size)
+        if missing_urls:
+            self.logger.log(str(len(missing_urls)) + " bibtex records missing from bulk export; scraping individually.")
+        return len(missing_urls)
+
+    def _split_bulk_bibtex(self, bulk_bibtex):
+        """
+        Split a bulk bibtex export into individual bibtex records.
+
+        Args:
+            bulk_bibtex: String of concatenated bibtex records as exported by dblp.
+        Returns:
+            A dictionary of dblp key (e.g. 'conf/sigir/C71') and bibtex string key-value pairs.
+        """
+        records = {}
+        for bibtex in self.BULK_RECORD_SEPARATOR.split(bulk_bibtex.strip()):
+            match = self.BULK_RECORD_KEY.match(bibtex)
+            if match:
+                records[match.group(1)] = bibtex.strip()
+        return records
@@ -0,0 +1,374 @@
+from datetime import date
+import gzip
+from html.entities import name2codepoint
+from os import close, remove
+from re import compile
+import sqlite3
+from tempfile import mkstemp
+from unicodedata import normalize
+from xml.etree.ElementTree import XMLParser
+
+
+class DumpScraper:
+    """
+    Scrape entries and bibtex from a local dblp XML dump (dblp.xml or dblp.xml.gz,
+    see https://dblp.org/xml/) instead of the dblp API.
+
+    The dump is parsed incrementally in a single pass; only the records of the
+    requested venues and the names of persons are kept (the latter in an SQLite
+    database on disk), so memory use does not grow with the size of the dump.
+    Entries are returned in the shape of the entries returned by the dblp API
+    (see EntryScraper), together with bibtex generated in the format of the
+    bibtex export of dblp (see BibtexScraper).
+
+    Attributes:
+        venuetype: "conf" for conference or "journals" for journals.
+        logger: The logger used.
+        dump_filepath: The path to the dblp XML dump; dumps ending in '.gz' are decompressed on the fly.
+        bibtex_padding: Padding between bibtex entries; usually '\n\n\n'.
+        persons_filepath: The path to the SQLite database of person names and their dblp person
+                          ids (optional); a temporary database is used if none is provided.
+        chunk_size: Number of bytes of the dump fed to the parser at once.
+    """
+
+    RECORD_TYPES = {"article":"Journal Articles",
+                    "inproceedings":"Conference and Workshop Papers",
+                    "proceedings":"Editorship",
+                    "incollection":"Parts in Books or Collections",
+                    "book":"Books and Theses",
+                    "phdthesis":"Books and Theses",
+                    "mastersthesis":"Books and Theses"}
+    BIBTEX_FIELDS = ("author", "editor", "title", "booktitle", "journal", "series", "volume", "number",
+                     "pages", "publisher", "school", "year", "url", "doi", "isbn", "timestamp", "biburl", "bibsource")
+    PROTECTED_FIELDS = ("title", "booktitle", "journal", "series", "publisher", "school")
+    WIDTH = 89
+    CONTINUATION = "\n                  "
+    DISAMBIGUATION = compile(r" \d{4}$")
+    PROTECTED_WORD = compile(r"(?<!\S)[\w-]+:?(?!\S)")
+    LATEX_ACCENTS = {"\u0300":"`", "\u0301":"'", "\u0302":"^", "\u0303":"~", "\u0304":"=", "\u0306":"u",
+                     "\u0307":".", "\u0308":"\"", "\u030a":"r", "\u030b":"H", "\u030c":"v", "\u0327":"c",
+                     "\u0328":"k"}
+    LATEX_CHARACTERS = {"ß":"{\\ss}", "ø":"{\\o}", "Ø":"{\\O}", "æ":"{\\ae}", "Æ":"{\\AE}", "œ":"{\\oe}",
+                        "Œ":"{\\OE}", "ł":"{\\l}", "Ł":"{\\L}", "ı":"{\\i}", "&":"\\&", "%":"\\%",
+                        "$":"\\$", "#":"\\#", "_":"\\_"}
+
+    def __init__(self, venuetype, logger, dump_filepath, bibtex_padding, persons_filepath=None, chunk_size=1<<20):
+        self.venuetype = venuetype
+        self.logger = logger
+        self.dump_filepath = dump_filepath
+        self.bibtex_padding = bibtex_padding
+        self.persons_filepath = persons_filepath
+        self.chunk_size = chunk_size
+
+    def scrape(self, venues):
+        """
+        Scrape the entries and bibtex of all given venues and years in one pass over the dump.
+
+        Entries are ordered like the entries returned by the dblp API, i.e. by dblp key
+        with the proceedings last.
+
+        Args:
+            venues: Dictionary of venue and list-of-years key-value pairs, e.g. {"sigir":[1971]}.
+        Returns:
+            A dictionary of (venue, year) and (entry list, bibtex list) key-value pairs,
+            including empty lists for venues and years without entries.
+        """
+        self.logger.log("\nScraping dblp XML dump " + self.dump_filepath + ".")
+        prefixes = {self.venuetype + "/" + venue + "/":venue for venue in venues}
+        years = {venue:{str(year):year for year in years} for venue, years in venues.items()}
+        records = {}
+        proceedings = {}
+
+        persons_filepath = self.persons_filepath
+        if persons_filepath is None:
+            file_descriptor, persons_filepath = mkstemp(suffix=".sqlite")
+            close(file_descriptor)
+        connection = sqlite3.connect(persons_filepath)
+        connection.execute("CREATE TABLE IF NOT EXISTS persons (name TEXT PRIMARY KEY, pid TEXT)")
+        persons = []
+
+        def is_relevant(key):
+            return key.startswith("homepages/") or key[:key.rfind("/") + 1] in prefixes
+
+        def handle_record(record):
+            tag, attributes, fields = record
+            key = attributes["key"]
+            if key.startswith("homepages/"):
+                persons.extend((value, key[len("homepages/"):]) for name, _, value in fields if name == "author")
+                if len(persons) >= 10000:
+                    connection.executemany("INSERT OR REPLACE INTO persons VALUES (?, ?)", persons)
+                    persons.clear()
+                return
+            if tag == "proceedings":
+                proceedings[key] = record
+            venue = prefixes[key[:key.rfind("/") + 1]]
+            year = next((value for name, _, value in fields if name == "year"), None)
+            if tag in self.RECORD_TYPES and year in years[venue]:
+                records.setdefault((venue, years[venue][year]), []).append(record)
+
+        try:
+            self._parse(is_relevant, handle_record)
+            connection.executemany("INSERT OR REPLACE INTO persons VALUES (?, ?)", persons)
+            connection.commit()
+
+            def get_pid(name, attributes):
+                if "pid" in attributes:
+                    return attributes["pid"]
+                row = connection.execute("SELECT pid FROM persons WHERE name = ?", (name,)).fetchone()
+                return row[0] if row else "PERSONIDERROR"
+
+            results = {}
+            for venue, venue_years in venues.items():
+                for year in venue_years:
+                    venue_records = sorted(records.pop((venue, year), []),
+                                           key=lambda record: (record[0] == "proceedings", record[1]["key"]))
+                    entry_list = [self._get_entry(record, get_pid) for record in venue_records]
+                    bibtex_list = [self._get_bibtex(record, proceedings.get(self._get_field(record, "crossref")))
+                                   for record in venue_records]
+                    self.logger.log(str(len(entry_list)) + " entries of " + venue + " " + str(year) +
+                                    " scraped from dblp XML dump.")
+                    results[(venue, year)] = (entry_list, bibtex_list)
+            return results
+        finally:
+            connection.close()
+            if self.persons_filepath is None:
+                remove(persons_filepath)
+
+    def _parse(self, is_relevant, handle_record):
+        """
+        Parse the dump incrementally and pass each relevant record to handle_record.
+
+        Args:
+            is_relevant: Function taking the dblp key of a record and returning whether it is relevant.
+            handle_record: Function taking a (tag, attributes, fields) tuple, where fields is a
+                           list of (name, attributes, text) tuples in the order of the dump.
+        """
+        parser = XMLParser(target=DumpTarget(is_relevant, handle_record))
+        # named character entities (e.g. '&uuml;') are declared in dblp.dtd, which is not read
+        parser.entity.update((name, chr(codepoint)) for name, codepoint in name2codepoint.items())
+        with (gzip.open(self.dump_filepath) if self.dump_filepath.endswith(".gz")
+              else open(self.dump_filepath, "rb")) as file:
+            chunk = file.read(self.chunk_size)
+            while chunk:
+                parser.feed(chunk)
+                chunk = file.read(self.chunk_size)
+        parser.close()
+
+    def _get_field(self, record, name):
+        """
+        Get the first value of a field of a record.
+
+        Args:
+            record: A (tag, attributes, fields) tuple.
+            name: The name of the field, e.g. 'title'.
+        Returns:
+            The value of the field, or None if the record has no such field.
+        """
+        if record is None:
+            return None
+        return next((value for field, _, value in record[2] if field == name), None)
+
+    def _get_entry(self, record, get_pid):
+        """
+        Get the entry of a record in the shape of the entries returned by the dblp API.
+
+        Args:
+            record: A (tag, attributes, fields) tuple.
+            get_pid: Function taking the name and attributes of a person and returning the dblp person id.
+        Returns:
+            An entry-as-dictionary.
+        """
+        tag, attributes, fields = record
+        info = {}
+        persons = [{"@pid":get_pid(value, person_attributes), "text":value} for name, person_attributes, value in fields
+                   if name == ("editor" if tag == "proceedings" else "author")]
+        if persons:
+            info["authors"] = {"author":persons if len(persons) > 1 else persons[0]}
+        info["title"] = self._get_field(record, "title")
+        venue = self._get_field(record, "journal") if tag == "article" else self._get_field(record, "booktitle")
+        if venue:
+            info["venue"] = venue
+        for name in ("volume", "number", "pages", "publisher", "year"):
+            value = self._get_field(record, name)
+            if value:
+                info[name] = value
+        if tag == "article" and attributes.get("publtype") == "informal":
+            info["type"] = "Informal and Other Publications"
+        else:
+            info["type"] = self.RECORD_TYPES[tag]
+        info["key"] = attributes["key"]
+        ee = self._get_field(record, "ee")
+        if ee:
+            if ee.startswith("https://doi.org/"):
+                info["doi"] = ee[len("https://doi.org/"):]
+            info["ee"] = ee
+        info["url"] = "https://dblp.org/rec/" + attributes["key"]
+        return {"info":info}
+
+    def _get_bibtex(self, record, proceedings=None):
+        """
+        Generate the bibtex of a record in the format of the bibtex export of dblp.
+
+        Editors, booktitle, series, volume and publisher are taken from the proceedings
+        the record refers to, if any. The timestamp is derived from the date the record
+        was last modified, since the dump does not contain the time of day.
+
+        Args:
+            record: A (tag, attributes, fields) tuple.
+            proceedings: The (tag, attributes, fields) tuple of the proceedings the
+                         record refers to via crossref (optional).
+        Returns:
+            A bibtex string with padding added to the end.
+        """
+        tag, attributes, fields = record
+        values = {}
+        authors = [value for name, _, value in fields if name == "author"]
+        editors = [value for name, _, value in fields if name == "editor"]
+        if proceedings is not None and not editors:
+            editors = [value for name, _, value in proceedings[2] if name == "editor"]
+        if authors:
+            values["author"] = authors
+        if editors:
+            values["editor"] = editors
+        for name in ("title", "booktitle", "journal", "series", "volume", "number", "pages", "publisher",
+                     "school", "year", "isbn"):
+            value = self._get_field(record, name)
+            if proceedings is not None and name in ("booktitle", "series", "volume", "publisher"):
+                value = self._get_field(proceedings, "title" if name == "booktitle" else name) or value
+            if value and not (name == "booktitle" and tag == "proceedings"):
+                values[name] = value
+        for name in ("title", "booktitle"):
+            if name in values and values[name].endswith("."):
+                values[name] = values[name][:-1]
+        if "pages" in values:
+            values["pages"] = values["pages"].replace("-", "--")
+        ee = self._get_field(record, "ee")
+        if ee:
+            values["url"] = ee
+            if ee.startswith("https://doi.org/"):
+                values["doi"] = ee[len("https://doi.org/"):]
+        if "mdate" in attributes:
+            values["timestamp"] = date.fromisoformat(attributes["mdate"]).strftime("%a, %d %b %Y 00:00:00 +0000")
+        values["biburl"] = "https://dblp.org/rec/" + attributes["key"] + ".bib"
+        values["bibsource"] = "dblp computer science bibliography, https://dblp.org"
+
+        lines = ["  " + name.ljust(13) + "= {" + self._format_value(name, values[name]) + "}"
+                 for name in self.BIBTEX_FIELDS if name in values]
+        return "@" + tag + "{DBLP:" + attributes["key"] + ",\n" + ",\n".join(lines) + "\n}" + self.bibtex_padding
+
+    def _format_value(self, name, value):
+        """
+        Format the value of a bibtex field like the bibtex export of dblp: persons are
+        written one per line without disambiguation number, capitalized words of titles
+        are protected by braces, non-ASCII characters are converted to LaTeX and long
+        values are wrapped.
+
+        Args:
+            name: The name of the field, e.g. 'title'.
+            value: The value of the field, or the list of persons for author and editor.
+        Returns:
+            The formatted value.
+        """
+        if name in ("author", "editor"):
+            return (" and" + self.CONTINUATION).join(self._convert_to_latex(self.DISAMBIGUATION.sub("", person))
+                                                     for person in value)
+        if name in self.PROTECTED_FIELDS:
+            value = self.PROTECTED_WORD.sub(self._protect_word, value)
+        value = self._convert_to_latex(value)
+        lines = []
+        line = "  " + name.ljust(13) + "= {"
+        for word in value.split(" "):
+            if len(line) + len(word) + 1 > self.WIDTH and line.strip() and not line.endswith("{"):
+                lines.append(line)
+                line = self.CONTINUATION[1:] + word
+            else:
+                line += word if line.endswith("{") or not line.strip() else " " + word
+        lines.append(line)
+        return "\n".join(lines)[len("  " + name.ljust(13) + "= {"):]
+
+    def _protect_word(self, match):
+        """
+        Protect a word of a title by braces if it contains capital letters after its first
+        letter or is a single capital letter other than the first word, e.g. 'ACM' or 'A'
+        in 'CUE: A Preprocessor' but not 'Anthology'.
+
+        Args:
+            match: The match of the word.
+        Returns:
+            The word, protected by braces if necessary.
+        """
+        word = match.group()
+        if match.start() > 0 and word.isupper() and len(word.rstrip(":")) == 1 or any(character.isupper() for character in word[1:]):
+            return "{" + word + "}"
+        return word
+
+    def _convert_to_latex(self, string):
+        """
+        Convert non-ASCII characters and special characters of a string to LaTeX,
+        e.g. 'ü' to '{\\"{u}}' and '&' to '\\&'.
+
+        Args:
+            string: A string.
+        Returns:
+            The converted string.
+        """
+        characters = []
+        for character in string:
+            if character in self.LATEX_CHARACTERS:
+                characters.append(self.LATEX_CHARACTERS[character])
+            elif ord(character) < 128:
+                characters.append(character)
+            else:
+                decomposed = normalize("NFD", character)
+                accent = self.LATEX_ACCENTS.get(decomposed[1:])
+                if accent and ord(decomposed[0]) < 128:
+                    base = "\\i" if decomposed[0] == "i" else decomposed[0]
+                    characters.append("{\\" + accent + "{" + base + "}}")
+                else:
+                    characters.append(character)
+        return "".join(characters)
+
+
+class DumpTarget:
+    """
+    Parser target collecting the records of the dblp XML dump.
+
+    Records (children of the root element) whose key is not relevant are skipped
+    without collecting their fields; markup within fields (e.g. '<i>' in titles)
+    is reduced to its text.
+
+    Attributes:
+        is_relevant: Function taking the dblp key of a record and returning whether it is relevant.
+        handle_record: Function taking a (tag, attributes, fields) tuple of a relevant record.
+    """
+
+    def __init__(self, is_relevant, handle_record):
+        self.is_relevant = is_relevant
+        self.handle_record = handle_record
+        self._depth = 0
+        self._record = None
+        self._field = None
+        self._text = []
+
+    def start(self, tag, attributes):
+        self._depth += 1
+        if self._depth == 2:
+            self._record = (tag, attributes, []) if self.is_relevant(attributes.get("key", "")) else None
+        elif self._depth == 3 and self._record is not None:
+            self._field = (tag, attributes)
+            self._text = []
+
+    def data(self, text):
+        if self._depth >= 3 and self._record is not None:
+            self._text.append(text)
+
+    def end(self, tag):
+        if self._depth == 3 and self._record is not None:
+            self._record[2].append(self._field + ("".join(self._text),))
+        elif self._depth == 2 and self._record is not None:
+            self.handle_record(self._record)
+            self._record = None
+        self._depth -= 1
+
+    def close(self):
+        pass
@@ -0,0 +1,77 @@
+from sys import intern
+
+
+class Entry:
+    """
+    Entry as provided by the dblp API, decoded once into the fields used to format its
+    bibtex. Persons are always a tuple of (person id, name) tuples and venues are always
+    a tuple, whether the dblp API returns one or many; person ids, names, venues, types
+    and years are interned, as they recur across the entries of the anthology.
+
+    Entries are immutable: changes to the persons of an entry produce a new entry that
+    shares all other fields (see with_authors).
+
+    Attributes:
+        key: The dblp key, e.g. 'conf/sigir/PotthastGBBBFKN21'.
+        type: The type, e.g. 'Conference and Workshop Papers' or 'Editorship'.
+        year: The year as string, e.g. '2021'.
+        url: The URL of the dblp record page.
+        venues: Tuple of venues, e.g. ('SIGIR',).
+        authors: Tuple of (person id, name) tuples of the authors (the editors of editorships),
+                 or None if the entry has no persons.
+    """
+
+    __slots__ = ("key", "type", "year", "url", "venues", "authors")
+
+    def __init__(self, key, type, year, url, venues, authors):
+        self.key = key
+        self.type = type
+        self.year = year
+        self.url = url
+        self.venues = venues
+        self.authors = authors
+
+    @classmethod
+    def from_dict(cls, entry):
+        """
+        Decode an entry-as-dictionary as provided by the dblp API.
+
+        Args:
+            entry: Entry-as-dictionary as provided by the dblp API.
+        Returns:
+            The entry.
+        """
+        info = entry["info"]
+        venues = info.get("venue", ())
+        venues = (intern(venues),) if type(venues) is str else tuple(intern(venue) for venue in venues)
+        authors = None
+        if "authors" in info:
+            persons = info["authors"]["author"]
+            if type(persons) is dict:
+                persons = [persons]
+            authors = tuple((intern(person["@pid"]), intern(person["text"])) for person in persons)
+        return cls(info["key"], intern(info["type"]), intern(info["year"]), info["url"], venues, authors)
+
+    def with_authors(self, authors):
+        """
+        Get a copy of the entry with other authors.
+
+        Args:
+            authors: Tuple of (person id, name) tuples, or None.
+        Returns:
+            The new entry.
+        """
+        return Entry(self.key, self.type, self.year, self.url, self.venues, authors)
+
+    def __eq__(self, other):
+        return isinstance(other, Entry) and all(getattr(self, slot) == getattr(other, slot) for slot in self.__slots__)
+
+    def __repr__(self):
+        return "Entry(" + ", ".join(slot + "=" + repr(getattr(self, slot)) for slot in self.__slots__) + ")"
+
+    def __getstate__(self):
+        return tuple(getattr(self, slot) for slot in self.__slots__)
+
+    def __setstate__(self, state):
+        for slot, value in zip(self.__slots__, state):
+            setattr(self, slot, value)
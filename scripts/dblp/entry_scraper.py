@@ -1,8 +1,10 @@
+from concurrent.futures import Future
 import json
 from os.path import sep
-from time import sleep
+from threading import Lock
 
-from utils.utils import get
+from utils.rate_limiter import RateLimiter
+from utils.utils import get, loads_json
 
 
 class EntryScraper:
@@ -13,60 +15,255 @@ class EntryScraper:
         venuetype: "conf" for conference or "journals" for journals.
         logger: The logger used.
         api_endpoint: The dblp API endpoint URL.
+        rate_limiter: The rate limiter shared by all requests to dblp.
+        session: The HTTP session used for requests to dblp (optional).
+        api_cache: The cache of hits returned by the dblp API (optional).
+        mirror_router: The router spreading requests to dblp across mirrors (optional);
+                       URLs of hits are rewritten to the canonical mirror.
+        query_planner: The planner grouping the venues and years planned to be scraped into
+                       combined queries (optional, see plan).
     """
 
-    def __init__(self, venuetype, logger):
+    def __init__(self, venuetype, logger, rate_limiter=None, session=None, api_cache=None, mirror_router=None):
         self.venuetype = venuetype  
         self.logger = logger
+        self.rate_limiter = rate_limiter if rate_limiter else RateLimiter()
+        self.session = session
+        self.api_cache = api_cache
+        self.mirror_router = mirror_router
         self.api_endpoint = "https://dblp.org/search/publ/api"
+        self.query_planner = None
+        self.planned_jobs = []
+        self.prefetched = {}
+        self.plan_lock = Lock()
 
-    def scrape_entries(self, venue, year):
+    def plan(self, jobs, query_planner):
+        """
+        Plan to scrape the given venues and years, so that scraping a venue and year scrapes
+        the entries of other planned venues and years with few entries in the same query
+        (grouped by the query planner), as long as their hits are not cached. The combined
+        hits are partitioned into the entries of each venue and year, which are kept until
+        their venue and year is scraped and cached as if scraped one by one.
+
+        The other venues and years of a group are reserved (as futures of their entries in
+        prefetched) before the combined query is sent, so scraping one of them waits for the
+        combined query only, and scraping venues and years outside the group does not wait.
+        If the combined query fails, the other venues and years are scraped one by one.
+
+        Args:
+            jobs: List of (venue, year) tuples, in the order they are scraped.
+            query_planner: The query planner (see QueryPlanner).
+        """
+        with self.plan_lock:
+            self.query_planner = query_planner
+            self.planned_jobs = [(venue, year) for venue, year in jobs if year is not None]
+            self.prefetched = {}
+
+    def scrape_entries(self, venue, year, refresh=False):
         """
         Scrape all papers published at a given venue and in a given year from dblp.
 
-        Calls to the API require minimum of 3 second courtesy delay to avoid ERROR 429.
+        Calls to the API require minimum of 3 second courtesy delay to avoid ERROR 429,
+        which is enforced by the rate limiter.
         
         Args:
             venue: Name of the venue for which entries shall be scraped.
             year: Year for which entries shall be scraped (optional).
+            refresh: Whether to bypass the API cache (default: False).
         Returns:
             A list of entries as dictionaries representing publications of venue and year provided.
         """
-        
+        return [entry for _, entry_batch in self.scrape_entry_batches(venue, year, refresh) for entry in entry_batch]
+
+    def scrape_entry_batches(self, venue, year, refresh=False):
+        """
+        Scrape all papers published at a given venue and in a given year from dblp,
+        yielding the entries of each batch of hits as soon as it is scraped, so the
+        entries of a batch can be processed while the next batch is scraped.
+
+        Args:
+            venue: Name of the venue for which entries shall be scraped.
+            year: Year for which entries shall be scraped (optional).
+            refresh: Whether to bypass the API cache (default: False).
+        Returns:
+            A generator of (offset, list of entries) tuples, where offset is the offset of
+            the batch in the hits of venue and year; entries scraped with a combined query
+            (see plan) are yielded as one batch with offset 0.
+        """
+        if self.query_planner:
+            with self.plan_lock:
+                future = self.prefetched.pop((venue, year), None)
+                futures = self._reserve_group(venue, year, refresh) if future is None else {}
+            entry_list = None
+            if futures:
+                # THE COMBINED QUERY IS SENT WITHOUT HOLDING THE LOCK
+                try:
+                    entry_lists = self._scrape_group(list(futures), refresh)
+                except:
+                    for job_future in futures.values():
+                        if job_future:
+                            job_future.set_result(None)
+                    raise
+                for job, job_future in futures.items():
+                    if job_future:
+                        job_future.set_result(entry_lists[job])
+                entry_list = entry_lists[(venue, year)]
+            elif future:
+                # NONE IF THE COMBINED QUERY FAILED
+                entry_list = future.result()
+            if entry_list is not None:
+                yield 0, entry_list
+                return
+
         self.logger.log("\nScraping venue " + venue + " " + str(year) + ".")
         
-        payload = {"q": ("streamid:" + self.venuetype + sep + venue + ":" +
-                         "year" + ":" + str(year)),
+        payload = {"q": self._get_query(venue, year),
                    "format": "json",
                    "h": "1000",
                    "f": "0"}
         
-        entry_list = []
-        
-        while len(entry_list) % 1000 == 0 and not (len(entry_list) == 0 and payload["f"] != "0"):
-            sleep(3)
-            entry_list += self._scrape_entry_batch(payload)
-            self.logger.log(str(len(entry_list)) + " entries scraped from dblp API.")
+        count = 0
+        entry_count = 0
+        while True:
+            with self.logger.metrics.span("scrape_entries"):
+                hits = self._scrape_entry_batch(payload, refresh)
+            count += len(hits)
+            self.logger.log(str(count) + " entries scraped from dblp API.")
+            entry_list = [entry for entry in hits if entry["info"]["key"].startswith(self.venuetype + sep + venue)]
+            entry_count += len(entry_list)
+            yield int(payload["f"]), entry_list
+            # A BATCH SHORT OF 1000 HITS IS THE LAST ONE (ALSO IF THE NUMBER OF ENTRIES IS A MULTIPLE OF 1000)
+            if len(hits) < 1000:
+                break
             payload["f"] = str(int(payload["f"]) + 1000)
-            
-        return [entry for entry in entry_list if entry["info"]["key"].startswith(self.venuetype + sep + venue)]
 
-    def _scrape_entry_batch(self, payload):
+        if self.query_planner:
+            with self.plan_lock:
+                self.query_planner.record(venue, year, entry_count)
+
+    def _reserve_group(self, venue, year, refresh=False):
+        """
+        Form the group of a planned venue and year and reserve the other venues and years
+        of the group, removing them from the planned venues and years and adding futures
+        of their entries to prefetched. Must be called holding plan_lock.
+
+        Args:
+            venue: Name of the venue to scrape first.
+            year: Year of the venue to scrape first.
+            refresh: Whether to bypass the API cache (default: False).
+        Returns:
+            A dictionary of (venue, year) and future key-value pairs of the group, starting
+            with venue and year (without future), or an empty dictionary if venue and year
+            is not scraped with a combined query.
+        """
+        if (venue, year) not in self.planned_jobs:
+            return {}
+        self.planned_jobs.remove((venue, year))
+        # VENUES AND YEARS WHOSE HITS ARE CACHED ARE SCRAPED WITHOUT REQUESTS ANYWAY
+        if not refresh and self._is_cached(venue, year):
+            return {}
+        group = self.query_planner.next_group((venue, year),
+                                              (job for job in self.planned_jobs if refresh or not self._is_cached(*job)))
+        if len(group) == 1:
+            return {}
+        futures = {(venue, year):None}
+        for job in group[1:]:
+            self.planned_jobs.remove(job)
+            futures[job] = self.prefetched[job] = Future()
+        return futures
+
+    def _scrape_group(self, group, refresh=False):
+        """
+        Scrape the entries of several venues and years with one combined query, paging
+        through the combined hits and partitioning them into the entries of each venue
+        and year. The entries of each venue and year are added to the API cache as if
+        scraped one by one.
+
+        Args:
+            group: List of (venue, year) tuples.
+            refresh: Whether to bypass the API cache (default: False).
+        Returns:
+            A dictionary of (venue, year) and list-of-entries key-value pairs.
+        """
+        self.logger.log("\nScraping venues " + ", ".join(venue + " " + str(year) for venue, year in group) +
+                        " in one query.")
+        payload = {"q": "|".join(self._get_query(venue, year) for venue, year in group),
+                   "format": "json",
+                   "h": "1000",
+                   "f": "0"}
+        entry_lists = {(venue, str(year)):[] for venue, year in group}
+        count = 0
+        with self.logger.metrics.span("scrape_entries"):
+            while True:
+                hits = self._scrape_entry_batch(payload, refresh, cache=False)
+                for hit in hits:
+                    key = hit["info"]["key"].split(sep)
+                    job = (key[1], hit["info"].get("year")) if len(key) > 2 and key[0] == self.venuetype else None
+                    if job in entry_lists:
+                        entry_lists[job].append(hit)
+                count += len(hits)
+                self.logger.log(str(count) + " entries scraped from dblp API.")
+                if len(hits) < 1000:
+                    break
+                payload["f"] = str(int(payload["f"]) + 1000)
+        self.logger.metrics.increment("entry_query_groups_total")
+        self.logger.metrics.increment("entry_query_grouped_jobs_total", len(group))
+
+        entry_lists = {(venue, year):entry_lists[(venue, str(year))] for venue, year in group}
+        with self.plan_lock:
+            for (venue, year), entry_list in entry_lists.items():
+                self.query_planner.record(venue, year, len(entry_list))
+        for (venue, year), entry_list in entry_lists.items():
+            if self.api_cache:
+                # AN EMPTY LAST PAGE ENDS THE ENTRIES (ALSO IF THEIR NUMBER IS A MULTIPLE OF 1000)
+                query = self._get_query(venue, year) + "&h=1000"
+                for offset in range(0, len(entry_list) + 1, 1000):
+                    self.api_cache.put(query, offset, entry_list[offset:offset + 1000])
+        return entry_lists
+
+    def _get_query(self, venue, year):
+        return "streamid:" + self.venuetype + sep + venue + ":" + "year" + ":" + str(year)
+
+    def _is_cached(self, venue, year):
+        return bool(self.api_cache) and self.api_cache.contains(self._get_query(venue, year) + "&h=1000", 0)
+
+    def _scrape_entry_batch(self, payload, refresh=False, cache=True):
         """
         Helper function to scrape specific batch of papers
         published at a given venue and in a given year.
+
+        Batches are taken from the API cache if cached and not expired; expired
+        or refreshed batches are requested conditionally, so unchanged batches are
+        taken from the API cache after all.
         
         Args:
             payload: Dictionary of query parameters.
+            refresh: Whether to bypass the API cache (default: False).
+            cache: Whether to look up and add the batch in the API cache (default: True).
         Returns:
             A list of dictionary entries representing
             publications of venue provided.
         """
-        
-        response = get(self.logger, self.api_endpoint, payload)
+        query = payload["q"] + "&h=" + payload["h"]
+        if self.api_cache and cache and not refresh:
+            hits = self.api_cache.get(query, int(payload["f"]))
+            self.logger.metrics.increment("api_cache_lookups_total", result="miss" if hits is None else "hit")
+            if hits is not None:
+                return hits
+        def cached_text():
+            hits = self.api_cache.get(query, int(payload["f"]), expired=True)
+            return None if hits is None else json.dumps({"result":{"hits":{"hit":hits}}})
+        response = get(self.logger, self.api_endpoint, payload, self.rate_limiter, self.session,
+                       mirror_router=self.mirror_router, cached_text=cached_text if self.api_cache and cache else None)
         try:
-            data = json.loads(response.text)
+            data = loads_json(response.text)
         except json.decoder.JSONDecodeError:
             self.logger.log(response.text)
         hits = data["result"]["hits"].get("hit", [])
-        return hits
\ No newline at end of file
+        if self.mirror_router:
+            for hit in hits:
+                if "url" in hit["info"]:
+                    hit["info"]["url"] = self.mirror_router.canonicalize(hit["info"]["url"])
+        if self.api_cache and cache:
+            self.api_cache.put(query, int(payload["f"]), hits)
+        return hits
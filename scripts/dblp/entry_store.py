@@ -0,0 +1,74 @@
+import json
+from os import listdir, makedirs, replace
+from os.path import exists, isdir, sep
+
+from utils.utils import loads_json
+
+
+class EntryStore:
+    """
+    Store of the entries scraped from the dblp API, persisted as one JSON file
+    per venue and year, i.e. directory/venue/year.json.
+
+    Attributes:
+        directory: The directory of the entry files.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def get_filepath(self, venue, year):
+        """
+        Get the path of the entry file of venue and year.
+
+        Args:
+            venue: The name of the venue, e.g. 'sigir'.
+            year: The year of the conference or journal, e.g. 1971.
+        Returns:
+            The path of the entry file.
+        """
+        return sep.join([self.directory, venue, str(year) + ".json"])
+
+    def save(self, venue, year, entry_list):
+        """
+        Save the entries of venue and year, replacing any previously saved entries.
+
+        Args:
+            venue: The name of the venue, e.g. 'sigir'.
+            year: The year of the conference or journal, e.g. 1971.
+            entry_list: List of entries-as-dictionaries as provided by the dblp API.
+        """
+        filepath = self.get_filepath(venue, year)
+        makedirs(self.directory + sep + venue, exist_ok=True)
+        with open(filepath + ".tmp", "w") as file:
+            json.dump(entry_list, file)
+        replace(filepath + ".tmp", filepath)
+
+    def load(self, venue, year):
+        """
+        Load the entries of venue and year.
+
+        Args:
+            venue: The name of the venue, e.g. 'sigir'.
+            year: The year of the conference or journal, e.g. 1971.
+        Returns:
+            List of entries-as-dictionaries, or None if no entries were saved.
+        """
+        filepath = self.get_filepath(venue, year)
+        if not exists(filepath):
+            return None
+        with open(filepath, "rb") as file:
+            return loads_json(file.read())
+
+    def venue_years(self):
+        """
+        List venues and years of all saved entries.
+
+        Returns:
+            A sorted list of (venue, year) tuples.
+        """
+        if not exists(self.directory):
+            return []
+        return sorted((venue, int(filename[:-len(".json")]))
+                      for venue in listdir(self.directory) if isdir(self.directory + sep + venue)
+                      for filename in listdir(self.directory + sep + venue) if filename.endswith(".json"))
@@ -0,0 +1,76 @@
+class QueryPlanner:
+    """
+    Planner grouping the venues and years to scrape into combined queries to the dblp API,
+    so that venues and years with few entries are scraped with one page of hits instead of
+    one (nearly empty) page each.
+
+    Groups are formed greedily in the order of the venues and years, adding venues and years
+    while the expected number of hits of the group stays within max_hits, i.e. one page of the
+    dblp API. The expected number of hits of a venue and year is its number of entries known
+    from previous runs (see Journal), the mean number of entries of the known years of the
+    venue, or default_estimate for venues without any known year. Numbers of entries recorded
+    while scraping adapt the groups formed later on.
+
+    Attributes:
+        entry_counts: Dictionary of (venue, year) and number of entries key-value pairs.
+        max_hits: The maximum expected number of hits of a group (default: 1000).
+        max_group_size: The maximum number of venues and years of a group, which limits the
+                        length of the query (default: 10).
+        default_estimate: The expected number of hits of venues without any known year.
+    """
+
+    def __init__(self, entry_counts=None, max_hits=1000, max_group_size=10, default_estimate=100):
+        self.entry_counts = dict(entry_counts) if entry_counts else {}
+        self.max_hits = max_hits
+        self.max_group_size = max_group_size
+        self.default_estimate = default_estimate
+
+    def record(self, venue, year, count):
+        """
+        Record the number of entries of a venue and year.
+
+        Args:
+            venue: The name of the venue, e.g. 'sigir'.
+            year: The year of the conference or journal, e.g. 1971.
+            count: The number of entries.
+        """
+        self.entry_counts[(venue, year)] = count
+
+    def estimate(self, venue, year):
+        """
+        Estimate the number of entries of a venue and year.
+
+        Args:
+            venue: The name of the venue, e.g. 'sigir'.
+            year: The year of the conference or journal, e.g. 1971.
+        Returns:
+            The expected number of entries.
+        """
+        if (venue, year) in self.entry_counts:
+            return self.entry_counts[(venue, year)]
+        counts = [count for (known_venue, _), count in self.entry_counts.items() if known_venue == venue]
+        return sum(counts) / len(counts) if counts else self.default_estimate
+
+    def next_group(self, job, jobs):
+        """
+        Form the group of a venue and year with other venues and years to scrape.
+
+        Args:
+            job: The (venue, year) tuple of the venue and year to scrape first.
+            jobs: List of (venue, year) tuples of the other venues and years to scrape,
+                  in the order they are scraped.
+        Returns:
+            A list of (venue, year) tuples starting with job.
+        """
+        group = [job]
+        hits = self.estimate(*job)
+        for other_job in jobs:
+            if len(group) >= self.max_group_size:
+                break
+            if other_job == job:
+                continue
+            other_hits = self.estimate(*other_job)
+            if hits + other_hits <= self.max_hits:
+                group.append(other_job)
+                hits += other_hits
+        return group
@@ -0,0 +1,97 @@
+import json
+from os import fsync
+from os.path import exists
+from threading import Lock
+from time import time
+
+
+class Journal:
+    """
+    Crash-safe journal of the progress of scraping venues and years, persisted as
+    JSON lines file across runs, e.g.
+
+    {"venue": "sigir", "year": 1971, "stage": "file_written", "time": 1701791854.2}
+
+    Records of fetched entries also carry the number of entries, e.g.
+
+    {"venue": "sigir", "year": 1971, "stage": "entries_fetched", "time": 1701791850.7, "entries": 21}
+
+    Each record is flushed and synced to disk when written; a partially written last
+    record (e.g. of a killed process) is ignored when the journal is loaded.
+
+    Attributes:
+        filepath: The path to the journal file.
+        stages: Dictionary of (venue, year) and latest stage key-value pairs.
+        entry_counts: Dictionary of (venue, year) and latest number of entries key-value pairs.
+    """
+
+    ENTRIES_FETCHED = "entries_fetched"
+    BIBTEX_FETCHED = "bibtex_fetched"
+    FILE_WRITTEN = "file_written"
+    NO_ENTRIES = "no_entries"
+    FAILED = "failed"
+
+    FINISHED = (FILE_WRITTEN, NO_ENTRIES)
+
+    def __init__(self, filepath):
+        self.filepath = filepath
+        self.stages = {}
+        self.entry_counts = {}
+        self.lock = Lock()
+        if exists(filepath):
+            with open(filepath) as file:
+                for line in file:
+                    try:
+                        record = json.loads(line)
+                    except json.decoder.JSONDecodeError:
+                        continue
+                    self.stages[(record["venue"], record["year"])] = record["stage"]
+                    if "entries" in record:
+                        self.entry_counts[(record["venue"], record["year"])] = record["entries"]
+
+    def record(self, venue, year, stage, entries=None):
+        """
+        Record that venue and year reached a stage.
+
+        Args:
+            venue: The name of the venue, e.g. 'sigir'.
+            year: The year of the conference or journal, e.g. 1971.
+            stage: The stage reached, e.g. Journal.FILE_WRITTEN.
+            entries: The number of entries of venue and year (optional).
+        """
+        record = {"venue":venue, "year":year, "stage":stage, "time":time()}
+        if entries is not None:
+            record["entries"] = entries
+        with self.lock:
+            self.stages[(venue, year)] = stage
+            if entries is not None:
+                self.entry_counts[(venue, year)] = entries
+            with open(self.filepath, "a") as file:
+                file.write(json.dumps(record) + "\n")
+                file.flush()
+                fsync(file.fileno())
+
+    def get_stage(self, venue, year):
+        """
+        Get the latest stage of venue and year.
+
+        Args:
+            venue: The name of the venue, e.g. 'sigir'.
+            year: The year of the conference or journal, e.g. 1971.
+        Returns:
+            The latest stage, or None if nothing was recorded for venue and year.
+        """
+        return self.stages.get((venue, year))
+
+    def is_finished(self, venue, year):
+        """
+        Check whether venue and year were finished, i.e. their bibtex
+        file was written or they have no entries.
+
+        Args:
+            venue: The name of the venue, e.g. 'sigir'.
+            year: The year of the conference or journal, e.g. 1971.
+        Returns:
+            True if venue and year were finished, False otherwise.
+        """
+        return self.get_stage(venue, year) in self.FINISHED
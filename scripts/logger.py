@@ -1,8 +1,43 @@
+from atexit import register
 from datetime import datetime
 from os import makedirs
 from os.path import exists, sep
+from queue import Queue
+from threading import Lock, Thread
+
+from utils.metrics import Metrics
+
+
+# LOGGERS NOT CLOSED YET, WHOSE PENDING MESSAGES ARE WRITTEN AT EXIT
+_open_loggers = set()
+_open_loggers_lock = Lock()
+
+
+@register
+def _flush_open_loggers():
+    with _open_loggers_lock:
+        loggers = list(_open_loggers)
+    for logger in loggers:
+        logger.flush()
+
 
 class Logger:
+    """
+    Logger of a run, writing messages to output_directory/_logs/[timestamp]/log.txt and
+    collecting the metrics of the run.
+
+    Messages are queued and appended to their log files by a writer thread, which keeps the
+    log files open and writes the queued messages in batches, so logging does not wait for
+    the disk. Pending messages are written at exit, or on flush; close() writes them, stops the
+    writer thread and closes the log files.
+
+    Attributes:
+        timestamp: The start time of the run, naming the log directory.
+        logger_directory: The log directory of the run (output_directory/_logs/[timestamp]);
+                          nothing is written if no output directory is given.
+        lock: Lock of the files of the log directory written by other components.
+        metrics: The counters, histograms and spans of the run.
+    """
 
     def __init__(self, output_directory):
         now = datetime.now()
@@ -11,7 +46,74 @@ class Logger:
         self.logger_directory = output_directory + sep + "_logs" + sep + self.timestamp
         if output_directory and not exists(self.logger_directory):
             makedirs(self.logger_directory)
+        self.lock = Lock()
+        self.metrics = Metrics()
+        self.enabled = bool(output_directory)
+        self.queue = Queue()
+        self.files = {}
+        self.writer = Thread(target=self._write, daemon=True)
+        self.writer.start()
+        with _open_loggers_lock:
+            _open_loggers.add(self)
 
     def log(self, message):
-        with open(self.logger_directory + sep + "log.txt", "a") as file:
-            file.write(message + "\n")
\ No newline at end of file
+        """
+        Log a message to log.txt.
+
+        Args:
+            message: The message.
+        """
+        self.write("log.txt", message + "\n")
+
+    def write(self, filename, text):
+        """
+        Append text to a file of the log directory.
+
+        Args:
+            filename: The name of the file, e.g. 'log.txt'.
+            text: The text.
+        """
+        if self.enabled:
+            self.queue.put((filename, text))
+
+    def flush(self):
+        """
+        Wait until all queued messages are written.
+        """
+        self.queue.join()
+
+    def close(self):
+        """
+        Write all queued messages, stop the writer thread and close the log files.
+        Messages logged after closing are discarded.
+        """
+        with _open_loggers_lock:
+            if self not in _open_loggers:
+                return
+            _open_loggers.remove(self)
+        self.enabled = False
+        self.queue.put(None)
+        self.writer.join()
+
+    def _write(self):
+        closed = False
+        while not closed:
+            batch = [self.queue.get()]
+            while not self.queue.empty():
+                batch.append(self.queue.get())
+            # NONE IS QUEUED BY CLOSE, AFTER ALL MESSAGES
+            closed = None in batch
+            try:
+                for filename, text in filter(None, batch):
+                    if filename not in self.files:
+                        self.files[filename] = open(self.logger_directory + sep + filename, "a")
+                    self.files[filename].write(text)
+                for file in self.files.values():
+                    file.flush()
+            except OSError as exception:
+                print("Unable to write log: " + str(exception))
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+        for file in self.files.values():
+            file.close()
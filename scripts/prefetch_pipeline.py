@@ -0,0 +1,110 @@
+from queue import Queue
+from threading import Thread
+
+
+class PrefetchPipeline:
+    """
+    Pipeline overlapping the pagination of the dblp API with the download of bibtex.
+
+    As each batch of hits of a venue and year is scraped from the dblp API (see
+    EntryScraper.scrape_entry_batches), entries whose bibtex is cached are resolved right
+    away, and the other entries of the batch are put into a bounded queue. Fetch threads
+    take batches from the queue and download their bibtex into the bibtex cache (from the
+    page of the bulk export matching the batch, see BibtexScraper.prefetch_bibtex_bulk, or
+    one request per entry), while the next batch of hits is scraped. Once the queue is
+    full, scraping waits for the fetch threads, so the entries waiting for bibtex are bounded.
+
+    The depth of the queue is observed in the histogram prefetch_queue_depth whenever a batch
+    is queued; the time spent scraping batches, waiting for room in the queue and fetching the
+    bibtex of batches is measured in the spans scrape_entries, prefetch_queue_wait and
+    prefetch_bibtex, and the entries resolved from the cache or queued are counted in
+    prefetch_entries_total.
+
+    Attributes:
+        entry_scraper: The scraper to scrape dblp entries.
+        bibtex_scraper: The scraper to scrape dblp bibtex.
+        logger: The logger used.
+        bulk_bibtex: Whether to fetch bibtex via the bulk export of dblp (default)
+                     or one request per entry.
+        queue_size: The maximum number of batches waiting for their bibtex (default: 2).
+        fetch_workers: The number of fetch threads (default: 1).
+    """
+
+    def __init__(self, entry_scraper, bibtex_scraper, logger, bulk_bibtex=True, queue_size=2, fetch_workers=1):
+        self.entry_scraper = entry_scraper
+        self.bibtex_scraper = bibtex_scraper
+        self.logger = logger
+        self.bulk_bibtex = bulk_bibtex
+        self.queue_size = queue_size
+        self.fetch_workers = fetch_workers
+
+    def run(self, venue, year, refresh=False):
+        """
+        Scrape the entries of a venue and year and add the bibtex of all of them to the bibtex cache.
+
+        Args:
+            venue: The name of the venue, e.g. 'sigir'.
+            year: The year of the conference or journal, e.g. 1971.
+            refresh: Whether to bypass the API cache (default: False).
+        Returns:
+            A list of entries-as-dictionaries.
+        Throws:
+            The first exception raised while scraping entries or fetching bibtex.
+        """
+        metrics = self.logger.metrics
+        bibtex_cache = self.bibtex_scraper.bibtex_cache
+        fetch_queue = Queue(self.queue_size)
+        errors = []
+        threads = [Thread(target=self._fetch, args=(venue, year, fetch_queue, errors), daemon=True)
+                   for _ in range(self.fetch_workers)]
+        for thread in threads:
+            thread.start()
+        entry_list = []
+        try:
+            for offset, entry_batch in self.entry_scraper.scrape_entry_batches(venue, year, refresh):
+                entry_list += entry_batch
+                missing_entries = [entry for entry in entry_batch if entry["info"]["url"] not in bibtex_cache]
+                metrics.increment("prefetch_entries_total", len(entry_batch) - len(missing_entries), result="cached")
+                metrics.increment("prefetch_entries_total", len(missing_entries), result="queued")
+                # ONCE A FETCH THREAD FAILED, THE REMAINING BATCHES ARE ONLY SCRAPED
+                if missing_entries and not errors:
+                    with metrics.span("prefetch_queue_wait"):
+                        fetch_queue.put((offset, missing_entries))
+                    metrics.observe("prefetch_queue_depth", fetch_queue.qsize())
+        finally:
+            for _ in threads:
+                fetch_queue.put(None)
+            for thread in threads:
+                thread.join()
+        if errors:
+            raise errors[0]
+        return entry_list
+
+    def _fetch(self, venue, year, fetch_queue, errors):
+        """
+        Fetch the bibtex of the batches of entries in the queue until a None batch is taken.
+        Batches taken after a fetch failed are skipped, so scraping never waits for a full queue.
+
+        Args:
+            venue: The name of the venue, e.g. 'sigir'.
+            year: The year of the conference or journal, e.g. 1971.
+            fetch_queue: The queue of (offset, list of entries) tuples.
+            errors: The list the exceptions raised by fetch threads are added to.
+        """
+        while True:
+            batch = fetch_queue.get()
+            if batch is None:
+                return
+            if errors:
+                continue
+            offset, entry_list = batch
+            try:
+                with self.logger.metrics.span("prefetch_bibtex"):
+                    if self.bulk_bibtex:
+                        self.bibtex_scraper.prefetch_bibtex_bulk(venue, year, entry_list, offset)
+                        entry_list = [entry for entry in entry_list
+                                      if entry["info"]["url"] not in self.bibtex_scraper.bibtex_cache]
+                    for entry in entry_list:
+                        self.bibtex_scraper.scrape_bibtex(entry)
+            except Exception as exception:
+                errors.append(exception)
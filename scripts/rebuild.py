@@ -0,0 +1,147 @@
+from concurrent.futures import ProcessPoolExecutor
+from os.path import exists, sep
+from shutil import rmtree
+from tempfile import mkdtemp
+import traceback
+
+from scripts.bibkey_registry import BibkeyRegistry
+from scripts.bibtex_index import BibtexIndex
+from scripts.bibtex_writer import BibtexWriter
+from scripts.dblp.bibtex_cache import SqliteBibtexCache
+from scripts.dblp.entry_store import EntryStore
+from scripts.journal import Journal
+from scripts.logger import Logger
+from utils.metrics import Metrics
+
+bibtex_writer = None
+entry_store = None
+bibtex_cache = None
+
+
+class WorkerLog:
+    """
+    Log of a worker process, collecting the messages of the venue and year rebuilt,
+    which are logged by the rebuilding process.
+
+    Attributes:
+        messages: List of the messages logged.
+        metrics: The metrics of the worker process.
+    """
+
+    def __init__(self):
+        self.messages = []
+        self.metrics = Metrics()
+
+    def log(self, message):
+        """
+        Log a message.
+
+        Args:
+            message: The message.
+        """
+        self.messages.append(message)
+
+
+def rebuild(venuetype, output_directory, bibtex_cache_filepath=None, processes=None):
+    """
+    Regenerate the bibtex files of all venues and years with stored entries from the
+    stored entries and the bibtex cache only, without any requests to dblp.
+    Venues and years are distributed over a pool of processes.
+
+    The worker processes only format and write bibtex files (see BibtexWriter): they load
+    entries from the entry store, look up bibtex in the bibtex cache opened read-only (a
+    JSON lines cache is converted to a temporary SQLite cache once, instead of being loaded
+    by every process) and share the bibkey registry. The rebuilding process logs their
+    messages, records failed venues and years in the journal and indexes the bibtex files.
+
+    Args:
+        venuetype: "conf" for conference or "journals" for journals.
+        output_directory: The root directory for the output, as provided to the scraper.
+        bibtex_cache_filepath: The path to the bibtex cache file; defaults to
+                               output_directory/venuetype/dblp_bibtex_cache.txt.
+        processes: The number of processes (default: number of CPU cores).
+    Returns:
+        A dictionary of (venue, year) and bibtex filepath key-value pairs; the
+        filepath is None if no bibtex file was written for venue and year.
+    """
+    directory = output_directory + sep + venuetype
+    if not bibtex_cache_filepath:
+        bibtex_cache_filepath = directory + sep + "dblp_bibtex_cache.txt"
+    venue_years = EntryStore(directory + sep + "_entries").venue_years()
+    logger = Logger(directory)
+    journal = Journal(directory + sep + "progress_journal.jsonl")
+    bibtex_index = BibtexIndex(directory + sep + "bibtex_index.sqlite")
+    temporary_directory = None
+    if not bibtex_cache_filepath.endswith((".sqlite", ".db")):
+        temporary_directory = mkdtemp()
+        jsonl_filepath = bibtex_cache_filepath
+        bibtex_cache_filepath = temporary_directory + sep + "dblp_bibtex_cache.sqlite"
+        sqlite_bibtex_cache = SqliteBibtexCache(bibtex_cache_filepath)
+        if exists(jsonl_filepath):
+            sqlite_bibtex_cache.import_jsonl(jsonl_filepath)
+        sqlite_bibtex_cache.close()
+    elif not exists(bibtex_cache_filepath):
+        SqliteBibtexCache(bibtex_cache_filepath).close()
+    results = {}
+    try:
+        with ProcessPoolExecutor(processes,
+                                 initializer=_initialize_worker,
+                                 initargs=(venuetype, output_directory, bibtex_cache_filepath)) as executor:
+            for (venue, year), (bib_filepath, messages, error) in zip(venue_years,
+                                                                      executor.map(_rebuild_bibtex, venue_years)):
+                for message in messages:
+                    logger.log(message)
+                if error:
+                    logger.log(error)
+                    journal.record(venue, year, Journal.FAILED)
+                elif bib_filepath:
+                    bibtex_index.add_file(venue, year, bib_filepath)
+                results[(venue, year)] = bib_filepath
+    finally:
+        if temporary_directory:
+            rmtree(temporary_directory)
+        bibtex_index.close()
+        logger.close()
+    return results
+
+
+def _initialize_worker(venuetype, output_directory, bibtex_cache_filepath):
+    """
+    Initialize the bibtex writer, entry store and bibtex cache of a worker process.
+
+    Args:
+        venuetype: "conf" for conference or "journals" for journals.
+        output_directory: The root directory for the output.
+        bibtex_cache_filepath: The path to the SQLite bibtex cache file.
+    """
+    global bibtex_writer, entry_store, bibtex_cache
+    directory = output_directory + sep + venuetype
+    bibtex_writer = BibtexWriter(venuetype, directory, "\n\n\n", WorkerLog(),
+                                 BibkeyRegistry(directory + sep + "bibkey_registry.sqlite"))
+    entry_store = EntryStore(directory + sep + "_entries")
+    bibtex_cache = SqliteBibtexCache(bibtex_cache_filepath, read_only=True)
+
+
+def _rebuild_bibtex(venue_year):
+    """
+    Regenerate the bibtex file of a venue and year in a worker process.
+
+    Args:
+        venue_year: A (venue, year) tuple.
+    Returns:
+        A tuple of the path of the bibtex file written (None if no file was written),
+        the list of messages logged and the traceback of the exception raised (None
+        if venue and year were rebuilt).
+    """
+    venue, year = venue_year
+    bibtex_writer.logger.messages = []
+    try:
+        entry_list = entry_store.load(venue, year)
+        if not entry_list:
+            return None, bibtex_writer.logger.messages, None
+        bibtex_records = bibtex_writer.generate_bibtex_records(
+            entry_list, lambda index, entry: bibtex_cache[entry["info"]["url"]].strip() + bibtex_writer.bibtex_padding)
+        bib_filepath = bibtex_writer.write_bibtex_file(venue, year, bibtex_records, overwrite=True)
+        return bib_filepath, bibtex_writer.logger.messages, None
+    except:
+        return None, bibtex_writer.logger.messages, traceback.format_exc()
@@ -0,0 +1,72 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import traceback
+
+
+class Scheduler:
+    """
+    Scheduler to run the scrape jobs of many venues and years concurrently.
+
+    Each job scrapes the entries and bibtex of one venue and year, generates the
+    bibtex string and writes it to the bibtex file. Jobs are run by a pool of worker
+    threads; all requests of all jobs go through the rate limiter of the scraper, so
+    the politeness budget towards dblp is shared, while API pagination, bibtex
+    scraping and bibtex string generation of different jobs overlap.
+
+    Attributes:
+        scraper: The scraper used to run the jobs.
+        workers: The number of jobs run concurrently.
+        incremental: Whether to incrementally update existing bibtex files
+                     instead of skipping them.
+        resume: Whether to skip venues and years finished according to the
+                journal of the scraper, e.g. by a previous run that failed.
+
+    If the scraper groups entry queries, the entries of the jobs are planned to be scraped
+    in combined queries (see Scraper.plan_entry_queries).
+    """
+
+    def __init__(self, scraper, workers=4, incremental=False, resume=False):
+        self.scraper = scraper
+        self.workers = workers
+        self.incremental = incremental
+        self.resume = resume
+
+    def run(self, venues):
+        """
+        Run the scrape jobs of the given venues and years.
+
+        Args:
+            venues: Dictionary of venue and list-of-years key-value pairs,
+                    e.g. {"sigir":[1971],"www":[2021,2023]}.
+        Returns:
+            A dictionary of (venue, year) and bibtex filepath key-value pairs; the
+            filepath is None if no bibtex file was written for venue and year.
+            Venues and years skipped when resuming are not included.
+        """
+        jobs = [(venue, year) for venue, years in venues.items() for year in years
+                if not (self.resume and self.scraper.journal.is_finished(venue, year))]
+        if self.scraper.group_entry_queries:
+            self.scraper.plan_entry_queries(jobs)
+        results = {}
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = {executor.submit(self.run_job, venue, year):(venue, year) for venue, year in jobs}
+            for future in as_completed(futures):
+                try:
+                    results[futures[future]] = future.result()
+                except:
+                    self.scraper.logger.log(traceback.format_exc())
+                    results[futures[future]] = None
+        return {job:results[job] for job in jobs}
+
+    def run_job(self, venue, year):
+        """
+        Scrape, generate and write (or incrementally update) the bibtex file of a venue and year.
+
+        Args:
+            venue: The name of the venue, e.g. 'sigir'.
+            year: The year of the conference or journal, e.g. 1971.
+        Returns:
+            The path of the bibtex file written, or None if no file was written.
+        """
+        if self.incremental:
+            return self.scraper.update_bibtex(venue, year)
+        return self.scraper.scrape_and_write_bibtex(venue, year)
@@ -1,22 +1,32 @@
-from copy import deepcopy
 from csv import writer
+from io import StringIO
 from json import dump
-from re import search
 from os.path import exists, sep
-from os import makedirs
+from os import makedirs, replace
+from threading import Lock
 import traceback
 
-from tqdm import tqdm
+from scripts.bibkey_registry import BibkeyRegistry
+from scripts.bibtex_index import BibtexIndex
+from scripts.bibtex_record import join_bibtex_lines
+from scripts.bibtex_writer import BibtexWriter
+from scripts.dblp.api_cache import ApiCache
 from scripts.dblp.bibtex_scraper import BibtexScraper
+from scripts.dblp.dump_scraper import DumpScraper
 from scripts.dblp.entry_scraper import EntryScraper
+from scripts.dblp.entry_store import EntryStore
+from scripts.dblp.query_planner import QueryPlanner
+from scripts.journal import Journal
 from scripts.logger import Logger
+from scripts.prefetch_pipeline import PrefetchPipeline
 
-from utils.utils import convert_string_to_ascii
+from utils.rate_limiter import RateLimiter
+from utils.session import Session
 
-class Scraper:
+class Scraper(BibtexWriter):
     """
     Scraper to wrap the dblp entry and bibtex scraper and generate bibtex strings from
-    entries and their respective bibtex strings.
+    entries and their respective bibtex strings (formatted and written as by BibtexWriter).
 
     Attributes:
         venuetype: "conf" for conference or "journals" for journals.
@@ -26,9 +36,35 @@ class Scraper:
         bibtex_padding: Padding between bibtex entries; set to '\n\n\n'.
         dblp_entry_scraper: The scraper to scrape dblp entries.
         dblp_bibtex_scraper: The scraper to scrape dblp bibtex.
+        entry_store: The store of scraped entries (output_directory/_entries).
+        journal: The journal of the progress of venues and years
+                 (output_directory/progress_journal.jsonl).
+        fails: Dictionary of venue and list-of-years key-value pairs of failed venues and years.
+        bulk_bibtex: Whether to scrape bibtex via the bulk export of dblp (default)
+                     or one request per entry.
+        rate_limiter: The rate limiter shared by all requests to dblp.
+        session: The HTTP session shared by all requests to dblp; by default, validators
+                 of responses are persisted to output_directory/dblp_http_validators.sqlite.
+        api_cache: The cache of hits returned by the dblp API; by default, hits are cached
+                   in output_directory/dblp_api_cache.sqlite and expire after one day.
+        mirror_router: The router spreading requests to dblp across mirrors (optional).
+        bibtex_index: The index of the entries of all bibtex files written; by default, stored
+                      in output_directory/bibtex_index.sqlite.
+        bibkey_registry: The registry of the IR-Anthology bibkeys assigned to dblp keys; by default,
+                         stored in output_directory/bibkey_registry.sqlite.
+        format_workers: The number of processes formatting the entries of large volumes (default: 1,
+                        i.e. entries are formatted in the scraping process).
+        format_chunk_size: The number of entries formatted per chunk by a format worker.
+        group_entry_queries: Whether to scrape the entries of venues and years with few entries
+                             in combined queries (see plan_entry_queries, default: False).
+        prefetch_queue_size: The maximum number of batches of entries waiting for their bibtex
+                             while entries are scraped (see PrefetchPipeline).
+        prefetch_workers: The number of threads fetching bibtex while entries are scraped.
     """
 
-    def __init__(self, venuetype, output_directory, bibtex_cache_filepath):
+    def __init__(self, venuetype, output_directory, bibtex_cache_filepath, bulk_bibtex=True, rate_limiter=None, session=None,
+                 api_cache=None, mirror_router=None, bibtex_index=None, bibkey_registry=None, format_workers=1,
+                 group_entry_queries=False):
         if venuetype not in ["conf", "journals"]:
             raise ValueError("Invalid venue type ('conf' or 'journals').")
         else:
@@ -38,8 +74,37 @@ class Scraper:
         if not exists(self.output_directory):
             makedirs(self.output_directory)
         self.bibtex_padding = "\n\n\n"
-        self.dblp_entry_scraper = EntryScraper(venuetype, self.logger)
-        self.dblp_bibtex_scraper = BibtexScraper(venuetype, self.logger, self.output_directory, bibtex_cache_filepath, self.bibtex_padding)
+        self.rate_limiter = rate_limiter if rate_limiter else RateLimiter()
+        self.session = session if session else Session(validators_filepath=self.output_directory + sep + "dblp_http_validators.sqlite")
+        self.api_cache = api_cache if api_cache else ApiCache(self.output_directory + sep + "dblp_api_cache.sqlite", ttl=24*60*60)
+        self.mirror_router = mirror_router
+        self.dblp_entry_scraper = EntryScraper(venuetype, self.logger, self.rate_limiter, self.session, self.api_cache,
+                                               self.mirror_router)
+        self.dblp_bibtex_scraper = BibtexScraper(venuetype, self.logger, self.output_directory, bibtex_cache_filepath, self.bibtex_padding, self.rate_limiter, self.session,
+                                                 self.mirror_router)
+        self.bulk_bibtex = bulk_bibtex
+        self.entry_store = EntryStore(self.output_directory + sep + "_entries")
+        self.journal = Journal(self.output_directory + sep + "progress_journal.jsonl")
+        self.fails = {}
+        self.bibtex_index = bibtex_index if bibtex_index else BibtexIndex(self.output_directory + sep + "bibtex_index.sqlite")
+        self.bibkey_registry = bibkey_registry if bibkey_registry is not None else BibkeyRegistry(self.output_directory + sep + "bibkey_registry.sqlite")
+        self.format_workers = format_workers
+        self.format_chunk_size = 1000
+        self.format_executor = None
+        self.format_executor_lock = Lock()
+        self.group_entry_queries = group_entry_queries
+        self.prefetch_queue_size = 2
+        self.prefetch_workers = 1
+
+    def plan_entry_queries(self, jobs):
+        """
+        Plan combined queries for the entries of the given venues and years (see EntryScraper.plan),
+        estimating their numbers of entries from the journal.
+
+        Args:
+            jobs: List of (venue, year) tuples, in the order they are scraped.
+        """
+        self.dblp_entry_scraper.plan(jobs, QueryPlanner(self.journal.entry_counts))
 
     def scrape_entries_and_bibtex(self, venue, year):
         """
@@ -52,289 +117,239 @@ class Scraper:
             A touple of entry and bibtex lists.        
         """
         print("Scraping bibtex entries of " + venue + " " + str(year) + "...")
-        fails = {}
         try:
-            entry_list = self.dblp_entry_scraper.scrape_entries(venue, year)
-            with open(self.logger.logger_directory + sep + "dblp_json_results.csv", "a") as file:
-                csv_writer = writer(file, delimiter=",")
-                csv_writer.writerow([venue, year, len(entry_list)])
-            if entry_list != []:
-                bibtex_list = [self.dblp_bibtex_scraper.scrape_bibtex(entry) for entry in tqdm(entry_list, total=len(entry_list))]
-                return entry_list, bibtex_list
-            else:
+            entry_list = self._scrape_entries_and_prefetch_bibtex(venue, year)
+            if entry_list == []:
                 return [], []
+            return entry_list, [self.dblp_bibtex_scraper.scrape_bibtex(entry) for entry in entry_list]
         except:
-            self.logger.log(traceback.format_exc())
-            with open(self.logger.logger_directory + sep + "failed.json", "w") as file:
-                if venue not in fails:
-                    fails[venue] = []
-                fails[venue].append(year)
-                dump({"venuetype":self.venuetype,"venues":fails}, file)
-                return [], []
-        
-    def generate_bibtex_string(self, entry_list, bibtex_list):
-        """
-        Generate a string of bibtex entries from a list of entries as provided by the
-        dblp API and a list of bibtex string as provided and scraped from the dblp website.
+            self._log_failure(venue, year)
+            return [], []
 
-        entry_list is deep-copied to avoid overwriting of original entry_list object.
+    def scrape_and_write_bibtex(self, venue, year):
+        """
+        Scrape entries and bibtex for venue and year from dblp and write the formatted
+        bibtex entries to the bibtex file of venue and year as they are generated,
+        without keeping the bibtex of all entries in memory.
 
         Args:
-            entry_list: List of entries-as-dictionaries.
-            bibtex_list: List of bibtex string.
+            venue: The name of the venue, e.g. 'sigir'.
+            year: The year of the conference or journal, e.g. 1971.
         Returns:
-            A string of bibtex entries which have been formatted.
+            The path of the bibtex file written, or None if no file was written.
         """
-        entry_list = deepcopy(entry_list)
-        bibtex_lines_list = [bibtex.replace("\n                  ", " ").strip().split("\n") for bibtex in bibtex_list]
-
-        editor_map = {}
-        # GET EDITOR STRING AND MATCH WITH EDITOR ID STRING AND PERSONS JSON
-        for entry, bibtex_lines in zip(entry_list, bibtex_lines_list):
-            if entry["info"]["type"] == "Editorship":
-                for bibtex_line in bibtex_lines:
-                    if bibtex_line.strip().startswith("editor"):
-                        match = search("{.*}", bibtex_line)
-                        if match:
-                            editor = bibtex_line[match.start():match.end()]
-                            editor_map[editor] = {"editorid_string":"{" + self._get_personid_string_from_entry(entry) + "}",
-                                                  "persons":entry["info"]["authors"]}
-        if editor_map == {}:
-            self.dblp_logger.log("No editors found.")
-        dblp_bibkeys = []
-        
-        # ADD DBLPBIBKEY, VENUE AND (WHERE APPLICABLE) AUTHOR, EDITOR, AUTHORID AND EDITORID TO BIBTEX
-        for entry, bibtex_lines in zip(entry_list, bibtex_lines_list):
-
-            dblp_bibkey = self._get_dblp_bibkey_from_entry(entry)
-            bibtex_lines.insert(-1, "  dblpbibkey   = " + "{" + dblp_bibkey + "}")
-            dblp_bibkeys.append(dblp_bibkey)
-            
-            venue_string = self._get_venue_string_from_entry(entry)
-            if venue_string:
-                bibtex_lines.insert(-1, "  venue        = " + "{" + venue_string + "}")
-
-            editorship = entry["info"]["type"] == "Editorship"
-
-            author = False
-            author_string = ""
-            authorid = False
-            authorid_string = ""
-            editor = False
-            editor_string = ""
-            editorid = False
-            editorid_string = ""
-
-            # GET AUTHOR AND EDITOR STRING FROM BIBTEX
-            for bibtex_line in bibtex_lines:
-                if bibtex_line.strip().startswith("author"):
-                    match = search("{.*}", bibtex_line)
-                    author_string = bibtex_line[match.start():match.end()]
-                    author = True
-                if bibtex_line.strip().startswith("editor"):
-                    match = search("{.*}", bibtex_line)
-                    editor_string = bibtex_line[match.start():match.end()]
-                    editor = True
-
-            # SET EDITOR AND EDITOR ID STRING
-            if editor:
-                if editor_string in editor_map:
-                    editorid_string = editor_map[editor_string]["editorid_string"]
-                    editorid = True
-                else:
-                    editorid_string = "{ERROR: NO EDITORID}"
-                    self.dblp_logger.log("No editorid for entry " + venue_string + " " + entry["info"]["year"] + " " + entry["info"]["url"] + ".html?view=bibtex")
-            else:
-                editor_string = "{ERROR: NO EDITORS}"
-                self.dblp_logger.log("No editor for entry " + venue_string + " " + entry["info"]["year"] + " " + entry["info"]["url"] + ".html?view=bibtex")
-                editorid_string = "{ERROR: NO EDITORID}"
-                self.dblp_logger.log("No editorid for entry " + venue_string + " " + entry["info"]["year"] + " " + entry["info"]["url"] + ".html?view=bibtex")
-
-            # SET AUTHOR AND AUTHOR ID STRING
-            if author:
-                authorid_string = "{" + self._get_personid_string_from_entry(entry) + "}"
-                authorid = True
-            else:
-                if not editorship:
-                    if editor:
-                        author_string = editor_string
-                        if editorid:
-                            authorid_string = editorid_string
-                            authorid = True
-                        else:
-                            authorid_string = "{ERROR: NO EDITORID}"
-                            self.dblp_logger.log("No authorid for entry " + venue_string + " " + entry["info"]["year"] + " " + entry["info"]["url"] + ".html?view=bibtex")
-                    else:
-                        author_string = "{ERROR: NO EDITORS}"
-                        self.dblp_logger.log("No author for entry " + venue_string + " " + entry["info"]["year"] + " " + entry["info"]["url"] + ".html?view=bibtex")
-                        authorid_string = "{ERROR: NO EDITORID}"
-                        self.dblp_logger.log("No authorid for entry " + venue_string + " " + entry["info"]["year"] + " " + entry["info"]["url"] + ".html?view=bibtex")
-
-            # HANDLE PERSON DATA IN JSON
-            if editorship:
-                if "authors" in entry["info"]: del entry["info"]["authors"]
-            else:
-                if "authors" not in entry["info"]:
-                    if editor and editor_string in editor_map:
-                        entry["info"]["authors"] = editor_map[editor_string]["persons"]
-                    else:
-                        self.dblp_logger.log("No persons for entry " + venue_string + " " + entry["info"]["year"] + " " +
-                                        entry["info"]["url"] + ".html?view=bibtex. Trying to obtain persons from bibtex instead.")
-                        if editor:
-                            entry["info"]["authors"] = {"author":[{"@pid":"PERSONIDERROR",
-                                                                    "text":author_text.strip()}
-                                                                    for author_text in editor_string[1:-1].split(" and ")]}
-                        else:
-                            self.dblp_logger.log("Unable to get persons from bibtex for entry " + venue_string + " " + entry["info"]["year"] + " " +
-                                            entry["info"]["url"] + ".html?view=bibtex")
-                            entry["info"]["authors"] = {"author":[{"@pid":"PERSONIDERROR",
-                                                                   "text":"PERSONTEXTERROR"}]} 
-
-            if not editor and editor_string:
-                bibtex_lines.insert(2 if author else 1,
-                                    "  editor       = " + editor_string)
-                editor = True
-            if not author and author_string:
-                bibtex_lines.insert( 1,
-                                    "  author       = " + author_string)
-                author = True
-            if author: 
-                bibtex_lines.insert(-1,
-                                    "  authorid     = " + authorid_string)
-            if editor:
-                bibtex_lines.insert(-1,
-                                    "  editorid     = " + editorid_string)
-
-        # GENERATE IR-ANTHOLOGY BIBKEYS
-        ir_anthology_bibkeys = self._append_suffixes_to_bibkeys([self._get_ir_anthology_bibkey_from_entry(entry) for entry in entry_list])
-
-        # REPLACE DBLP BIBKEY WITH IR-ANTHOLOGY BIBKEYS
-        for bibtex_lines, dblp_bibkey, ir_anthology_bibkey in zip(bibtex_lines_list, dblp_bibkeys, ir_anthology_bibkeys):
-            bibtex_lines[0] = bibtex_lines[0].replace(dblp_bibkey, ir_anthology_bibkey)
+        print("Scraping bibtex entries of " + venue + " " + str(year) + "...")
+        try:
+            entry_list = self._scrape_entries_and_prefetch_bibtex(venue, year)
+            if entry_list == []:
+                return None
+            bibtex_records = self.generate_bibtex_records(entry_list,
+                                                          lambda index, entry: self.dblp_bibtex_scraper.scrape_bibtex(entry))
+            bib_filepath = self.write_bibtex_file(venue, year, bibtex_records)
+            self.dblp_bibtex_scraper.flush()
+            self.journal.record(venue, year, Journal.FILE_WRITTEN)
+            return bib_filepath
+        except:
+            self._log_failure(venue, year)
+            return None
 
-        # CONCATENATE
-        return "".join([self._join_bibtex_lines(bibtex_lines) for bibtex_lines in bibtex_lines_list])
-    
-    def _append_suffixes_to_bibkeys(self, ir_anthology_bibkeys):
+    def update_bibtex(self, venue, year):
         """
-        Appends deduplication suffixes to a list of bibkeys.
-        First entry of a given bibkey receives no suffixm,
-        second entry ends in -2, third ends in -3, and so on.
+        Incrementally update the bibtex file of venue and year.
+
+        The entries of venue and year are scraped from the dblp API (bypassing the API cache)
+        and compared with the entries stored by the previous run. The bibtex of changed entries
+        is scraped again, the bibtex of new entries is scraped as usual, and the bibtex file is
+        rewritten unless no entry was added, changed or removed and the file was written for the
+        stored entries (i.e. it exists and the journal records it as written). The entries are
+        stored only once the bibtex file is written, so a failed update is retried in full.
 
         Args:
-            ir_anthology_bibkeys: List of bibkeys.
+            venue: The name of the venue, e.g. 'sigir'.
+            year: The year of the conference or journal, e.g. 1971.
         Returns:
-            List of bibkeys with deduplication suffixes added where applicable.
-        """    
-        ir_anthology_bibkey_counts = {}
-        
-        ir_anthology_bibkeys_with_suffixes = []
-        for ir_anthology_bibkey in ir_anthology_bibkeys:
-            if ir_anthology_bibkey not in ir_anthology_bibkey_counts:
-                ir_anthology_bibkeys_with_suffixes.append(ir_anthology_bibkey)
-                ir_anthology_bibkey_counts[ir_anthology_bibkey] = 2
-            else:
-                ir_anthology_bibkeys_with_suffixes.append(ir_anthology_bibkey + "-" + str(ir_anthology_bibkey_counts[ir_anthology_bibkey]))
-                ir_anthology_bibkey_counts[ir_anthology_bibkey] += 1
-        return ir_anthology_bibkeys_with_suffixes
+            The path of the bibtex file written, or None if no file was written.
+        """
+        print("Updating bibtex entries of " + venue + " " + str(year) + "...")
+        try:
+            previous_stage = self.journal.get_stage(venue, year)
+            previous_entry_list = self.entry_store.load(venue, year)
+            entry_list = self.dblp_entry_scraper.scrape_entries(venue, year, refresh=True)
+            added, changed, removed = self.diff_entries(previous_entry_list or [], entry_list)
+            self.logger.log("Updating " + venue + " " + str(year) + ": " + str(len(added)) + " added, " +
+                            str(len(changed)) + " changed, " + str(len(removed)) + " removed entries.")
+            if entry_list == []:
+                self._store_entries(venue, year, entry_list)
+                return None
+            # A FILE OF A FAILED OR INTERRUPTED RUN MAY NOT MATCH THE STORED ENTRIES
+            if (not (added or changed or removed) and previous_stage == Journal.FILE_WRITTEN
+                    and exists(self.get_bibtex_filepath(venue, year))):
+                return None
+            for entry in entry_list:
+                if entry["info"]["key"] in changed:
+                    self.dblp_bibtex_scraper.scrape_bibtex(entry, refresh=True)
+            if self.bulk_bibtex:
+                self.dblp_bibtex_scraper.prefetch_bibtex_bulk(venue, year, entry_list)
+            self.journal.record(venue, year, Journal.BIBTEX_FETCHED)
+            bibtex_records = self.generate_bibtex_records(entry_list,
+                                                          lambda index, entry: self.dblp_bibtex_scraper.scrape_bibtex(entry))
+            bib_filepath = self.write_bibtex_file(venue, year, bibtex_records, overwrite=True)
+            self.dblp_bibtex_scraper.flush()
+            # ENTRIES ARE ONLY STORED ONCE WRITTEN, SO A FAILED UPDATE IS DIFFED AGAIN
+            self._store_entries(venue, year, entry_list)
+            self.journal.record(venue, year, Journal.FILE_WRITTEN)
+            return bib_filepath
+        except:
+            self._log_failure(venue, year)
+            return None
 
-    def _join_bibtex_lines(self, bibtex_lines):
+    def diff_entries(self, previous_entry_list, entry_list):
         """
-        Concatenates a list of bibtex lines to a bibentry.
+        Compare two lists of entries by their dblp keys and entry data.
 
         Args:
-            bibtex_lines: List of bibtex lines.
+            previous_entry_list: List of entries-as-dictionaries of the previous run.
+            entry_list: List of entries-as-dictionaries of the current run.
         Returns:
-            A bibtex entry.
+            A tuple of the sets of dblp keys of added, changed and removed entries.
         """
-        STRING = bibtex_lines[0]
-        for line in bibtex_lines[1:-2]:
-            STRING += ("\n" + line + ("," if not line.endswith(",") else "")) if line else ""
-        STRING += ("\n" + bibtex_lines[-2]) if bibtex_lines[-2] else ""
-        STRING += "\n" + bibtex_lines[-1] + self.bibtex_padding
-        return STRING
-
-    def _get_personid_string_from_entry(self, entry):
+        previous_entries = {entry["info"]["key"]:entry["info"] for entry in previous_entry_list}
+        entries = {entry["info"]["key"]:entry["info"] for entry in entry_list}
+        added = set(entries) - set(previous_entries)
+        removed = set(previous_entries) - set(entries)
+        changed = {key for key in set(entries) & set(previous_entries) if entries[key] != previous_entries[key]}
+        return added, changed, removed
+
+    def write_bibtex_from_dump(self, dump_filepath, venues):
         """
-        Generate author ID string from entry with the format
-        [ID-OF-FIRST-AUTHOR] and [ID-OF-SECOND-AUTHOR] and ...
+        Generate the bibtex files of all given venues and years from a local dblp XML
+        dump instead of the dblp API, in one pass over the dump (see DumpScraper).
+
+        Entries are stored and the bibtex is added to the bibtex cache as if scraped
+        from dblp, so the bibtex files can be rebuilt or updated later. Existing bibtex
+        files are replaced.
 
         Args:
-            entry: Entry-as-dictionary as provided by the dblp API.
+            dump_filepath: The path to the dblp XML dump (dblp.xml or dblp.xml.gz).
+            venues: Dictionary of venue and list-of-years key-value pairs, e.g. {"sigir":[1971]}.
         Returns:
-            String of author IDs, separated by " and ".
+            A dictionary of (venue, year) and bibtex filepath key-value pairs; the
+            filepath is None if no bibtex file was written for venue and year.
         """
-        authors = entry["info"].get("authors", {"author":""})["author"]
-        if type(authors) is list:
-            person_ids = [author["@pid"] for author in authors]
-        if type(authors) is dict:
-            person_ids = [authors["@pid"]]
-        if type(authors) is str:
-            person_ids = []
-        return " and ".join(person_ids)
-
-    def _get_venue_string_from_entry(self, entry):
+        dump_scraper = DumpScraper(self.venuetype, self.logger, dump_filepath, self.bibtex_padding)
+        results = {}
+        for (venue, year), (entry_list, bibtex_list) in dump_scraper.scrape(venues).items():
+            try:
+                self._store_entries(venue, year, entry_list)
+                if entry_list == []:
+                    results[(venue, year)] = None
+                    continue
+                for entry, bibtex in zip(entry_list, bibtex_list):
+                    self.dblp_bibtex_scraper.bibtex_cache.put(entry["info"]["url"], bibtex)
+                self.dblp_bibtex_scraper.flush()
+                self.journal.record(venue, year, Journal.BIBTEX_FETCHED)
+                bibtex_records = self.generate_bibtex_records(entry_list, lambda index, entry: bibtex_list[index])
+                results[(venue, year)] = self.write_bibtex_file(venue, year, bibtex_records, overwrite=True)
+                self.journal.record(venue, year, Journal.FILE_WRITTEN)
+            except:
+                self._log_failure(venue, year)
+                results[(venue, year)] = None
+        return results
+
+    def _scrape_entries_and_prefetch_bibtex(self, venue, year):
         """
-        Generate venue string from entry with the format
-        [FIRST-VENUE] and [SECOND-AUTHOR] and ...
+        Scrape entries for venue and year from dblp, fetching their bibtex into the bibtex cache
+        while the entries are scraped (see PrefetchPipeline), and store them.
 
         Args:
-            entry: Entry-as-dictionary as provided by the dblp API.
+            venue: The name of the venue, e.g. 'sigir'.
+            year: The year of the conference or journal, e.g. 1971.
         Returns:
-            String of venues, separated by " and ".
+            A list of entries-as-dictionaries.
+        """
+        prefetch_pipeline = PrefetchPipeline(self.dblp_entry_scraper, self.dblp_bibtex_scraper, self.logger,
+                                             self.bulk_bibtex, self.prefetch_queue_size, self.prefetch_workers)
+        entry_list = prefetch_pipeline.run(venue, year)
+        self._store_entries(venue, year, entry_list)
+        if entry_list:
+            self.dblp_bibtex_scraper.flush()
+            self.journal.record(venue, year, Journal.BIBTEX_FETCHED)
+        return entry_list
+
+    def _store_entries(self, venue, year, entry_list):
         """
-        venues = entry["info"].get("venue", [])
-        if type(venues) is str:
-            venues = [venues]
-        return " and ".join(venues)
+        Log the number of entries of venue and year, store them and record them in the journal.
 
-    def _get_dblp_bibkey_from_entry(self, entry):
+        Args:
+            venue: The name of the venue, e.g. 'sigir'.
+            year: The year of the conference or journal, e.g. 1971.
+            entry_list: A list of entries-as-dictionaries.
+        """
+        row = StringIO()
+        writer(row, delimiter=",").writerow([venue, year, len(entry_list)])
+        self.logger.write("dblp_json_results.csv", row.getvalue())
+        self.logger.metrics.increment("entries_total", len(entry_list), venue=venue)
+        self.entry_store.save(venue, year, entry_list)
+        self.journal.record(venue, year, Journal.ENTRIES_FETCHED if entry_list else Journal.NO_ENTRIES, len(entry_list))
+
+    def _log_failure(self, venue, year):
         """
-        Generate dblp bibkey string string from entry as used in the bibtex
-        as provided by the dblp website. As entry as provided by the dblp API
-        does not contain the full dblp bibkey, "DBLP:" is prefixed.        
+        Log the exception raised while scraping venue and year, record the failure
+        in the journal and record venue and year in failed.json, which lists all
+        venues and years failed during this run.
 
         Args:
-            entry: Entry-as-dictionary as provided by the dblp API.
-        Returns:
-            String representation of the dblp bibkey of this entry.
+            venue: The name of the venue, e.g. 'sigir'.
+            year: The year of the conference or journal, e.g. 1971.
+        """
+        self.logger.log(traceback.format_exc())
+        self.journal.record(venue, year, Journal.FAILED)
+        failed_filepath = self.logger.logger_directory + sep + "failed.json"
+        with self.logger.lock:
+            if venue not in self.fails:
+                self.fails[venue] = []
+            if year not in self.fails[venue]:
+                self.fails[venue].append(year)
+            with open(failed_filepath + ".tmp", "w") as file:
+                dump({"venuetype":self.venuetype,"venues":self.fails}, file)
+            replace(failed_filepath + ".tmp", failed_filepath)
+
+    def close(self):
         """
-        return "DBLP" + ":" + entry["info"]["key"]
-    
-    def _get_ir_anthology_bibkey_from_entry(self, entry):
+        Write pending records of the bibtex cache to file and close it,
+        close the HTTP session, the API cache, the bibtex index and the bibkey registry, shut down
+        the format workers, write pending log messages and close the log files.
         """
-        Generate IR-Anthology bibkey from entry with the format
-        [VENUE]-[YEAR]-[ASCII-LAST-NAME-OF-FIRST-AUTHOR](-[index]
+        self.dblp_bibtex_scraper.close()
+        self.session.close()
+        self.api_cache.close()
+        self.bibtex_index.close()
+        self.bibkey_registry.close()
+        if self.format_executor:
+            self.format_executor.shutdown()
+        self.logger.close()
+
+    def generate_bibtex_string(self, entry_list, bibtex_list):
+        """
+        Generate a string of bibtex entries from a list of entries as provided by the
+        dblp API and a list of bibtex string as provided and scraped from the dblp website.
 
         Args:
-            entry: Entry-as-dictionary as provided by the dblp API.
+            entry_list: List of entries-as-dictionaries.
+            bibtex_list: List of bibtex string.
         Returns:
-            String representation of the IR-Anthology bibkey of this entry.
+            A string of bibtex entries which have been formatted.
         """
-        last_name_of_first_author = self._get_last_name_of_first_author_from_entry(entry)
-        return "-".join([{"conf":"conf","journals":"jrnl"}[self.venuetype],
-                         entry["info"].get("key").split("/")[1].lower(),
-                         entry["info"]["year"]] +
-                        ([last_name_of_first_author] if last_name_of_first_author else []))                
+        with self.logger.metrics.span("generate_bibtex_string"):
+            return "".join(self.generate_bibtex_records(entry_list, lambda index, entry: bibtex_list[index]))
 
-    def _get_last_name_of_first_author_from_entry(self, entry):
+    def _join_bibtex_lines(self, bibtex_lines):
         """
-        Get last name of first author of entry (ASCII formatted).
+        Concatenates a list of bibtex lines to a bibentry.
 
         Args:
-            entry: Entry-as-dictionary as provided by the dblp API.
+            bibtex_lines: List of bibtex lines.
         Returns:
-            String representing the last name of the first author.
+            A bibtex entry.
         """
-        #self.logger(str(entry))
-        authors = entry["info"].get("authors", {"author":""})["author"]
-        if type(authors) is list:
-            first_author = authors[0]["text"]
-        if type(authors) is dict:
-            first_author = authors["text"]
-        if type(authors) is str:
-            first_author = authors
-        return convert_string_to_ascii("".join([c for c in first_author if (c.isalpha() or c == " ")])
-                            .strip()
-                            .split(" ")[-1]
-                            .lower())
\ No newline at end of file
+        return join_bibtex_lines(bibtex_lines, self.bibtex_padding)
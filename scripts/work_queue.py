@@ -0,0 +1,188 @@
+import json
+import sqlite3
+from threading import Lock
+from time import time
+
+
+class WorkQueue:
+    """
+    Queue of the scrape tasks of venues and years shared by a coordinator and its workers,
+    stored in an SQLite database (on a file system shared by all of them, e.g. one machine).
+
+    Workers lease tasks for lease_seconds and renew the lease while running a task. A task
+    whose lease expires (e.g. as its worker crashed) is leased to the next worker asking for
+    a task, so no work is lost; a task leased max_attempts times without being completed fails.
+    Completed tasks carry the result of the worker until the coordinator marks them merged.
+
+    Tasks are leased in immediate transactions, so a task is never leased to two workers
+    at the same time.
+
+    Attributes:
+        filepath: The path to the database file.
+        max_attempts: The number of times a task is leased before it fails.
+    """
+
+    PENDING = "pending"
+    LEASED = "leased"
+    DONE = "done"
+    MERGED = "merged"
+    FAILED = "failed"
+
+    def __init__(self, filepath, max_attempts=3):
+        self.filepath = filepath
+        self.max_attempts = max_attempts
+        self.lock = Lock()
+        self.connection = sqlite3.connect(filepath, timeout=60, check_same_thread=False, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("CREATE TABLE IF NOT EXISTS tasks (id INTEGER PRIMARY KEY, venue TEXT NOT NULL, " +
+                                "year INTEGER NOT NULL, state TEXT NOT NULL, worker TEXT, lease_expires REAL, " +
+                                "attempts INTEGER NOT NULL, result TEXT, UNIQUE (venue, year))")
+
+    def put(self, jobs):
+        """
+        Add the tasks of venues and years to the queue. Tasks of venues and years already
+        in the queue are reset to pending, unless they are leased.
+
+        Args:
+            jobs: List of (venue, year) tuples.
+        """
+        with self.lock:
+            self._execute_in_transaction(lambda: self.connection.executemany(
+                "INSERT INTO tasks (venue, year, state, attempts) VALUES (?, ?, ?, 0) " +
+                "ON CONFLICT (venue, year) DO UPDATE SET state = excluded.state, worker = NULL, " +
+                "lease_expires = NULL, attempts = 0, result = NULL WHERE state != ?",
+                [(venue, year, self.PENDING, self.LEASED) for venue, year in jobs]))
+
+    def lease(self, worker, lease_seconds):
+        """
+        Lease the next pending task, or a task whose lease expired.
+
+        Args:
+            worker: The id of the worker, e.g. 'host-1234'.
+            lease_seconds: The number of seconds until the lease expires unless renewed.
+        Returns:
+            A tuple of task id, venue and year, or None if no task is available.
+        """
+        def lease():
+            now = time()
+            while True:
+                row = self.connection.execute("SELECT id, venue, year, attempts FROM tasks WHERE state = ? OR " +
+                                              "(state = ? AND lease_expires < ?) ORDER BY id LIMIT 1",
+                                              (self.PENDING, self.LEASED, now)).fetchone()
+                if row is None:
+                    return None
+                task_id, venue, year, attempts = row
+                # TASKS WHOSE WORKERS KEEP CRASHING FAIL INSTEAD OF BEING LEASED AGAIN
+                if attempts >= self.max_attempts:
+                    self.connection.execute("UPDATE tasks SET state = ?, worker = NULL WHERE id = ?", (self.FAILED, task_id))
+                    continue
+                self.connection.execute("UPDATE tasks SET state = ?, worker = ?, lease_expires = ?, attempts = ? " +
+                                        "WHERE id = ?", (self.LEASED, worker, now + lease_seconds, attempts + 1, task_id))
+                return task_id, venue, year
+        with self.lock:
+            return self._execute_in_transaction(lease)
+
+    def renew(self, task_id, worker, lease_seconds):
+        """
+        Renew the lease of a task.
+
+        Args:
+            task_id: The id of the task.
+            worker: The id of the worker holding the lease.
+            lease_seconds: The number of seconds until the lease expires unless renewed.
+        Returns:
+            Whether the lease was renewed, i.e. the worker still holds it.
+        """
+        with self.lock:
+            return self.connection.execute("UPDATE tasks SET lease_expires = ? WHERE id = ? AND worker = ? AND state = ?",
+                                           (time() + lease_seconds, task_id, worker, self.LEASED)).rowcount == 1
+
+    def complete(self, task_id, worker, result):
+        """
+        Complete a leased task.
+
+        Args:
+            task_id: The id of the task.
+            worker: The id of the worker holding the lease.
+            result: The result of the task (JSON-serializable).
+        Returns:
+            Whether the task was completed, i.e. the worker still held the lease.
+        """
+        with self.lock:
+            return self.connection.execute("UPDATE tasks SET state = ?, result = ? WHERE id = ? AND worker = ? AND state = ?",
+                                           (self.DONE, json.dumps(result), task_id, worker, self.LEASED)).rowcount == 1
+
+    def release(self, task_id, worker):
+        """
+        Release a leased task after it failed, so it is leased again (or fails, once
+        it was leased max_attempts times).
+
+        Args:
+            task_id: The id of the task.
+            worker: The id of the worker holding the lease.
+        """
+        with self.lock:
+            self.connection.execute("UPDATE tasks SET state = CASE WHEN attempts >= ? THEN ? ELSE ? END, worker = NULL, " +
+                                    "lease_expires = NULL WHERE id = ? AND worker = ? AND state = ?",
+                                    (self.max_attempts, self.FAILED, self.PENDING, task_id, worker, self.LEASED))
+
+    def mark_merged(self, task_id):
+        """
+        Mark a completed task as merged by the coordinator.
+
+        Args:
+            task_id: The id of the task.
+        """
+        with self.lock:
+            self.connection.execute("UPDATE tasks SET state = ? WHERE id = ?", (self.MERGED, task_id))
+
+    def get_tasks(self, state):
+        """
+        Get the tasks in a state.
+
+        Args:
+            state: The state, e.g. WorkQueue.DONE.
+        Returns:
+            A list of (task id, venue, year, result) tuples.
+        """
+        with self.lock:
+            rows = self.connection.execute("SELECT id, venue, year, result FROM tasks WHERE state = ? ORDER BY id",
+                                           (state,)).fetchall()
+        return [(task_id, venue, year, json.loads(result) if result else None) for task_id, venue, year, result in rows]
+
+    def counts(self):
+        """
+        Count the tasks by state.
+
+        Returns:
+            A dictionary of state and count key-value pairs.
+        """
+        with self.lock:
+            return dict(self.connection.execute("SELECT state, COUNT(*) FROM tasks GROUP BY state").fetchall())
+
+    def is_drained(self):
+        """
+        Check whether no task is pending or leased.
+
+        Returns:
+            Whether all tasks are done, merged or failed.
+        """
+        counts = self.counts()
+        return not counts.get(self.PENDING) and not counts.get(self.LEASED)
+
+    def close(self):
+        """
+        Close the queue.
+        """
+        with self.lock:
+            self.connection.close()
+
+    def _execute_in_transaction(self, function):
+        self.connection.execute("BEGIN IMMEDIATE")
+        try:
+            result = function()
+            self.connection.execute("COMMIT")
+        except:
+            self.connection.execute("ROLLBACK")
+            raise
+        return result
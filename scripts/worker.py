@@ -0,0 +1,96 @@
+from os.path import exists
+from threading import Event, Thread
+from time import sleep
+
+from scripts.journal import Journal
+
+
+class Worker:
+    """
+    Worker running the scrape tasks of venues and years leased from a work queue shared
+    with a coordinator (see Coordinator), e.g. one of several workers on one machine or
+    on machines sharing the file system of the queue.
+
+    The worker runs each task with its own scraper, i.e. into its own output directory,
+    and completes the task with the paths of its bibtex file, its stored entries and the
+    bibtex cache of the worker (the cache fragment), which the coordinator merges. While
+    a task runs, its lease is renewed every third of lease_seconds; a task that fails is
+    released, so it is leased again.
+
+    Attributes:
+        work_queue: The work queue.
+        scraper: The scraper of the worker.
+        worker_id: The id of the worker, e.g. 'host-1234'.
+        lease_seconds: The number of seconds a task is leased for.
+        poll_seconds: The number of seconds to wait for tasks while other workers still run tasks.
+        incremental: Whether to incrementally update existing bibtex files
+                     instead of skipping them.
+    """
+
+    def __init__(self, work_queue, scraper, worker_id, lease_seconds=300, poll_seconds=5, incremental=False):
+        self.work_queue = work_queue
+        self.scraper = scraper
+        self.worker_id = worker_id
+        self.lease_seconds = lease_seconds
+        self.poll_seconds = poll_seconds
+        self.incremental = incremental
+
+    def run(self):
+        """
+        Run tasks until no task is pending or leased by other workers.
+
+        Returns:
+            The number of tasks run.
+        """
+        count = 0
+        while True:
+            task = self.work_queue.lease(self.worker_id, self.lease_seconds)
+            if task is None:
+                # TASKS LEASED BY OTHER WORKERS MAY STILL BE RELEASED OR EXPIRE
+                if self.work_queue.is_drained():
+                    return count
+                sleep(self.poll_seconds)
+                continue
+            self.run_task(*task)
+            count += 1
+
+    def run_task(self, task_id, venue, year):
+        """
+        Run a leased task, renewing its lease while it runs, and complete or release it.
+
+        Args:
+            task_id: The id of the task.
+            venue: The name of the venue, e.g. 'sigir'.
+            year: The year of the conference or journal, e.g. 1971.
+        Returns:
+            Whether the task was completed.
+        """
+        self.scraper.logger.log("Worker " + self.worker_id + " running task " + venue + " " + str(year) + ".")
+        stopped = Event()
+        heartbeat = Thread(target=self._renew_lease, args=(task_id, stopped), daemon=True)
+        heartbeat.start()
+        try:
+            if self.incremental:
+                self.scraper.update_bibtex(venue, year)
+            else:
+                self.scraper.scrape_and_write_bibtex(venue, year)
+        finally:
+            stopped.set()
+            heartbeat.join()
+        stage = self.scraper.journal.get_stage(venue, year)
+        if stage not in Journal.FINISHED:
+            self.work_queue.release(task_id, self.worker_id)
+            return False
+        bib_filepath = self.scraper.get_bibtex_filepath(venue, year)
+        entries_filepath = self.scraper.entry_store.get_filepath(venue, year)
+        completed = self.work_queue.complete(task_id, self.worker_id, {
+            "bib_filepath":bib_filepath if stage == Journal.FILE_WRITTEN and exists(bib_filepath) else None,
+            "entries_filepath":entries_filepath if exists(entries_filepath) else None,
+            "bibtex_cache_filepath":self.scraper.dblp_bibtex_scraper.bibtex_cache_filepath})
+        if not completed:
+            self.scraper.logger.log("Worker " + self.worker_id + " lost the lease of task " + venue + " " + str(year) + ".")
+        return completed
+
+    def _renew_lease(self, task_id, stopped):
+        while not stopped.wait(self.lease_seconds / 3):
+            self.work_queue.renew(task_id, self.worker_id, self.lease_seconds)
@@ -0,0 +1,129 @@
+from gzip import compress
+from hashlib import sha1
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from json import dumps
+from re import match
+from threading import Thread
+from time import sleep
+from urllib.parse import parse_qs, urlparse
+
+
+class FakeDblpServer:
+    """
+    Local stand-in for dblp serving the search API (JSON and bibtex export)
+    and bibtex records of the given entries.
+
+    The URLs of the entries are rewritten to point to the fake server. Responses carry
+    an ETag, are answered with 304 (Not Modified) to matching conditional requests and
+    are gzip-compressed if requested.
+
+    Attributes:
+        entry_list: List of entries-as-dictionaries served by the API.
+        bibtex: Dictionary of dblp key and bibtex string key-value pairs.
+        url: The base URL of the server, e.g. 'http://127.0.0.1:8000'.
+        api_endpoint: The URL of the search API endpoint of the server.
+        requests: List of paths requested from the server.
+        failures: List of (status code, headers) pairs the next requests are answered
+                  with instead of being served, e.g. [(429, {"Retry-After":"1"})].
+        latency: Seconds each response is delayed by, e.g. to simulate the latency of dblp.
+    """
+
+    def __init__(self, entry_list, bibtex_list, latency=0):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), FakeDblpRequestHandler)
+        self.server.fake_dblp = self
+        self.url = "http://127.0.0.1:" + str(self.server.server_port)
+        self.api_endpoint = self.url + "/search/publ/api"
+        self.entry_list = [dict(entry, info=dict(entry["info"], url=self.url + "/rec/" + entry["info"]["key"]))
+                           for entry in entry_list]
+        self.bibtex = {entry["info"]["key"]:bibtex.strip() for entry, bibtex in zip(entry_list, bibtex_list)}
+        self.requests = []
+        self.failures = []
+        self.latency = latency
+        self.streams = {}
+        for entry in self.entry_list:
+            stream = "/".join(entry["info"]["key"].split("/")[:2])
+            self.streams.setdefault((stream, None), []).append(entry)
+            self.streams.setdefault((stream, entry["info"]["year"]), []).append(entry)
+        self.thread = Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def search(self, query):
+        """
+        Get entries matching a query of the format streamid:venuetype/venue:year:year,
+        or of several such queries combined with '|' (OR).
+
+        Args:
+            query: The query string.
+        Returns:
+            A list of matching entries-as-dictionaries.
+        """
+        entry_list = []
+        for term in query.split("|"):
+            stream = match(r"streamid:(\w+/\w+):(?:year:(\d+))?", term)
+            entry_list += self.streams.get((stream.group(1), stream.group(2)), [])
+        return entry_list
+
+
+class FakeDblpRequestHandler(BaseHTTPRequestHandler):
+    """
+    Request handler of the fake dblp server.
+    """
+
+    def do_GET(self):
+        fake_dblp = self.server.fake_dblp
+        url = urlparse(self.path)
+        fake_dblp.requests.append(url.path)
+        if fake_dblp.latency:
+            sleep(fake_dblp.latency)
+        if fake_dblp.failures:
+            status, headers = fake_dblp.failures.pop(0)
+            self._respond(status, "Failure", headers)
+        elif url.path == "/search/publ/api":
+            parameters = {key:value[0] for key, value in parse_qs(url.query).items()}
+            entry_list = fake_dblp.search(parameters["q"])
+            first = int(parameters.get("f", 0))
+            hits = entry_list[first:first + int(parameters.get("h", 30))]
+            if parameters.get("format", "xml") == "json":
+                body = dumps({"result":{"hits":{"@total":str(len(entry_list)),
+                                                "hit":hits} if hits else {"@total":str(len(entry_list))}}})
+            else:
+                body = "\n\n".join(fake_dblp.bibtex[hit["info"]["key"]] for hit in hits)
+            self._respond(200, body)
+        elif url.path.startswith("/rec/") and url.path.endswith(".bib"):
+            key = url.path[len("/rec/"):-len(".bib")]
+            if key in fake_dblp.bibtex:
+                self._respond(200, fake_dblp.bibtex[key] + "\n")
+            else:
+                self._respond(404, "Not Found")
+        else:
+            self._respond(404, "Not Found")
+
+    def _respond(self, status, body, headers={}):
+        body = body.encode("utf-8")
+        etag = '"' + sha1(body).hexdigest() + '"'
+        if status == 200 and self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        self.send_response(status)
+        if status == 200:
+            self.send_header("ETag", etag)
+        for header, value in headers.items():
+            self.send_header(header, value)
+        if "gzip" in self.headers.get("Accept-Encoding", ""):
+            body = compress(body)
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
@@ -0,0 +1,44 @@
+from os.path import sep
+from shutil import rmtree
+from tempfile import mkdtemp
+import unittest
+
+from scripts.dblp.api_cache import ApiCache
+
+
+class TestApiCache(unittest.TestCase):
+
+    def setUp(self):
+        self.output_directory = mkdtemp()
+        self.filepath = self.output_directory + sep + "dblp_api_cache.sqlite"
+        self.hits = [{"info":{"key":"conf/sigir/C71", "title":"Preface, Conference Committee.", "year":"1971"}}]
+
+    def tearDown(self):
+        rmtree(self.output_directory)
+
+    def test_get_and_put(self):
+        api_cache = ApiCache(self.filepath)
+        self.assertIsNone(api_cache.get("streamid:conf/sigir:year:1971&h=1000", 0))
+        api_cache.put("streamid:conf/sigir:year:1971&h=1000", 0, self.hits)
+        api_cache.put("streamid:conf/sigir:year:1971&h=1000", 1000, [])
+        self.assertEqual(api_cache.get("streamid:conf/sigir:year:1971&h=1000", 0), self.hits)
+        self.assertEqual(api_cache.get("streamid:conf/sigir:year:1971&h=1000", 1000), [])
+        api_cache.close()
+        # hits are persisted
+        api_cache = ApiCache(self.filepath)
+        self.assertEqual(api_cache.get("streamid:conf/sigir:year:1971&h=1000", 0), self.hits)
+        api_cache.close()
+
+    def test_ttl_and_force_refresh(self):
+        api_cache = ApiCache(self.filepath, ttl=-1)
+        api_cache.put("streamid:conf/sigir:year:1971&h=1000", 0, self.hits)
+        self.assertIsNone(api_cache.get("streamid:conf/sigir:year:1971&h=1000", 0))
+        api_cache.ttl = 60
+        self.assertEqual(api_cache.get("streamid:conf/sigir:year:1971&h=1000", 0), self.hits)
+        api_cache.force_refresh = True
+        self.assertIsNone(api_cache.get("streamid:conf/sigir:year:1971&h=1000", 0))
+        api_cache.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
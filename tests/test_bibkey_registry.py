@@ -0,0 +1,97 @@
+from concurrent.futures import ThreadPoolExecutor
+from json import load
+from os.path import sep
+from shutil import rmtree
+from tempfile import mkdtemp
+import unittest
+
+from scripts.bibkey_registry import BibkeyRegistry
+from scripts.scraper import Scraper
+
+
+class TestBibkeyRegistry(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.maxDiff = None
+        with open("tests/resources/sigir_1971_dblp.json") as file:
+            cls.sigir_1971_dblp_json = load(file)
+        with open("tests/resources/sigir_1971_dblp.bib") as file:
+            cls.sigir_1971_dblp_bibtex = "".join(file.readlines()).split("\n\n\n\n")
+        with open("tests/resources/sigir_1971_ir_anthology.bib") as file:
+            cls.sigir_1971_ir_anthology_bibtex = "".join(file.readlines())
+
+    def setUp(self):
+        self.output_directory = mkdtemp()
+        self.filepath = self.output_directory + sep + "bibkey_registry.sqlite"
+
+    def tearDown(self):
+        rmtree(self.output_directory)
+
+    def test_allocate(self):
+        bibkey_registry = BibkeyRegistry(self.filepath)
+        self.assertEqual([bibkey_registry.allocate(dblp_key, "conf-sigir-1971-minker")
+                          for dblp_key in ["conf/sigir/Minker71", "conf/sigir/MinkerPW71", "conf/sigir/Minker71a"]],
+                         ["conf-sigir-1971-minker", "conf-sigir-1971-minker-2", "conf-sigir-1971-minker-3"])
+        # assigned bibkeys are kept, regardless of the base bibkey and order
+        self.assertEqual(bibkey_registry.allocate("conf/sigir/Minker71a", "conf-sigir-1971-smith"), "conf-sigir-1971-minker-3")
+        self.assertEqual(bibkey_registry.get("conf/sigir/MinkerPW71"), "conf-sigir-1971-minker-2")
+        self.assertIsNone(bibkey_registry.get("conf/sigir/Smith71"))
+        # suffixed bibkeys clashing with the bibkey of another base are skipped
+        self.assertEqual(bibkey_registry.allocate("conf/sigir/X71", "conf-sigir-1971-minker-4"), "conf-sigir-1971-minker-4")
+        self.assertEqual(bibkey_registry.allocate("conf/sigir/Minker71b", "conf-sigir-1971-minker"), "conf-sigir-1971-minker-5")
+        bibkey_registry.close()
+        bibkey_registry = BibkeyRegistry(self.filepath)
+        self.assertEqual(bibkey_registry.allocate("conf/sigir/Minker71", "conf-sigir-1971-minker"), "conf-sigir-1971-minker")
+        self.assertEqual(len(bibkey_registry), 5)
+        bibkey_registry.close()
+
+    def test_suffixes(self):
+        # the first entry of a bibkey receives no suffix, the second ends in -2, the third in -3, and so on
+        bibkey_registry = BibkeyRegistry(self.filepath)
+        self.assertEqual(bibkey_registry.allocate_many([("conf/test/" + str(index), bibkey) for index, bibkey in
+                                                        enumerate(["author1", "author2", "author1", "author1", "author1", "author2"])]),
+                         ["author1", "author2", "author1-2", "author1-3", "author1-4", "author2-2"])
+        bibkey_registry.close()
+
+    def test_allocate_many(self):
+        bibkey_registry = BibkeyRegistry(self.filepath)
+        bibkey_registry.allocate("conf/sigir/Minker71", "conf-sigir-1971-minker")
+        self.assertEqual(bibkey_registry.allocate_many([("conf/sigir/MinkerPW71", "conf-sigir-1971-minker"),
+                                                        ("conf/sigir/Minker71", "conf-sigir-1971-minker"),
+                                                        ("conf/sigir/Choueka71", "conf-sigir-1971-choueka"),
+                                                        ("conf/sigir/Minker71a", "conf-sigir-1971-minker")]),
+                         ["conf-sigir-1971-minker-2", "conf-sigir-1971-minker", "conf-sigir-1971-choueka",
+                          "conf-sigir-1971-minker-3"])
+        self.assertEqual(bibkey_registry.allocate_many([]), [])
+        bibkey_registry.close()
+
+    def test_allocate_concurrently(self):
+        bibkey_registries = [BibkeyRegistry(self.filepath) for _ in range(4)]
+        dblp_keys = ["conf/sigir/Minker71" + str(index) for index in range(200)]
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            bibkeys = list(executor.map(lambda index: bibkey_registries[index % 4].allocate(dblp_keys[index // 2],
+                                                                                              "conf-sigir-1971-minker"),
+                                        range(400)))
+        # every dblp key is assigned one bibkey, and no bibkey is assigned twice
+        self.assertEqual(bibkeys[0::2], bibkeys[1::2])
+        self.assertEqual(sorted(set(bibkeys)),
+                         sorted(["conf-sigir-1971-minker"] + ["conf-sigir-1971-minker-" + str(index) for index in range(2, 201)]))
+        for bibkey_registry in bibkey_registries:
+            bibkey_registry.close()
+
+    def test_stable_bibkeys(self):
+        # bibkeys assigned in one run are kept when the dblp API returns entries in another order
+        for entry_list in [self.sigir_1971_dblp_json, self.sigir_1971_dblp_json[::-1]]:
+            scraper = Scraper(venuetype="conf",
+                              output_directory=self.output_directory,
+                              bibtex_cache_filepath=None)
+            bibtex_list = self.sigir_1971_dblp_bibtex if entry_list is self.sigir_1971_dblp_json else self.sigir_1971_dblp_bibtex[::-1]
+            bibtex = scraper.generate_bibtex_string(entry_list, bibtex_list)
+            scraper.close()
+        self.assertEqual(sorted(bibtex.strip().split("\n\n\n")),
+                         sorted(self.sigir_1971_ir_anthology_bibtex.strip().split("\n\n\n")))
+
+
+if __name__ == "__main__":
+    unittest.main()
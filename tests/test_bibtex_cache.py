@@ -0,0 +1,94 @@
+from json import dumps, loads
+from os.path import sep
+from shutil import rmtree
+from tempfile import mkdtemp
+import sqlite3
+import unittest
+
+from scripts.dblp.bibtex_cache import BibtexCache, JsonlBibtexCache, SqliteBibtexCache, open_bibtex_cache
+
+
+class TestBibtexCache(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        with open("tests/resources/sigir_1971_dblp.bib") as file:
+            bibtex_list = "".join(file.readlines()).split("\n\n\n\n")
+        cls.records = [["https://dblp.org/rec/conf/sigir/" + str(index), bibtex.strip() + "\n\n\n"]
+                       for index, bibtex in enumerate(bibtex_list)]
+
+    def setUp(self):
+        self.output_directory = mkdtemp()
+        self.jsonl_filepath = self.output_directory + sep + "dblp_bibtex_cache.txt"
+        with open(self.jsonl_filepath, "w") as file:
+            for url, bibtex in self.records:
+                file.write(dumps([url, bibtex]) + "\n")
+
+    def tearDown(self):
+        rmtree(self.output_directory)
+
+    def test_open_bibtex_cache(self):
+        self.assertIsInstance(open_bibtex_cache(self.jsonl_filepath), JsonlBibtexCache)
+        bibtex_cache = open_bibtex_cache(self.output_directory + sep + "dblp_bibtex_cache.sqlite")
+        self.assertIsInstance(bibtex_cache, SqliteBibtexCache)
+        bibtex_cache.close()
+
+    def test_incomplete_bibtex_cache(self):
+        class IncompleteBibtexCache(BibtexCache):
+            def get(self, url, default=None):
+                return default
+        with self.assertRaises(TypeError):
+            IncompleteBibtexCache(self.jsonl_filepath)
+
+    def test_jsonl_bibtex_cache(self):
+        bibtex_cache = JsonlBibtexCache(self.jsonl_filepath, batch_size=2)
+        self.assertEqual(len(bibtex_cache), len(self.records))
+        self.assertEqual(bibtex_cache[self.records[3][0]], self.records[3][1])
+        bibtex_cache.put("https://dblp.org/rec/conf/sigir/new", "@inproceedings{new}")
+        self.assertIn("https://dblp.org/rec/conf/sigir/new", bibtex_cache)
+        self.assertNotIn("https://dblp.org/rec/conf/sigir/missing", bibtex_cache)
+        # pending record is written on close
+        bibtex_cache.close()
+        with open(self.jsonl_filepath) as file:
+            self.assertEqual(loads(file.readlines()[-1]), ["https://dblp.org/rec/conf/sigir/new", "@inproceedings{new}"])
+
+    def test_sqlite_bibtex_cache(self):
+        bibtex_cache = SqliteBibtexCache(self.output_directory + sep + "dblp_bibtex_cache.sqlite", batch_size=5)
+        self.assertEqual(bibtex_cache.import_jsonl(self.jsonl_filepath), len(self.records))
+        self.assertEqual(len(bibtex_cache), len(self.records))
+        self.assertEqual(bibtex_cache.get(self.records[3][0]), self.records[3][1])
+        self.assertIsNone(bibtex_cache.get("https://dblp.org/rec/conf/sigir/missing"))
+        with self.assertRaises(KeyError):
+            bibtex_cache["https://dblp.org/rec/conf/sigir/missing"]
+        bibtex_cache.put(self.records[3][0], "@inproceedings{replaced}")
+        self.assertEqual(bibtex_cache[self.records[3][0]], "@inproceedings{replaced}")
+        bibtex_cache.close()
+
+        bibtex_cache = SqliteBibtexCache(self.output_directory + sep + "dblp_bibtex_cache.sqlite")
+        self.assertEqual(bibtex_cache[self.records[3][0]], "@inproceedings{replaced}")
+        exported_filepath = self.output_directory + sep + "exported.txt"
+        self.assertEqual(bibtex_cache.export_jsonl(exported_filepath), len(self.records))
+        bibtex_cache.close()
+        with open(exported_filepath) as file:
+            exported = dict(loads(line) for line in file)
+        self.assertEqual(exported, dict(self.records, **{self.records[3][0]:"@inproceedings{replaced}"}))
+
+    def test_read_only_sqlite_bibtex_cache(self):
+        filepath = self.output_directory + sep + "dblp_bibtex_cache.sqlite"
+        bibtex_cache = SqliteBibtexCache(filepath)
+        # a partially written last record is skipped when importing
+        with open(self.jsonl_filepath, "a") as file:
+            file.write("[\"https://dblp.org/rec/conf/sigir/partial")
+        self.assertEqual(bibtex_cache.import_jsonl(self.jsonl_filepath), len(self.records))
+        bibtex_cache.close()
+        bibtex_cache = SqliteBibtexCache(filepath, read_only=True)
+        self.assertEqual(bibtex_cache[self.records[3][0]], self.records[3][1])
+        self.assertNotIn("https://dblp.org/rec/conf/sigir/partial", bibtex_cache)
+        bibtex_cache.put(self.records[3][0], "@inproceedings{replaced}")
+        with self.assertRaises(sqlite3.OperationalError):
+            bibtex_cache.flush()
+        bibtex_cache.connection.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+from json import dumps, loads
+from os.path import sep
+from shutil import rmtree
+from tempfile import mkdtemp
+import unittest
+
+from scripts.dblp.bibtex_cache import open_bibtex_cache
+from utils.bibtex_cache_combiner import combine_bibtex_caches
+
+
+class TestBibtexCacheCombiner(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        with open("tests/resources/sigir_1971_dblp.bib") as file:
+            bibtex_list = "".join(file.readlines()).split("\n\n\n\n")
+        cls.records = [["https://dblp.org/rec/conf/sigir/" + str(index).rjust(2, "0"), bibtex.strip() + "\n\n\n"]
+                       for index, bibtex in enumerate(bibtex_list)]
+
+    def setUp(self):
+        self.output_directory = mkdtemp()
+        # FIRST CACHE: EVEN RECORDS IN REVERSE ORDER, RECORD 0 WRITTEN TWICE (THE LATER ONE IS CURRENT)
+        self.input_filepaths = [self.output_directory + sep + "dblp_bibtex_cache1.txt",
+                                self.output_directory + sep + "dblp_bibtex_cache2.txt",
+                                self.output_directory + sep + "dblp_bibtex_cache3.sqlite"]
+        with open(self.input_filepaths[0], "w") as file:
+            file.write(dumps([self.records[0][0], "@inproceedings{outdated}"]) + "\n")
+            for url, bibtex in self.records[::2][::-1]:
+                file.write(dumps([url, bibtex]) + "\n")
+            file.write("[\"https://dblp.org/rec/conf/sigir/partial")
+        # SECOND CACHE: ALL RECORDS, RECORD 2 CHANGED
+        with open(self.input_filepaths[1], "w") as file:
+            for url, bibtex in self.records:
+                file.write(dumps([url, bibtex.replace("DBLP", "CHANGED") if url == self.records[2][0] else bibtex]) + "\n")
+        # THIRD CACHE: RECORD 2 CHANGED AS IN THE SECOND CACHE, RECORD 4 CHANGED
+        bibtex_cache = open_bibtex_cache(self.input_filepaths[2])
+        bibtex_cache.put(self.records[2][0], self.records[2][1].replace("DBLP", "CHANGED"))
+        bibtex_cache.put(self.records[4][0], "@inproceedings{changed}")
+        bibtex_cache.close()
+
+    def tearDown(self):
+        rmtree(self.output_directory)
+
+    def test_combine_bibtex_caches(self):
+        for output_filename in ["dblp_bibtex_cache.txt", "dblp_bibtex_cache.sqlite"]:
+            output_filepath = self.output_directory + sep + output_filename
+            stats = combine_bibtex_caches(self.input_filepaths, output_filepath, run_size=2)
+            self.assertEqual(stats, {"records":len(self.records[::2]) + 1 + len(self.records) + 2,
+                                     "urls":len(self.records),
+                                     "conflicts":2})
+            bibtex_cache = open_bibtex_cache(output_filepath)
+            # RECORDS ARE WRITTEN IN URL ORDER, FROM THE FIRST CACHE CONTAINING THEM
+            self.assertEqual([list(record) for record in bibtex_cache.items()], self.records)
+            bibtex_cache.close()
+
+    def test_conflict_report(self):
+        output_filepath = self.output_directory + sep + "dblp_bibtex_cache.txt"
+        combine_bibtex_caches(self.input_filepaths, output_filepath, run_size=3, workers=1)
+        with open(self.output_directory + sep + "dblp_bibtex_cache_conflicts.jsonl") as file:
+            conflicts = [loads(line) for line in file]
+        self.assertEqual([conflict["url"] for conflict in conflicts], [self.records[2][0], self.records[4][0]])
+        self.assertEqual(conflicts[0]["kept"], self.input_filepaths[0])
+        self.assertEqual([(version["inputs"], version["bibtex"]) for version in conflicts[0]["versions"]],
+                         [([self.input_filepaths[0]], self.records[2][1]),
+                          (self.input_filepaths[1:], self.records[2][1].replace("DBLP", "CHANGED"))])
+        self.assertEqual(len(conflicts[1]["versions"]), 2)
+
+    def test_existing_output(self):
+        with self.assertRaises(FileExistsError):
+            combine_bibtex_caches(self.input_filepaths[:2], self.input_filepaths[2])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+from json import load
+from os.path import sep
+from shutil import rmtree
+from tempfile import mkdtemp
+import unittest
+
+from scripts.bibtex_index import BibtexIndex
+from scripts.scraper import Scraper
+
+
+class TestBibtexIndex(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.maxDiff = None
+
+        # Potthast 2021 test resources
+        with open("tests/resources/PotthastGBBBFKN21_dblp.json") as file:
+            cls.PotthastGBBBFKN21_dblp_json = load(file)
+        with open("tests/resources/PotthastGBBBFKN21_dblp.bib") as file:
+            cls.PotthastGBBBFKN21_dblp_bibtex = "".join(file.readlines()).split("\n\n\n\n")
+        with open("tests/resources/PotthastGBBBFKN21_ir_anthology.bib") as file:
+            cls.PotthastGBBBFKN21_ir_anthology_bibtex = "".join(file.readlines())
+
+        # SIGIR 1971 test resources
+        with open("tests/resources/sigir_1971_dblp.json") as file:
+            cls.sigir_1971_dblp_json = load(file)
+        with open("tests/resources/sigir_1971_dblp.bib") as file:
+            cls.sigir_1971_dblp_bibtex = "".join(file.readlines()).split("\n\n\n\n")
+        with open("tests/resources/sigir_1971_ir_anthology.bib") as file:
+            cls.sigir_1971_ir_anthology_bibtex = "".join(file.readlines())
+
+    def setUp(self):
+        self.output_directory = mkdtemp()
+        self.scraper = Scraper(venuetype="conf",
+                               output_directory=self.output_directory,
+                               bibtex_cache_filepath=None)
+        self.bib_filepaths = {}
+        for venue_year, entry_list, bibtex_list in [(("sigir", 1971), self.sigir_1971_dblp_json, self.sigir_1971_dblp_bibtex),
+                                                    (("sigir", 2021), self.PotthastGBBBFKN21_dblp_json, self.PotthastGBBBFKN21_dblp_bibtex)]:
+            bibtex_records = self.scraper.generate_bibtex_records(entry_list, lambda index, entry: bibtex_list[index])
+            self.bib_filepaths[venue_year] = self.scraper.write_bibtex_file(*venue_year, bibtex_records)
+
+    def tearDown(self):
+        self.scraper.close()
+        rmtree(self.output_directory)
+
+    def _split(self, ir_anthology_bibtex):
+        return [bibtex + "\n\n\n" for bibtex in ir_anthology_bibtex.strip().split("\n\n\n")]
+
+    def test_get(self):
+        bibtex_index = self.scraper.bibtex_index
+        potthast, proceedings = self._split(self.PotthastGBBBFKN21_ir_anthology_bibtex)
+        self.assertEqual(bibtex_index.get("conf-sigir-2021-potthast"), potthast)
+        self.assertEqual(bibtex_index.get("conf-sigir-2021"), proceedings)
+        self.assertIsNone(bibtex_index.get("conf-sigir-2021-smith"))
+        filepath, offset, length = bibtex_index.locate("conf-sigir-2021")
+        self.assertEqual(filepath, self.bib_filepaths[("sigir", 2021)])
+        self.assertEqual(offset, len(potthast.encode("utf-8")))
+        self.assertEqual(length, len(proceedings.encode("utf-8")))
+
+    def test_get_by(self):
+        bibtex_index = self.scraper.bibtex_index
+        potthast, proceedings = self._split(self.PotthastGBBBFKN21_ir_anthology_bibtex)
+        self.assertEqual(bibtex_index.get_by_dblp_key("conf/sigir/PotthastGBBBFKN21"), [potthast])
+        self.assertEqual(bibtex_index.get_by_pid("87/6573"), [potthast])
+        self.assertEqual(bibtex_index.get_by_pid("38/2451-1"), [potthast, proceedings])
+        self.assertEqual("".join(bibtex_index.get_by_venue("sigir", 1971)), self.sigir_1971_ir_anthology_bibtex)
+        self.assertEqual(len(bibtex_index.get_by_venue("sigir")), 23)
+        self.assertEqual(bibtex_index.get_by_venue("sigir", 1975), [])
+
+    def test_rewrite(self):
+        # rewriting a bibtex file replaces its entries in the index
+        bibtex_records = self.scraper.generate_bibtex_records(self.PotthastGBBBFKN21_dblp_json[:1],
+                                                              lambda index, entry: self.PotthastGBBBFKN21_dblp_bibtex[index])
+        self.scraper.write_bibtex_file("sigir", 2021, bibtex_records, overwrite=True)
+        self.assertIsNone(self.scraper.bibtex_index.get("conf-sigir-2021"))
+        self.assertEqual(len(self.scraper.bibtex_index.get_by_venue("sigir", 2021)), 1)
+
+    def test_add_file(self):
+        bibtex_index = BibtexIndex(self.output_directory + sep + "bibtex_index_files.sqlite")
+        for (venue, year), bib_filepath in self.bib_filepaths.items():
+            bibtex_index.add_file(venue, year, bib_filepath)
+        for bibkey in ["conf-sigir-1971-choueka", "conf-sigir-1971-minker-2", "conf-sigir-2021-potthast"]:
+            self.assertEqual(bibtex_index.locate(bibkey), self.scraper.bibtex_index.locate(bibkey))
+        bibtex_index.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+import unittest
+
+from scripts.bibtex_record import BibtexRecord, join_bibtex_lines
+
+
+class TestBibtexRecord(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.maxDiff = None
+        with open("tests/resources/PotthastGBBBFKN21_dblp.bib") as file:
+            cls.PotthastGBBBFKN21_dblp_bibtex = "".join(file.readlines()).split("\n\n\n\n")
+        with open("tests/resources/mocked_dblp.bib") as file:
+            cls.mocked_dblp_bibtex = "".join(file.readlines()).split("\n\n\n\n")
+
+    def test_parse(self):
+        record = BibtexRecord(self.PotthastGBBBFKN21_dblp_bibtex[0])
+        self.assertEqual(record.header, "@inproceedings{DBLP:conf/sigir/PotthastGBBBFKN21,")
+        self.assertEqual(record.closing, "}")
+        self.assertEqual(len(record.lines), 12)
+        self.assertEqual(record.lines[2], "  title        = {The Information Retrieval Anthology},")
+        self.assertTrue(record.author.startswith("{Martin Potthast and Sebastian G{\\\"{u}}nther and"))
+        self.assertEqual(record.editor, ("{Fernando Diaz and Chirag Shah and Torsten Suel and " +
+                                         "Pablo Castells and Rosie Jones and Tetsuya Sakai}"))
+
+    def test_parse_without_author(self):
+        record = BibtexRecord(self.mocked_dblp_bibtex[0])
+        self.assertIsNone(record.author)
+        self.assertEqual(record.editor, "{Jack Doe}")
+
+    def test_render(self):
+        record = BibtexRecord(self.mocked_dblp_bibtex[0])
+        self.assertEqual(record.render("@inproceedings{conf-test-2023-doe,", record.lines, "\n\n\n"),
+                         ("@inproceedings{conf-test-2023-doe,\n" +
+                          "\n".join(record.lines) + "\n}\n\n\n"))
+
+    def test_join_bibtex_lines(self):
+        self.assertEqual(join_bibtex_lines(["@inproceedings{test,", "  title = {A},", "", "  year = {2023}", "}"], ""),
+                         "@inproceedings{test,\n  title = {A},\n  year = {2023}\n}")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,8 @@
 from os import makedirs
 from scripts.dblp.bibtex_scraper import BibtexScraper
 from json import load
+from shutil import rmtree
+from tempfile import mkdtemp
 import unittest
 
 from scripts.logger import Logger
@@ -29,6 +31,26 @@ class TestBibtexScraper(unittest.TestCase):
     def test_scrape_bibtex(self):     
         bibtex_string_scraped = self.dblp_bibtex_scraper.scrape_bibtex(self.PotthastGBBBFKN21_dblp_json[0])
         self.assertEqual(bibtex_string_scraped.strip(), self.PotthastGBBBFKN21_dblp_bibtex[0].strip())
+
+    def test_split_bulk_bibtex(self):
+        bulk_bibtex = "\n".join(self.PotthastGBBBFKN21_dblp_bibtex)
+        records = self.dblp_bibtex_scraper._split_bulk_bibtex(bulk_bibtex)
+        self.assertEqual(list(records.keys()), ["conf/sigir/PotthastGBBBFKN21", "conf/sigir/2021"])
+        self.assertEqual(list(records.values()), [bibtex.strip() for bibtex in self.PotthastGBBBFKN21_dblp_bibtex])
+
+    def test_scrape_bibtex_bulk_from_cache(self):
+        output_directory = mkdtemp()
+        dblp_bibtex_scraper = BibtexScraper(venuetype="conf",
+                                            logger=self.dblp_bibtex_scraper.logger,
+                                            output_directory=output_directory,
+                                            bibtex_cache_filepath=output_directory + "/dblp_bibtex_cache.sqlite",
+                                            bibtex_padding="\n\n\n")
+        for entry, bibtex in zip(self.PotthastGBBBFKN21_dblp_json, self.PotthastGBBBFKN21_dblp_bibtex):
+            dblp_bibtex_scraper.bibtex_cache.put(entry["info"]["url"], bibtex)
+        bibtex_list = dblp_bibtex_scraper.scrape_bibtex_bulk("sigir", 2021, self.PotthastGBBBFKN21_dblp_json)
+        self.assertEqual(bibtex_list, [bibtex.strip() + "\n\n\n" for bibtex in self.PotthastGBBBFKN21_dblp_bibtex])
+        dblp_bibtex_scraper.close()
+        rmtree(output_directory)
                                                        
         
 if __name__ == "__main__":
@@ -0,0 +1,93 @@
+from json import load
+from os.path import sep
+from shutil import rmtree
+from tempfile import mkdtemp
+from threading import Thread
+import unittest
+
+from scripts.bibkey_registry import BibkeyRegistry
+from scripts.coordinator import Coordinator
+from scripts.scraper import Scraper
+from scripts.work_queue import WorkQueue
+from scripts.worker import Worker
+from tests.fake_dblp_server import FakeDblpServer
+from utils.rate_limiter import RateLimiter
+
+
+class TestCoordinator(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.maxDiff = None
+        with open("tests/resources/sigir_1971_dblp.json") as file:
+            cls.sigir_1971_dblp_json = load(file)
+        with open("tests/resources/sigir_1971_dblp.bib") as file:
+            cls.sigir_1971_dblp_bibtex = "".join(file.readlines()).split("\n\n\n\n")
+        with open("tests/resources/sigir_1971_ir_anthology.bib") as file:
+            cls.sigir_1971_ir_anthology_bibtex = "".join(file.readlines())
+        with open("tests/resources/mocked_dblp.json") as file:
+            cls.mocked_dblp_json = load(file)
+        with open("tests/resources/mocked_dblp.bib") as file:
+            cls.mocked_dblp_bibtex = "".join(file.readlines()).split("\n\n\n\n")
+        with open("tests/resources/mocked_ir_anthology.bib") as file:
+            cls.mocked_ir_anthology_bibtex = "".join(file.readlines())
+
+    def setUp(self):
+        self.output_directory = mkdtemp()
+
+    def tearDown(self):
+        rmtree(self.output_directory)
+
+    def _get_scraper(self, fake_dblp, output_directory, bibkey_registry=None):
+        scraper = Scraper(venuetype="conf",
+                          output_directory=output_directory,
+                          bibtex_cache_filepath=output_directory + sep + "dblp_bibtex_cache.sqlite",
+                          rate_limiter=RateLimiter(default_rate=None),
+                          bibkey_registry=bibkey_registry)
+        scraper.dblp_entry_scraper.api_endpoint = fake_dblp.api_endpoint
+        scraper.dblp_bibtex_scraper.bulk_endpoint = fake_dblp.api_endpoint
+        return scraper
+
+    def _read(self, filepath):
+        with open(filepath) as file:
+            return file.read()
+
+    def test_run(self):
+        work_queue = WorkQueue(self.output_directory + sep + "work_queue.sqlite")
+        with FakeDblpServer(self.sigir_1971_dblp_json + self.mocked_dblp_json,
+                            self.sigir_1971_dblp_bibtex + self.mocked_dblp_bibtex) as fake_dblp:
+            scraper = self._get_scraper(fake_dblp, self.output_directory)
+            workers = [Worker(work_queue,
+                              self._get_scraper(fake_dblp, sep.join([self.output_directory, "_workers", str(index)]),
+                                                BibkeyRegistry(sep.join([self.output_directory, "conf", "bibkey_registry.sqlite"]))),
+                              "worker-" + str(index), lease_seconds=0.5, poll_seconds=0.1)
+                       for index in range(2)]
+            # A WORKER CRASHED WHILE RUNNING TASK SIGIR 1971, WHICH IS LEASED AGAIN ONCE THE LEASE EXPIRES
+            work_queue.put([("sigir", 1971)])
+            work_queue.lease("crashed-worker", 0.5)
+            threads = [Thread(target=worker.run) for worker in workers]
+            for thread in threads:
+                thread.start()
+            results = Coordinator(scraper, work_queue, poll_seconds=0.1).run({"sigir":[1971, 1975], "test":[2023]})
+            for thread in threads:
+                thread.join()
+        self.assertEqual(list(results.keys()), [("sigir", 1971), ("sigir", 1975), ("test", 2023)])
+        self.assertEqual(results[("sigir", 1971)], scraper.get_bibtex_filepath("sigir", 1971))
+        self.assertEqual(self._read(results[("sigir", 1971)]), self.sigir_1971_ir_anthology_bibtex)
+        self.assertIsNone(results[("sigir", 1975)])
+        self.assertEqual(self._read(results[("test", 2023)]), self.mocked_ir_anthology_bibtex)
+        self.assertEqual(work_queue.counts(), {WorkQueue.MERGED:3})
+        # THE RESULTS OF THE WORKERS ARE MERGED INTO THE OUTPUT DIRECTORY OF THE COORDINATOR
+        self.assertTrue(scraper.journal.is_finished("sigir", 1975))
+        self.assertEqual(len(scraper.entry_store.load("sigir", 1971)), len(self.sigir_1971_dblp_json))
+        self.assertEqual(scraper.bibtex_index.locate("conf-sigir-1971-minker")[0], results[("sigir", 1971)])
+        self.assertEqual(len(scraper.dblp_bibtex_scraper.bibtex_cache),
+                         len(self.sigir_1971_dblp_json) + len(self.mocked_dblp_json))
+        for worker in workers:
+            worker.scraper.close()
+        scraper.close()
+        work_queue.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+import gzip
+from json import load
+from os.path import sep
+from re import sub
+from shutil import copyfileobj, rmtree
+from tempfile import mkdtemp
+import unittest
+
+from scripts.bibtex_record import BibtexRecord
+from scripts.dblp.dump_scraper import DumpScraper
+from scripts.logger import Logger
+from scripts.scraper import Scraper
+
+
+class TestDumpScraper(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.maxDiff = None
+
+        # dblp XML dump of SIGIR 1971, Potthast 2021 and unrelated records
+        cls.dump_filepath = "tests/resources/dblp_dump.xml"
+
+        # SIGIR 1971 test resources
+        with open("tests/resources/sigir_1971_dblp.json") as file:
+            cls.sigir_1971_dblp_json = load(file)
+        with open("tests/resources/sigir_1971_dblp.bib") as file:
+            cls.sigir_1971_dblp_bibtex = "".join(file.readlines()).split("\n\n\n\n")
+        with open("tests/resources/sigir_1971_ir_anthology.bib") as file:
+            cls.sigir_1971_ir_anthology_bibtex = "".join(file.readlines())
+
+        # Potthast 2021 test resources
+        with open("tests/resources/PotthastGBBBFKN21_dblp.json") as file:
+            cls.PotthastGBBBFKN21_dblp_json = load(file)
+        with open("tests/resources/PotthastGBBBFKN21_dblp.bib") as file:
+            cls.PotthastGBBBFKN21_dblp_bibtex = "".join(file.readlines()).split("\n\n\n\n")
+        with open("tests/resources/PotthastGBBBFKN21_ir_anthology.bib") as file:
+            cls.PotthastGBBBFKN21_ir_anthology_bibtex = "".join(file.readlines())
+
+    def setUp(self):
+        self.output_directory = mkdtemp()
+        self.logger = Logger(self.output_directory)
+
+    def tearDown(self):
+        self.logger.close()
+        rmtree(self.output_directory)
+
+    def _strip_timestamps(self, bibtex):
+        # the dump contains the date but not the time of the last modification
+        return sub(r"  timestamp    = \{[^}]*\},?\n", "", bibtex)
+
+    def _normalize(self, bibtex):
+        # line breaks within values may differ from the bibtex export of dblp
+        record = BibtexRecord(bibtex)
+        return [record.header] + [line for line in record.lines if not line.startswith("  timestamp")]
+
+    def test_scrape(self):
+        results = DumpScraper("conf", self.logger, self.dump_filepath, "\n\n\n").scrape({"sigir":[1971, 1975, 2021]})
+        self.assertEqual(list(results.keys()), [("sigir", 1971), ("sigir", 1975), ("sigir", 2021)])
+        self.assertEqual(results[("sigir", 1975)], ([], []))
+        for (entry_list, bibtex_list), dblp_json, dblp_bibtex in [
+                (results[("sigir", 1971)], self.sigir_1971_dblp_json, self.sigir_1971_dblp_bibtex),
+                (results[("sigir", 2021)], self.PotthastGBBBFKN21_dblp_json, self.PotthastGBBBFKN21_dblp_bibtex)]:
+            self.assertEqual([entry["info"]["key"] for entry in entry_list], [entry["info"]["key"] for entry in dblp_json])
+            for entry, dblp_entry in zip(entry_list, dblp_json):
+                for field in ["authors", "venue", "pages", "year", "type", "key", "doi", "ee", "url"]:
+                    self.assertEqual(entry["info"].get(field), dblp_entry["info"].get(field))
+            self.assertEqual([self._normalize(bibtex) for bibtex in bibtex_list],
+                             [self._normalize(bibtex) for bibtex in dblp_bibtex])
+            self.assertTrue(all(bibtex.endswith("}\n\n\n") for bibtex in bibtex_list))
+
+    def test_scrape_gzip(self):
+        dump_filepath = self.output_directory + sep + "dblp.xml.gz"
+        with open(self.dump_filepath, "rb") as file, gzip.open(dump_filepath, "wb") as gzip_file:
+            copyfileobj(file, gzip_file)
+        results = DumpScraper("conf", self.logger, dump_filepath, "\n\n\n", chunk_size=256).scrape({"sigir":[2021]})
+        entry_list, bibtex_list = results[("sigir", 2021)]
+        self.assertEqual(entry_list[0]["info"]["authors"]["author"][1], {"@pid":"67/6306-2", "text":"Sebastian Günther 0002"})
+        self.assertIn("Sebastian G{\\\"{u}}nther and", bibtex_list[0])
+
+    def test_write_bibtex_from_dump(self):
+        scraper = Scraper(venuetype="conf",
+                          output_directory=self.output_directory,
+                          bibtex_cache_filepath=None)
+        results = scraper.write_bibtex_from_dump(self.dump_filepath, {"sigir":[1971, 2021]})
+        scraper.close()
+        for venue_year, ir_anthology_bibtex in [(("sigir", 1971), self.sigir_1971_ir_anthology_bibtex),
+                                                (("sigir", 2021), self.PotthastGBBBFKN21_ir_anthology_bibtex)]:
+            with open(results[venue_year]) as file:
+                self.assertEqual(self._strip_timestamps(file.read()), self._strip_timestamps(ir_anthology_bibtex))
+            self.assertTrue(scraper.journal.is_finished(*venue_year))
+        self.assertEqual(scraper.entry_store.venue_years(), [("sigir", 1971), ("sigir", 2021)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+from json import load
+from pickle import dumps, loads
+import unittest
+
+from scripts.dblp.entry import Entry
+
+
+class TestEntry(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        with open("tests/resources/PotthastGBBBFKN21_dblp.json") as file:
+            cls.PotthastGBBBFKN21_dblp_json = load(file)
+        with open("tests/resources/mocked_dblp.json") as file:
+            cls.mocked_dblp_json = load(file)
+
+    def test_from_dict(self):
+        entry = Entry.from_dict(self.PotthastGBBBFKN21_dblp_json[0])
+        self.assertEqual(entry.key, "conf/sigir/PotthastGBBBFKN21")
+        self.assertEqual(entry.type, "Conference and Workshop Papers")
+        self.assertEqual(entry.year, "2021")
+        self.assertEqual(entry.venues, ("SIGIR",))
+        self.assertEqual(len(entry.authors), 11)
+        self.assertEqual(entry.authors[1], ("67/6306-2", "Sebastian Günther 0002"))
+
+    def test_from_dict_normalizes_persons_and_venues(self):
+        info = {"key":"conf/test/Doe23", "type":"Conference and Workshop Papers", "year":"2023",
+                "url":"https://dblp.org/rec/conf/test/Doe23"}
+        self.assertEqual(Entry.from_dict({"info":info}).venues, ())
+        self.assertIsNone(Entry.from_dict({"info":info}).authors)
+        entry = Entry.from_dict({"info":dict(info, venue=["TEST", "TEST@SIGIR"],
+                                             authors={"author":{"@pid":"1/2", "text":"Jane Doe"}})})
+        self.assertEqual(entry.venues, ("TEST", "TEST@SIGIR"))
+        self.assertEqual(entry.authors, (("1/2", "Jane Doe"),))
+
+    def test_with_authors(self):
+        entry = Entry.from_dict(self.mocked_dblp_json[0])
+        self.assertIsNone(entry.authors)
+        changed_entry = entry.with_authors((("1/2", "Jane Doe"),))
+        self.assertIsNone(entry.authors)
+        self.assertEqual(changed_entry.authors, (("1/2", "Jane Doe"),))
+        self.assertIs(changed_entry.venues, entry.venues)
+
+    def test_pickle(self):
+        entry = Entry.from_dict(self.PotthastGBBBFKN21_dblp_json[0])
+        self.assertEqual(loads(dumps(entry)), entry)
+
+
+if __name__ == "__main__":
+    unittest.main()
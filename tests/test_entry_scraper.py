@@ -1,8 +1,17 @@
 from json import load
+from os.path import sep
+from shutil import rmtree
+from tempfile import mkdtemp
+from threading import Event, Thread
 import unittest
 
+from scripts.dblp.api_cache import ApiCache
 from scripts.dblp.entry_scraper import EntryScraper
+from scripts.dblp.query_planner import QueryPlanner
 from scripts.logger import Logger
+from tests.fake_dblp_server import FakeDblpServer
+from utils.rate_limiter import RateLimiter
+from utils.session import Session
 
 
 class TestEntryScraper(unittest.TestCase):
@@ -17,6 +26,8 @@ class TestEntryScraper(unittest.TestCase):
         # SIGIR 1971 test resources
         with open("tests/resources/sigir_1971_dblp.json") as file:
             cls.sigir_1971_dblp_json = load(file)
+        with open("tests/resources/sigir_1971_dblp.bib") as file:
+            cls.sigir_1971_dblp_bibtex = "".join(file.readlines()).split("\n\n\n\n")
 
         # mocked test resources (for bibkey suffix handling)
         with open("tests/resources/mocked_dblp.json") as file:
@@ -41,7 +52,134 @@ class TestEntryScraper(unittest.TestCase):
         entry_batch = self.dblp_entry_scraper._scrape_entry_batch(payload)
         self.assertEqual([entry["info"] for entry in entry_batch],
                          [entry["info"] for entry in self.sigir_1971_dblp_json[3:8]])
-                                                       
+
+
+    def test_scrape_entries_with_api_cache(self):
+        output_directory = mkdtemp()
+        api_cache = ApiCache(output_directory + sep + "dblp_api_cache.sqlite")
+        session = Session()
+        with FakeDblpServer(self.sigir_1971_dblp_json, self.sigir_1971_dblp_bibtex) as fake_dblp:
+            dblp_entry_scraper = EntryScraper(venuetype="conf",
+                                              logger=self.dblp_entry_scraper.logger,
+                                              rate_limiter=RateLimiter(default_rate=None),
+                                              session=session,
+                                              api_cache=api_cache)
+            dblp_entry_scraper.api_endpoint = fake_dblp.api_endpoint
+            entries_sigir_1971 = dblp_entry_scraper.scrape_entries("sigir", 1971)
+            self.assertEqual(len(fake_dblp.requests), 1)
+            # second scrape is served from the API cache
+            self.assertEqual(dblp_entry_scraper.scrape_entries("sigir", 1971), entries_sigir_1971)
+            self.assertEqual(len(fake_dblp.requests), 1)
+            # unless refresh is forced, which is a conditional request answered from the API cache
+            api_cache.force_refresh = True
+            self.assertEqual(dblp_entry_scraper.scrape_entries("sigir", 1971), entries_sigir_1971)
+            self.assertEqual(len(fake_dblp.requests), 2)
+            self.assertEqual(session.summary()["not_modified"], 1)
+        session.close()
+        self.assertEqual([entry["info"]["key"] for entry in entries_sigir_1971],
+                         [entry["info"]["key"] for entry in self.sigir_1971_dblp_json])
+        api_cache.close()
+        rmtree(output_directory)
+
+    def test_scrape_entries_multiple_of_batch_size(self):
+        # the last batch of 1000 hits is followed by one empty batch
+        entry_list = [dict(entry, info=dict(entry["info"], key="conf/sigir/X" + str(index)))
+                      for index, entry in enumerate(self.sigir_1971_dblp_json * 100)][:2000]
+        with FakeDblpServer(entry_list, [""] * len(entry_list)) as fake_dblp:
+            dblp_entry_scraper = EntryScraper(venuetype="conf",
+                                              logger=self.dblp_entry_scraper.logger,
+                                              rate_limiter=RateLimiter(default_rate=None))
+            dblp_entry_scraper.api_endpoint = fake_dblp.api_endpoint
+            self.assertEqual(len(dblp_entry_scraper.scrape_entries("sigir", 1971)), 2000)
+            self.assertEqual(len(fake_dblp.requests), 3)
+
+    def test_scrape_entries_with_query_planner(self):
+        output_directory = mkdtemp()
+        api_cache = ApiCache(output_directory + sep + "dblp_api_cache.sqlite")
+        # SIGIR 1971 AS SIGIR 1972 AND SIGIRX 1971, WHOSE KEYS START WITH THE KEYS OF SIGIR
+        entry_list = self.sigir_1971_dblp_json + [
+            dict(entry, info=dict(entry["info"], key=entry["info"]["key"].replace("sigir", venue), year=year))
+            for venue, year in [("sigir", "1972"), ("sigirx", "1971")] for entry in self.sigir_1971_dblp_json]
+        jobs = [("sigir", 1971), ("sigir", 1972), ("sigirx", 1971), ("sigir", 1975)]
+        with FakeDblpServer(entry_list, [""] * len(entry_list)) as fake_dblp:
+            dblp_entry_scraper = EntryScraper(venuetype="conf",
+                                              logger=self.dblp_entry_scraper.logger,
+                                              rate_limiter=RateLimiter(default_rate=None),
+                                              api_cache=api_cache)
+            dblp_entry_scraper.api_endpoint = fake_dblp.api_endpoint
+            query_planner = QueryPlanner()
+            dblp_entry_scraper.plan(jobs, query_planner)
+            entry_lists = {job:dblp_entry_scraper.scrape_entries(*job) for job in jobs}
+            # ONE COMBINED QUERY FOR ALL VENUES AND YEARS
+            self.assertEqual(len(fake_dblp.requests), 1)
+            self.assertEqual(query_planner.entry_counts, {("sigir", 1971):len(self.sigir_1971_dblp_json),
+                                                          ("sigir", 1972):len(self.sigir_1971_dblp_json),
+                                                          ("sigirx", 1971):len(self.sigir_1971_dblp_json),
+                                                          ("sigir", 1975):0})
+            # THE ENTRIES OF EACH VENUE AND YEAR ARE CACHED AS IF SCRAPED ONE BY ONE
+            dblp_entry_scraper = EntryScraper(venuetype="conf",
+                                              logger=self.dblp_entry_scraper.logger,
+                                              rate_limiter=RateLimiter(default_rate=None),
+                                              api_cache=api_cache)
+            dblp_entry_scraper.api_endpoint = fake_dblp.api_endpoint
+            self.assertEqual({job:dblp_entry_scraper.scrape_entries(*job) for job in jobs}, entry_lists)
+            self.assertEqual(len(fake_dblp.requests), 1)
+            api_cache.force_refresh = True
+            self.assertEqual({job:dblp_entry_scraper.scrape_entries(*job) for job in jobs}, entry_lists)
+            self.assertEqual(len(fake_dblp.requests), 1 + len(jobs))
+        self.assertEqual([entry["info"]["key"] for entry in entry_lists[("sigir", 1971)]],
+                         [entry["info"]["key"] for entry in self.sigir_1971_dblp_json])
+        self.assertEqual([entry["info"]["year"] for entry in entry_lists[("sigir", 1972)]],
+                         ["1972"] * len(self.sigir_1971_dblp_json))
+        api_cache.close()
+        rmtree(output_directory)
+
+    def test_scrape_entries_with_query_planner_concurrently(self):
+        jobs = [("sigir", 1971), ("sigir", 1972), ("sigirx", 1971)]
+        dblp_entry_scraper = EntryScraper(venuetype="conf", logger=self.dblp_entry_scraper.logger)
+        dblp_entry_scraper.plan(jobs[:2], QueryPlanner())
+        # THE COMBINED QUERY BLOCKS UNTIL RELEASED
+        started, released = Event(), Event()
+        def scrape_group(group, refresh=False):
+            started.set()
+            self.assertTrue(released.wait(5))
+            return {job:[{"info":{"key":job[0] + str(job[1])}}] for job in group}
+        dblp_entry_scraper._scrape_group = scrape_group
+        dblp_entry_scraper._scrape_entry_batch = lambda *args, **kwargs: []
+        entry_lists = {}
+        def scrape_entries(job):
+            entry_lists[job] = dblp_entry_scraper.scrape_entries(*job)
+        threads = [Thread(target=scrape_entries, args=(job,)) for job in jobs]
+        threads[0].start()
+        self.assertTrue(started.wait(5))
+        # THE OTHER MEMBER OF THE GROUP WAITS FOR THE COMBINED QUERY, VENUES AND YEARS OUTSIDE OF IT DO NOT
+        threads[1].start()
+        threads[2].start()
+        threads[2].join(5)
+        self.assertEqual(entry_lists, {("sigirx", 1971):[]})
+        threads[1].join(0.1)
+        self.assertTrue(threads[1].is_alive())
+        released.set()
+        for thread in threads[:2]:
+            thread.join(5)
+        self.assertEqual(entry_lists, {("sigir", 1971):[{"info":{"key":"sigir1971"}}],
+                                       ("sigir", 1972):[{"info":{"key":"sigir1972"}}],
+                                       ("sigirx", 1971):[]})
+
+    def test_scrape_entries_with_failed_query_planner(self):
+        jobs = [("sigir", 1971), ("sigir", 1972)]
+        dblp_entry_scraper = EntryScraper(venuetype="conf", logger=self.dblp_entry_scraper.logger)
+        dblp_entry_scraper.plan(jobs, QueryPlanner())
+        def scrape_group(group, refresh=False):
+            raise ValueError(group)
+        dblp_entry_scraper._scrape_group = scrape_group
+        dblp_entry_scraper._scrape_entry_batch = lambda *args, **kwargs: []
+        with self.assertRaises(ValueError):
+            dblp_entry_scraper.scrape_entries(*jobs[0])
+        # THE OTHER MEMBER OF THE GROUP IS SCRAPED ON ITS OWN
+        self.assertEqual(dblp_entry_scraper.scrape_entries(*jobs[1]), [])
+        self.assertEqual(dblp_entry_scraper.prefetched, {})
+
         
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,46 @@
+from os.path import sep
+from shutil import rmtree
+from tempfile import mkdtemp
+import unittest
+
+from scripts.journal import Journal
+
+
+class TestJournal(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = mkdtemp()
+        self.filepath = self.directory + sep + "progress_journal.jsonl"
+
+    def tearDown(self):
+        rmtree(self.directory)
+
+    def test_record(self):
+        journal = Journal(self.filepath)
+        journal.record("sigir", 1971, Journal.ENTRIES_FETCHED, 21)
+        journal.record("sigir", 1971, Journal.FILE_WRITTEN)
+        journal.record("sigir", 1975, Journal.NO_ENTRIES)
+        journal.record("test", 2023, Journal.FAILED)
+        self.assertEqual(journal.get_stage("sigir", 1971), Journal.FILE_WRITTEN)
+        self.assertTrue(journal.is_finished("sigir", 1971))
+        self.assertTrue(journal.is_finished("sigir", 1975))
+        self.assertFalse(journal.is_finished("test", 2023))
+        self.assertIsNone(journal.get_stage("test", 2024))
+
+        journal = Journal(self.filepath)
+        self.assertEqual(journal.get_stage("sigir", 1971), Journal.FILE_WRITTEN)
+        self.assertEqual(journal.get_stage("test", 2023), Journal.FAILED)
+        self.assertEqual(journal.entry_counts, {("sigir", 1971):21})
+
+    def test_partial_record(self):
+        journal = Journal(self.filepath)
+        journal.record("sigir", 1971, Journal.FILE_WRITTEN)
+        with open(self.filepath, "a") as file:
+            file.write('{"venue": "sigir", "year": 19')
+        journal = Journal(self.filepath)
+        self.assertTrue(journal.is_finished("sigir", 1971))
+        self.assertIsNone(journal.get_stage("sigir", 1975))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+from json import load
+from os.path import sep
+from shutil import rmtree
+from tempfile import mkdtemp
+import unittest
+
+from scripts.logger import Logger
+from scripts.scraper import Scraper
+from tests.fake_dblp_server import FakeDblpServer
+from utils.metrics import Metrics
+from utils.rate_limiter import RateLimiter
+
+
+class TestMetrics(unittest.TestCase):
+
+    def setUp(self):
+        self.output_directory = mkdtemp()
+
+    def tearDown(self):
+        rmtree(self.output_directory)
+
+    def test_counters_and_histograms(self):
+        metrics = Metrics(buckets=(0.1, 1))
+        metrics.increment("http_responses_total", status=200)
+        metrics.increment("http_responses_total", 2, status=200)
+        metrics.increment("http_responses_total", status=429)
+        metrics.observe("retry_backoff_seconds", 0.5)
+        metrics.observe("retry_backoff_seconds", 2)
+        with metrics.span("scrape_entries"):
+            pass
+        self.assertEqual(metrics.get_counter("http_responses_total", status=200), 3)
+        self.assertEqual(metrics.get_counter("http_responses_total", status=404), 0)
+        self.assertEqual(metrics.get_histogram("retry_backoff_seconds"), (2, 2.5))
+        self.assertEqual(metrics.get_histogram("scrape_entries_seconds")[0], 1)
+        summary = metrics.summary()
+        self.assertEqual(summary["counters"], {"http_responses_total{status=\"200\"}":3,
+                                               "http_responses_total{status=\"429\"}":1})
+        self.assertEqual(list(summary["histograms"]), ["retry_backoff_seconds", "scrape_entries_seconds"])
+        self.assertEqual(summary["histograms"]["retry_backoff_seconds"], {"count":2, "sum":2.5, "mean":1.25})
+
+    def test_export_prometheus(self):
+        metrics = Metrics(buckets=(0.1, 1))
+        metrics.increment("http_responses_total", status=200)
+        metrics.increment("http_responses_total", status=429)
+        metrics.observe("retry_backoff_seconds", 0.5)
+        metrics.observe("retry_backoff_seconds", 2)
+        self.assertEqual(metrics.export_prometheus(),
+                         "# TYPE http_responses_total counter\n" +
+                         "http_responses_total{status=\"200\"} 1\n" +
+                         "http_responses_total{status=\"429\"} 1\n" +
+                         "# TYPE retry_backoff_seconds histogram\n" +
+                         "retry_backoff_seconds_bucket{le=\"0.1\"} 0\n" +
+                         "retry_backoff_seconds_bucket{le=\"1\"} 1\n" +
+                         "retry_backoff_seconds_bucket{le=\"+Inf\"} 2\n" +
+                         "retry_backoff_seconds_sum 2.5\n" +
+                         "retry_backoff_seconds_count 2\n")
+
+    def test_logger(self):
+        logger = Logger(self.output_directory)
+        for index in range(1000):
+            logger.log("Message " + str(index))
+        logger.write("dblp_json_results.csv", "sigir,1971,21\n")
+        logger.flush()
+        with open(logger.logger_directory + sep + "log.txt") as file:
+            self.assertEqual(file.read(), "".join("Message " + str(index) + "\n" for index in range(1000)))
+        with open(logger.logger_directory + sep + "dblp_json_results.csv") as file:
+            self.assertEqual(file.read(), "sigir,1971,21\n")
+        # CLOSING WRITES QUEUED MESSAGES, STOPS THE WRITER THREAD AND CLOSES THE LOG FILES
+        logger.log("Last message")
+        logger.close()
+        self.assertFalse(logger.writer.is_alive())
+        self.assertTrue(all(file.closed for file in logger.files.values()))
+        with open(logger.logger_directory + sep + "log.txt") as file:
+            self.assertTrue(file.read().endswith("Message 999\nLast message\n"))
+        logger.log("Discarded message")
+        logger.flush()
+        logger.close()
+
+    def test_scrape(self):
+        with open("tests/resources/sigir_1971_dblp.json") as file:
+            sigir_1971_dblp_json = load(file)
+        with open("tests/resources/sigir_1971_dblp.bib") as file:
+            sigir_1971_dblp_bibtex = "".join(file.readlines()).split("\n\n\n\n")
+        with FakeDblpServer(sigir_1971_dblp_json, sigir_1971_dblp_bibtex) as fake_dblp:
+            scraper = Scraper(venuetype="conf",
+                              output_directory=self.output_directory,
+                              bibtex_cache_filepath=None,
+                              bulk_bibtex=False,
+                              rate_limiter=RateLimiter(default_rate=None))
+            scraper.dblp_entry_scraper.api_endpoint = fake_dblp.api_endpoint
+            scraper.scrape_and_write_bibtex("sigir", 1971)
+            scraper.close()
+        metrics = scraper.logger.metrics
+        self.assertEqual(metrics.get_counter("http_responses_total", status=200), 22)
+        self.assertEqual(metrics.get_counter("entries_total", venue="sigir"), 21)
+        self.assertEqual(metrics.get_counter("api_cache_lookups_total", result="miss"), 1)
+        self.assertEqual(metrics.get_counter("bibtex_cache_lookups_total", result="miss"), 21)
+        # THE BIBTEX IS FETCHED WHILE SCRAPING ENTRIES AND TAKEN FROM THE CACHE WHEN FORMATTING
+        self.assertEqual(metrics.get_counter("bibtex_cache_lookups_total", result="hit"), 22)
+        self.assertEqual(metrics.get_counter("prefetch_entries_total", result="queued"), 21)
+        self.assertEqual(metrics.get_counter("prefetch_entries_total", result="cached"), 0)
+        self.assertEqual(metrics.get_histogram("prefetch_queue_depth")[0], 1)
+        self.assertEqual(metrics.get_histogram("prefetch_bibtex_seconds")[0], 1)
+        for name in ["http_request_seconds", "rate_limit_wait_seconds", "scrape_bibtex_seconds"]:
+            self.assertEqual(metrics.get_histogram(name)[0], 22 if name != "scrape_bibtex_seconds" else 21)
+        self.assertEqual(metrics.get_histogram("scrape_entries_seconds")[0], 1)
+        self.assertEqual(metrics.get_histogram("format_bibtex_seconds")[0], 21)
+        with open(scraper.logger.logger_directory + sep + "dblp_json_results.csv") as file:
+            self.assertEqual(file.read(), "sigir,1971,21\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+from json import load
+from shutil import rmtree
+from tempfile import mkdtemp
+import unittest
+
+from scripts.scraper import Scraper
+from tests.fake_dblp_server import FakeDblpServer
+from utils.mirrors import MirrorRouter
+from utils.rate_limiter import RateLimiter
+
+
+class TestMirrorRouter(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.maxDiff = None
+        with open("tests/resources/mocked_dblp.json") as file:
+            cls.mocked_dblp_json = load(file)
+        with open("tests/resources/mocked_dblp.bib") as file:
+            cls.mocked_dblp_bibtex = "".join(file.readlines()).split("\n\n\n\n")
+        with open("tests/resources/mocked_ir_anthology.bib") as file:
+            cls.mocked_ir_anthology_bibtex = "".join(file.readlines())
+
+    def setUp(self):
+        self.output_directory = mkdtemp()
+
+    def tearDown(self):
+        rmtree(self.output_directory)
+
+    def test_route(self):
+        mirror_router = MirrorRouter(["https://dblp.org", "https://dblp.uni-trier.de/"])
+        url = "https://dblp.org/rec/conf/sigir/C71.bib"
+        self.assertEqual([mirror_router.route(url) for _ in range(3)],
+                         ["https://dblp.org/rec/conf/sigir/C71.bib",
+                          "https://dblp.uni-trier.de/rec/conf/sigir/C71.bib",
+                          "https://dblp.org/rec/conf/sigir/C71.bib"])
+        self.assertEqual(mirror_router.route("https://dblp.org.example/"), "https://dblp.org.example/")
+        self.assertEqual(mirror_router.canonicalize("https://dblp.uni-trier.de/rec/conf/sigir/C71"),
+                         "https://dblp.org/rec/conf/sigir/C71")
+
+    def test_health(self):
+        mirror_router = MirrorRouter(["https://dblp.org", "https://dblp.uni-trier.de"])
+        url = "https://dblp.org/search/publ/api"
+        mirror_router.record_failure("https://dblp.uni-trier.de/search/publ/api")
+        self.assertFalse(mirror_router.is_healthy("https://dblp.uni-trier.de"))
+        self.assertEqual({mirror_router.route(url) for _ in range(4)}, {url})
+        # all mirrors unhealthy: the mirror healthy again first is used
+        mirror_router.record_failure(url)
+        self.assertEqual(mirror_router.route(url), "https://dblp.uni-trier.de/search/publ/api")
+        mirror_router.record_success(url)
+        self.assertTrue(mirror_router.is_healthy("https://dblp.org"))
+
+    def _scrape(self, fake_dblps):
+        scraper = Scraper(venuetype="conf",
+                          output_directory=self.output_directory,
+                          bibtex_cache_filepath=None,
+                          bulk_bibtex=False,
+                          rate_limiter=RateLimiter(default_rate=None),
+                          mirror_router=MirrorRouter([fake_dblp.url for fake_dblp in fake_dblps]))
+        scraper.dblp_entry_scraper.api_endpoint = fake_dblps[0].api_endpoint
+        bib_filepath = scraper.scrape_and_write_bibtex("test", 2023)
+        scraper.close()
+        with open(bib_filepath) as file:
+            return file.read()
+
+    def test_scrape(self):
+        with FakeDblpServer(self.mocked_dblp_json, self.mocked_dblp_bibtex) as fake_dblp, \
+             FakeDblpServer(self.mocked_dblp_json, self.mocked_dblp_bibtex) as fake_dblp_mirror:
+            self.assertEqual(self._scrape([fake_dblp, fake_dblp_mirror]), self.mocked_ir_anthology_bibtex)
+        requests = len(self.mocked_dblp_json) + 1
+        self.assertEqual(len(fake_dblp.requests) + len(fake_dblp_mirror.requests), requests)
+        self.assertGreaterEqual(len(fake_dblp.requests), requests // 2)
+        self.assertGreaterEqual(len(fake_dblp_mirror.requests), requests // 2)
+
+    def test_scrape_failing_mirror(self):
+        with FakeDblpServer(self.mocked_dblp_json, self.mocked_dblp_bibtex) as fake_dblp, \
+             FakeDblpServer(self.mocked_dblp_json, self.mocked_dblp_bibtex) as fake_dblp_mirror:
+            fake_dblp_mirror.failures = [(503, {})] * 100
+            self.assertEqual(self._scrape([fake_dblp, fake_dblp_mirror]), self.mocked_ir_anthology_bibtex)
+        self.assertEqual(len(fake_dblp.requests), len(self.mocked_dblp_json) + 1)
+        self.assertEqual(len(fake_dblp_mirror.requests), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
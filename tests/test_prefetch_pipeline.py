@@ -0,0 +1,100 @@
+from json import load
+from os.path import sep
+from shutil import rmtree
+from tempfile import mkdtemp
+from threading import Event
+import unittest
+
+from scripts.dblp.bibtex_scraper import BibtexScraper
+from scripts.dblp.entry_scraper import EntryScraper
+from scripts.logger import Logger
+from scripts.prefetch_pipeline import PrefetchPipeline
+from tests.fake_dblp_server import FakeDblpServer
+from utils.rate_limiter import RateLimiter
+
+
+class TestPrefetchPipeline(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        with open("tests/resources/sigir_1971_dblp.json") as file:
+            sigir_1971_dblp_json = load(file)
+        # TWO FULL BATCHES OF HITS (FOLLOWED BY AN EMPTY ONE)
+        cls.entry_list = [dict(entry, info=dict(entry["info"], key="conf/sigir/X" + str(index)))
+                          for index, entry in enumerate(sigir_1971_dblp_json * 100)][:2000]
+        cls.bibtex_list = ["@inproceedings{DBLP:conf/sigir/X" + str(index) + ",\n  title = {X" + str(index) + "}\n}"
+                           for index in range(len(cls.entry_list))]
+
+    def setUp(self):
+        self.output_directory = mkdtemp()
+        self.logger = Logger("")
+        self.logger.log = lambda x: x
+
+    def tearDown(self):
+        self.bibtex_scraper.close()
+        rmtree(self.output_directory)
+
+    def _get_pipeline(self, fake_dblp, bulk_bibtex=True, fetch_workers=1):
+        rate_limiter = RateLimiter(default_rate=None)
+        entry_scraper = EntryScraper(venuetype="conf", logger=self.logger, rate_limiter=rate_limiter)
+        entry_scraper.api_endpoint = fake_dblp.api_endpoint
+        self.bibtex_scraper = BibtexScraper("conf", self.logger, self.output_directory,
+                                            self.output_directory + sep + "dblp_bibtex_cache.sqlite", "\n\n\n", rate_limiter)
+        self.bibtex_scraper.bulk_endpoint = fake_dblp.api_endpoint
+        return PrefetchPipeline(entry_scraper, self.bibtex_scraper, self.logger, bulk_bibtex, fetch_workers=fetch_workers)
+
+    def test_run(self):
+        with FakeDblpServer(self.entry_list, self.bibtex_list) as fake_dblp:
+            prefetch_pipeline = self._get_pipeline(fake_dblp)
+            cached_url = fake_dblp.entry_list[5]["info"]["url"]
+            self.bibtex_scraper.bibtex_cache.put(cached_url, "@inproceedings{cached}\n\n\n")
+            # THE NEXT BATCH OF HITS IS ONLY SCRAPED ONCE THE BIBTEX OF THE PREVIOUS BATCH IS FETCHED
+            fetched = Event()
+            prefetch_bibtex_bulk = self.bibtex_scraper.prefetch_bibtex_bulk
+            self.bibtex_scraper.prefetch_bibtex_bulk = lambda *args: (prefetch_bibtex_bulk(*args), fetched.set())[0]
+            scrape_entry_batches = prefetch_pipeline.entry_scraper.scrape_entry_batches
+            def scrape_entry_batches_in_lockstep(*args):
+                for offset, entry_batch in scrape_entry_batches(*args):
+                    fetched.clear()
+                    yield offset, entry_batch
+                    if entry_batch:
+                        self.assertTrue(fetched.wait(5))
+            prefetch_pipeline.entry_scraper.scrape_entry_batches = scrape_entry_batches_in_lockstep
+            entry_list = prefetch_pipeline.run("sigir", 1971)
+            # ONE API PAGE PER BATCH (THE LAST ONE EMPTY) AND ONE BULK BIBTEX PAGE PER FULL BATCH
+            self.assertEqual(len(fake_dblp.requests), 5)
+        self.assertEqual([entry["info"]["key"] for entry in entry_list], [entry["info"]["key"] for entry in self.entry_list])
+        for index, entry in enumerate(entry_list):
+            self.assertEqual(self.bibtex_scraper.get_cached_bibtex(entry),
+                             "@inproceedings{cached}\n\n\n" if index == 5 else self.bibtex_list[index] + "\n\n\n")
+        metrics = self.logger.metrics
+        self.assertEqual(metrics.get_counter("prefetch_entries_total", result="cached"), 1)
+        self.assertEqual(metrics.get_counter("prefetch_entries_total", result="queued"), 1999)
+        self.assertEqual(metrics.get_histogram("prefetch_queue_depth")[0], 2)
+        self.assertEqual(metrics.get_histogram("prefetch_bibtex_seconds")[0], 2)
+        self.assertEqual(metrics.get_histogram("scrape_entries_seconds")[0], 3)
+
+    def test_run_without_bulk_bibtex(self):
+        with FakeDblpServer(self.entry_list[:50], self.bibtex_list[:50]) as fake_dblp:
+            prefetch_pipeline = self._get_pipeline(fake_dblp, bulk_bibtex=False, fetch_workers=2)
+            entry_list = prefetch_pipeline.run("sigir", 1971)
+            self.assertEqual(len(fake_dblp.requests), 1 + 50)
+        self.assertEqual([self.bibtex_scraper.get_cached_bibtex(entry) for entry in entry_list],
+                         [bibtex + "\n\n\n" for bibtex in self.bibtex_list[:50]])
+
+    def test_run_with_failed_fetch(self):
+        with FakeDblpServer(self.entry_list, self.bibtex_list) as fake_dblp:
+            prefetch_pipeline = self._get_pipeline(fake_dblp, bulk_bibtex=False)
+            prefetch_pipeline.queue_size = 1
+            def scrape_bibtex(entry):
+                raise ValueError(entry["info"]["key"])
+            self.bibtex_scraper.scrape_bibtex = scrape_bibtex
+            # ENTRIES ARE STILL SCRAPED, BUT NO LONGER QUEUED
+            with self.assertRaises(ValueError) as context:
+                prefetch_pipeline.run("sigir", 1971)
+            self.assertEqual(str(context.exception), "conf/sigir/X0")
+            self.assertEqual(len(fake_dblp.requests), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,29 @@
+import unittest
+
+from scripts.dblp.query_planner import QueryPlanner
+
+
+class TestQueryPlanner(unittest.TestCase):
+
+    def test_estimate(self):
+        query_planner = QueryPlanner({("sigir", 1971):20, ("sigir", 1972):40}, default_estimate=100)
+        self.assertEqual(query_planner.estimate("sigir", 1971), 20)
+        # UNKNOWN YEARS OF KNOWN VENUES ARE ESTIMATED BY THE MEAN OF THE KNOWN YEARS
+        self.assertEqual(query_planner.estimate("sigir", 1973), 30)
+        self.assertEqual(query_planner.estimate("www", 2021), 100)
+        query_planner.record("www", 2021, 900)
+        self.assertEqual(query_planner.estimate("www", 2023), 900)
+
+    def test_next_group(self):
+        query_planner = QueryPlanner({("sigir", 1971):20, ("sigir", 1972):40, ("www", 2021):990, ("ictir", 2023):950},
+                                     max_group_size=3)
+        jobs = [("sigir", 1971), ("www", 2021), ("sigir", 1972), ("ictir", 2023), ("sigir", 1973), ("sigir", 1974)]
+        self.assertEqual(query_planner.next_group(jobs[0], jobs),
+                         [("sigir", 1971), ("sigir", 1972), ("sigir", 1973)])
+        # VENUES AND YEARS WITH MANY ENTRIES ARE SCRAPED ALONE, OR WITH THE ONES FITTING THE PAGE
+        self.assertEqual(query_planner.next_group(("www", 2021), jobs[2:]), [("www", 2021)])
+        self.assertEqual(query_planner.next_group(("ictir", 2023), jobs[4:]), [("ictir", 2023), ("sigir", 1973)])
+
+
+if __name__ == "__main__":
+    unittest.main()
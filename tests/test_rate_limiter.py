@@ -0,0 +1,46 @@
+from time import monotonic
+import unittest
+
+from utils.rate_limiter import RateLimiter
+
+
+class TestRateLimiter(unittest.TestCase):
+
+    def test_acquire(self):
+        rate_limiter = RateLimiter(rates={"dblp.org":20}, default_rate=None)
+        start = monotonic()
+        waits = [rate_limiter.acquire("https://dblp.org/rec/conf/sigir/C71.bib") for _ in range(5)]
+        self.assertEqual(waits[0], 0)
+        self.assertGreaterEqual(monotonic() - start, 4 / 20 - 0.01)
+
+    def test_acquire_per_host(self):
+        rate_limiter = RateLimiter(rates={"dblp.org":1})
+        self.assertEqual(rate_limiter.acquire("https://dblp.org/search/publ/api"), 0)
+        self.assertEqual(rate_limiter.acquire("https://dblp.uni-trier.de/search/publ/api"), 0)
+
+    def test_acquire_unlimited(self):
+        rate_limiter = RateLimiter(default_rate=None)
+        self.assertEqual(sum(rate_limiter.acquire("http://127.0.0.1/") for _ in range(100)), 0)
+
+    def test_adaptive(self):
+        rate_limiter = RateLimiter(rates={"dblp.org":1/3}, adaptive=True, min_rate=0.1, max_rate=1,
+                                   increase=0.25, decrease=0.5)
+        url = "https://dblp.org/search/publ/api"
+        for _ in range(5):
+            rate_limiter.on_success(url)
+        self.assertEqual(rate_limiter.get_rate("dblp.org"), 1)
+        rate_limiter.on_throttle(url)
+        self.assertEqual(rate_limiter.get_rate("dblp.org"), 0.5)
+        for _ in range(5):
+            rate_limiter.on_throttle(url)
+        self.assertEqual(rate_limiter.get_rate("dblp.org"), 0.1)
+
+    def test_not_adaptive(self):
+        rate_limiter = RateLimiter(rates={"dblp.org":1/3})
+        rate_limiter.on_success("https://dblp.org/search/publ/api")
+        rate_limiter.on_throttle("https://dblp.org/search/publ/api")
+        self.assertEqual(rate_limiter.get_rate("dblp.org"), 1/3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+from json import dumps, load
+from os import listdir
+from os.path import sep
+from shutil import rmtree
+from tempfile import mkdtemp
+import unittest
+
+from scripts.bibtex_index import BibtexIndex
+from scripts.dblp.entry_store import EntryStore
+from scripts.journal import Journal
+from scripts.rebuild import rebuild
+
+
+class TestRebuild(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.maxDiff = None
+
+        # SIGIR 1971 test resources
+        with open("tests/resources/sigir_1971_dblp.json") as file:
+            cls.sigir_1971_dblp_json = load(file)
+        with open("tests/resources/sigir_1971_dblp.bib") as file:
+            cls.sigir_1971_dblp_bibtex = "".join(file.readlines()).split("\n\n\n\n")
+        with open("tests/resources/sigir_1971_ir_anthology.bib") as file:
+            cls.sigir_1971_ir_anthology_bibtex = "".join(file.readlines())
+
+        # Potthast 2021 test resources
+        with open("tests/resources/PotthastGBBBFKN21_dblp.json") as file:
+            cls.PotthastGBBBFKN21_dblp_json = load(file)
+        with open("tests/resources/PotthastGBBBFKN21_dblp.bib") as file:
+            cls.PotthastGBBBFKN21_dblp_bibtex = "".join(file.readlines()).split("\n\n\n\n")
+        with open("tests/resources/PotthastGBBBFKN21_ir_anthology.bib") as file:
+            cls.PotthastGBBBFKN21_ir_anthology_bibtex = "".join(file.readlines())
+
+    def setUp(self):
+        self.output_directory = mkdtemp()
+        entry_store = EntryStore(sep.join([self.output_directory, "conf", "_entries"]))
+        entry_store.save("sigir", 1971, self.sigir_1971_dblp_json)
+        entry_store.save("sigir", 2021, self.PotthastGBBBFKN21_dblp_json)
+        with open(sep.join([self.output_directory, "conf", "dblp_bibtex_cache.txt"]), "w") as file:
+            for entry, bibtex in zip(self.sigir_1971_dblp_json + self.PotthastGBBBFKN21_dblp_json[:-1],
+                                     self.sigir_1971_dblp_bibtex + self.PotthastGBBBFKN21_dblp_bibtex[:-1]):
+                file.write(dumps([entry["info"]["url"], bibtex]) + "\n")
+
+    def tearDown(self):
+        rmtree(self.output_directory)
+
+    def test_entry_store(self):
+        entry_store = EntryStore(sep.join([self.output_directory, "conf", "_entries"]))
+        self.assertEqual(entry_store.venue_years(), [("sigir", 1971), ("sigir", 2021)])
+        self.assertEqual(entry_store.load("sigir", 1971), self.sigir_1971_dblp_json)
+        self.assertIsNone(entry_store.load("sigir", 1975))
+
+    def test_rebuild(self):
+        results = rebuild("conf", self.output_directory, processes=2)
+        with open(results[("sigir", 1971)]) as file:
+            self.assertEqual(file.read(), self.sigir_1971_ir_anthology_bibtex)
+        # bibtex of last Potthast 2021 entry is not cached
+        self.assertIsNone(results[("sigir", 2021)])
+        journal = Journal(sep.join([self.output_directory, "conf", "progress_journal.jsonl"]))
+        self.assertEqual(journal.get_stage("sigir", 2021), Journal.FAILED)
+        # the worker processes neither log to directories of their own nor index the bibtex files
+        self.assertEqual(len(listdir(sep.join([self.output_directory, "conf", "_logs"]))), 1)
+        bibtex_index = BibtexIndex(sep.join([self.output_directory, "conf", "bibtex_index.sqlite"]))
+        self.assertEqual("".join(bibtex_index.get_by_venue("sigir", 1971)), self.sigir_1971_ir_anthology_bibtex)
+        bibtex_index.close()
+
+        with open(sep.join([self.output_directory, "conf", "dblp_bibtex_cache.txt"]), "a") as file:
+            file.write(dumps([self.PotthastGBBBFKN21_dblp_json[-1]["info"]["url"], self.PotthastGBBBFKN21_dblp_bibtex[-1]]) + "\n")
+        results = rebuild("conf", self.output_directory, processes=2)
+        with open(results[("sigir", 2021)]) as file:
+            self.assertEqual(file.read(), self.PotthastGBBBFKN21_ir_anthology_bibtex)
+
+
+if __name__ == "__main__":
+    unittest.main()
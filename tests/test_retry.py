@@ -0,0 +1,95 @@
+from json import load
+from shutil import rmtree
+from tempfile import mkdtemp
+import unittest
+
+from scripts.logger import Logger
+from tests.fake_dblp_server import FakeDblpServer
+from utils.rate_limiter import RateLimiter
+from utils.retry import CircuitOpenError, RetryError, RetryPolicy
+from utils.session import Session
+from utils.utils import get
+
+
+class TestRetry(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        with open("tests/resources/sigir_1971_dblp.json") as file:
+            cls.sigir_1971_dblp_json = load(file)
+        with open("tests/resources/sigir_1971_dblp.bib") as file:
+            cls.sigir_1971_dblp_bibtex = "".join(file.readlines()).split("\n\n\n\n")
+
+    def setUp(self):
+        self.output_directory = mkdtemp()
+        self.logger = Logger(self.output_directory)
+
+    def tearDown(self):
+        self.logger.close()
+        rmtree(self.output_directory)
+
+    def test_get_retry(self):
+        with FakeDblpServer(self.sigir_1971_dblp_json, self.sigir_1971_dblp_bibtex) as fake_dblp:
+            fake_dblp.failures = [(503, {}), (429, {"Retry-After":"0"}), (500, {})]
+            response = get(self.logger, fake_dblp.url + "/rec/conf/sigir/C71.bib",
+                           session=Session(timeout=5), retry_policy=RetryPolicy(base_delay=0))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.text.strip(), self.sigir_1971_dblp_bibtex[0].strip())
+        self.assertEqual(len(fake_dblp.requests), 4)
+
+    def test_get_retry_exhausted(self):
+        with FakeDblpServer(self.sigir_1971_dblp_json, self.sigir_1971_dblp_bibtex) as fake_dblp:
+            fake_dblp.failures = [(429, {})] * 3
+            with self.assertRaises(RetryError):
+                get(self.logger, fake_dblp.url + "/rec/conf/sigir/C71.bib",
+                    session=Session(timeout=5), retry_policy=RetryPolicy(max_attempts=3, base_delay=0))
+        self.assertEqual(len(fake_dblp.requests), 3)
+
+    def test_get_connection_error(self):
+        with FakeDblpServer([], []) as fake_dblp:
+            url = fake_dblp.url + "/rec/conf/sigir/C71.bib"
+        retry_policy = RetryPolicy(max_attempts=2, base_delay=0, failure_threshold=2)
+        with self.assertRaises(RetryError):
+            get(self.logger, url, session=Session(timeout=5), retry_policy=retry_policy)
+        with self.assertRaises(CircuitOpenError):
+            get(self.logger, url, session=Session(timeout=5), retry_policy=retry_policy)
+
+    def test_get_delay(self):
+        retry_policy = RetryPolicy(base_delay=2, max_delay=10)
+        for attempt in range(6):
+            self.assertLessEqual(retry_policy.get_delay(attempt), min(10, 2 * 2 ** attempt))
+        with FakeDblpServer([], []) as fake_dblp:
+            fake_dblp.failures = [(429, {"Retry-After":"7"}), (503, {"Retry-After":"Wed, 21 Oct 2015 07:28:00 GMT"})]
+            session = Session(timeout=5)
+            self.assertEqual(retry_policy.get_delay(0, session.get(fake_dblp.url)), 7)
+            self.assertEqual(retry_policy.get_delay(0, session.get(fake_dblp.url)), 0)
+
+    def test_circuit_breaker(self):
+        retry_policy = RetryPolicy(failure_threshold=2, reset_timeout=0)
+        url = "https://dblp.org/search/publ/api"
+        retry_policy.record_failure(url)
+        retry_policy.check(url)
+        retry_policy.record_success(url)
+        retry_policy.record_failure(url)
+        retry_policy.check(url)
+        retry_policy.record_failure(url)
+        # reset timeout passed: trial request is let through
+        retry_policy.check(url)
+        retry_policy.reset_timeout = 60
+        retry_policy.record_failure(url)
+        with self.assertRaises(CircuitOpenError):
+            retry_policy.check(url)
+        retry_policy.check("https://dblp.uni-trier.de/search/publ/api")
+
+    def test_adaptive_rate(self):
+        with FakeDblpServer(self.sigir_1971_dblp_json, self.sigir_1971_dblp_bibtex) as fake_dblp:
+            rate_limiter = RateLimiter(default_rate=10, adaptive=True, max_rate=20, increase=1, decrease=0.5)
+            host = fake_dblp.url[len("http://"):]
+            fake_dblp.failures = [(429, {"Retry-After":"0"})]
+            get(self.logger, fake_dblp.url + "/rec/conf/sigir/C71.bib", rate_limiter=rate_limiter,
+                session=Session(timeout=5), retry_policy=RetryPolicy(base_delay=0))
+        self.assertEqual(rate_limiter.get_rate(host), 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+from json import load
+from shutil import rmtree
+from tempfile import mkdtemp
+import unittest
+
+from scripts.scheduler import Scheduler
+from scripts.scraper import Scraper
+from tests.fake_dblp_server import FakeDblpServer
+from utils.rate_limiter import RateLimiter
+
+
+class TestScheduler(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.maxDiff = None
+
+        # SIGIR 1971 test resources
+        with open("tests/resources/sigir_1971_dblp.json") as file:
+            cls.sigir_1971_dblp_json = load(file)
+        with open("tests/resources/sigir_1971_dblp.bib") as file:
+            cls.sigir_1971_dblp_bibtex = "".join(file.readlines()).split("\n\n\n\n")
+        with open("tests/resources/sigir_1971_ir_anthology.bib") as file:
+            cls.sigir_1971_ir_anthology_bibtex = "".join(file.readlines())
+
+        # mocked test resources
+        with open("tests/resources/mocked_dblp.json") as file:
+            cls.mocked_dblp_json = load(file)
+        with open("tests/resources/mocked_dblp.bib") as file:
+            cls.mocked_dblp_bibtex = "".join(file.readlines()).split("\n\n\n\n")
+        with open("tests/resources/mocked_ir_anthology.bib") as file:
+            cls.mocked_ir_anthology_bibtex = "".join(file.readlines())
+
+    def setUp(self):
+        self.output_directory = mkdtemp()
+
+    def tearDown(self):
+        rmtree(self.output_directory)
+
+    def _get_scraper(self, fake_dblp, bulk_bibtex=True):
+        scraper = Scraper(venuetype="conf",
+                          output_directory=self.output_directory,
+                          bibtex_cache_filepath=None,
+                          bulk_bibtex=bulk_bibtex,
+                          rate_limiter=RateLimiter(default_rate=None))
+        scraper.dblp_entry_scraper.api_endpoint = fake_dblp.api_endpoint
+        scraper.dblp_bibtex_scraper.bulk_endpoint = fake_dblp.api_endpoint
+        return scraper
+
+    def _read(self, filepath):
+        with open(filepath) as file:
+            return file.read()
+
+    def test_run(self):
+        with FakeDblpServer(self.sigir_1971_dblp_json + self.mocked_dblp_json,
+                            self.sigir_1971_dblp_bibtex + self.mocked_dblp_bibtex) as fake_dblp:
+            scraper = self._get_scraper(fake_dblp)
+            results = Scheduler(scraper, workers=2).run({"sigir":[1971, 1975], "test":[2023]})
+        self.assertEqual(list(results.keys()), [("sigir", 1971), ("sigir", 1975), ("test", 2023)])
+        self.assertEqual(self._read(results[("sigir", 1971)]), self.sigir_1971_ir_anthology_bibtex)
+        self.assertIsNone(results[("sigir", 1975)])
+        self.assertEqual(self._read(results[("test", 2023)]), self.mocked_ir_anthology_bibtex)
+        # one API page and one bulk bibtex page per venue and year with entries
+        self.assertEqual(len(fake_dblp.requests), 5)
+
+    def test_run_with_grouped_entry_queries(self):
+        with FakeDblpServer(self.sigir_1971_dblp_json + self.mocked_dblp_json,
+                            self.sigir_1971_dblp_bibtex + self.mocked_dblp_bibtex) as fake_dblp:
+            scraper = self._get_scraper(fake_dblp)
+            scraper.group_entry_queries = True
+            results = Scheduler(scraper, workers=2).run({"sigir":[1971, 1975], "test":[2023]})
+        self.assertEqual(self._read(results[("sigir", 1971)]), self.sigir_1971_ir_anthology_bibtex)
+        self.assertIsNone(results[("sigir", 1975)])
+        self.assertEqual(self._read(results[("test", 2023)]), self.mocked_ir_anthology_bibtex)
+        # one API page for all venues and years, one bulk bibtex page per venue and year with entries
+        self.assertEqual(len(fake_dblp.requests), 3)
+        self.assertEqual(scraper.journal.entry_counts, {("sigir", 1971):len(self.sigir_1971_dblp_json),
+                                                        ("sigir", 1975):0,
+                                                        ("test", 2023):len(self.mocked_dblp_json)})
+
+    def test_run_without_bulk_bibtex(self):
+        with FakeDblpServer(self.mocked_dblp_json, self.mocked_dblp_bibtex) as fake_dblp:
+            scraper = self._get_scraper(fake_dblp, bulk_bibtex=False)
+            results = Scheduler(scraper, workers=2).run({"test":[2023]})
+        self.assertEqual(self._read(results[("test", 2023)]), self.mocked_ir_anthology_bibtex)
+        self.assertEqual(len(fake_dblp.requests), 1 + len(self.mocked_dblp_json))
+
+    def test_run_resume(self):
+        with FakeDblpServer(self.sigir_1971_dblp_json + self.mocked_dblp_json,
+                            self.sigir_1971_dblp_bibtex + self.mocked_dblp_bibtex) as fake_dblp:
+            scraper = self._get_scraper(fake_dblp)
+            scraper.journal.record("sigir", 1971, "file_written")
+            scraper.journal.record("test", 2023, "failed")
+            results = Scheduler(scraper, workers=2, resume=True).run({"sigir":[1971, 1975], "test":[2023]})
+        self.assertEqual(list(results.keys()), [("sigir", 1975), ("test", 2023)])
+        self.assertEqual(self._read(results[("test", 2023)]), self.mocked_ir_anthology_bibtex)
+        self.assertTrue(scraper.journal.is_finished("sigir", 1975))
+        self.assertTrue(scraper.journal.is_finished("test", 2023))
+
+
+if __name__ == "__main__":
+    unittest.main()
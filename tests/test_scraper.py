@@ -1,7 +1,20 @@
+from concurrent.futures import ProcessPoolExecutor
+from copy import deepcopy
 from json import load
+from os.path import sep
+from shutil import rmtree
+from tempfile import mkdtemp
+from threading import Thread
+from time import sleep
 import unittest
 
+from scripts import bibtex_writer
+from scripts.bibkey_registry import BibkeyRegistry
+from scripts.dblp.entry import Entry
+from scripts.journal import Journal
 from scripts.scraper import Scraper
+from tests.fake_dblp_server import FakeDblpServer
+from utils.rate_limiter import RateLimiter
 
 
 class TestBibtexScraper(unittest.TestCase):
@@ -57,10 +70,156 @@ class TestBibtexScraper(unittest.TestCase):
                                                                       self.mocked_dblp_bibtex)
         self.assertEqual(generated_bibtex_string, self.mocked_ir_anthology_bibtex)
 
-    def test_append_suffixes_to_bibkeys(self):
-        self.assertEqual(self.dblp_bibtex_scraper._append_suffixes_to_bibkeys
-                         (["author1","author2","author1","author1","author1","author2"]),
-                         ["author1","author2","author1-2","author1-3","author1-4","author2-2"])
+    def test_generate_bibtex_records(self):
+        requested = []
+        def get_bibtex(index, entry):
+            requested.append(index)
+            return self.mocked_dblp_bibtex[index]
+        bibtex_records = self.dblp_bibtex_scraper.generate_bibtex_records(self.mocked_dblp_json, get_bibtex)
+        # editorships are requested before the first entry is generated
+        self.assertEqual(next(bibtex_records), self.mocked_ir_anthology_bibtex.split("\n\n\n")[0] + "\n\n\n")
+        self.assertEqual(requested, [6, 7, 0])
+        self.assertEqual("".join(bibtex_records), self.mocked_ir_anthology_bibtex.split("\n\n\n", 1)[1])
+
+    def test_generate_bibtex_string_in_parallel(self):
+        output_directory = mkdtemp()
+        scraper = Scraper(venuetype="conf",
+                          output_directory=output_directory,
+                          bibtex_cache_filepath=None,
+                          format_workers=2)
+        scraper.format_chunk_size = 3
+        messages = []
+        scraper.logger.log = messages.append
+        for entry_list, bibtex_list, ir_anthology_bibtex in [
+                (self.sigir_1971_dblp_json, self.sigir_1971_dblp_bibtex, self.sigir_1971_ir_anthology_bibtex),
+                (self.mocked_dblp_json, self.mocked_dblp_bibtex, self.mocked_ir_anthology_bibtex)]:
+            self.assertEqual(scraper.generate_bibtex_string(entry_list, bibtex_list), ir_anthology_bibtex)
+        self.assertIsNotNone(scraper.format_executor)
+        # messages are logged in the order of the entries, as when formatting in one process
+        scraper.format_workers = 1
+        parallel_messages, messages[:] = list(messages), []
+        scraper.bibkey_registry.close()
+        scraper.bibkey_registry = BibkeyRegistry(output_directory + sep + "bibkey_registry_serial.sqlite")
+        scraper.generate_bibtex_string(self.sigir_1971_dblp_json, self.sigir_1971_dblp_bibtex)
+        scraper.generate_bibtex_string(self.mocked_dblp_json, self.mocked_dblp_bibtex)
+        self.assertEqual(parallel_messages, messages)
+        scraper.close()
+        rmtree(output_directory)
+
+    def test_generate_bibtex_string_in_parallel_threads(self):
+        output_directory = mkdtemp()
+        scraper = Scraper(venuetype="conf",
+                          output_directory=output_directory,
+                          bibtex_cache_filepath=None,
+                          format_workers=2)
+        scraper.format_chunk_size = 3
+        scraper.logger.log = lambda x: x
+        # THE POOL IS SLOW TO START, SO BOTH THREADS FIND NO POOL WITHOUT THE LOCK
+        executors = []
+        def process_pool_executor(*args, **kwargs):
+            sleep(0.1)
+            executors.append(ProcessPoolExecutor(*args, **kwargs))
+            return executors[-1]
+        bibtex_writer.ProcessPoolExecutor = process_pool_executor
+        try:
+            results = []
+            threads = [Thread(target=lambda: results.append(
+                           scraper.generate_bibtex_string(self.sigir_1971_dblp_json, self.sigir_1971_dblp_bibtex)))
+                       for _ in range(2)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            bibtex_writer.ProcessPoolExecutor = ProcessPoolExecutor
+        self.assertEqual(results, [self.sigir_1971_ir_anthology_bibtex] * 2)
+        self.assertEqual(executors, [scraper.format_executor])
+        scraper.close()
+        rmtree(output_directory)
+
+    def test_generate_bibtex_string_keeps_entries(self):
+        entry_list = deepcopy(self.mocked_dblp_json)
+        self.dblp_bibtex_scraper.generate_bibtex_string(entry_list, self.mocked_dblp_bibtex)
+        self.assertEqual(entry_list, self.mocked_dblp_json)
+
+    def test_diff_entries(self):
+        changed_entry = deepcopy(self.sigir_1971_dblp_json[1])
+        changed_entry["info"]["title"] = "Changed."
+        self.assertEqual(self.dblp_bibtex_scraper.diff_entries(self.sigir_1971_dblp_json[:-1],
+                                                               [changed_entry] + self.sigir_1971_dblp_json[2:]),
+                         ({"conf/sigir/71"}, {"conf/sigir/ChouekaCDFS71"}, {"conf/sigir/C71"}))
+
+    def test_update_bibtex(self):
+        output_directory = mkdtemp()
+        with FakeDblpServer(self.sigir_1971_dblp_json, self.sigir_1971_dblp_bibtex) as fake_dblp:
+            scraper = Scraper(venuetype="conf",
+                              output_directory=output_directory,
+                              bibtex_cache_filepath=None,
+                              rate_limiter=RateLimiter(default_rate=None))
+            scraper.dblp_entry_scraper.api_endpoint = fake_dblp.api_endpoint
+            scraper.dblp_bibtex_scraper.bulk_endpoint = fake_dblp.api_endpoint
+            bib_filepath = scraper.update_bibtex("sigir", 1971)
+            with open(bib_filepath) as file:
+                self.assertEqual(file.read(), self.sigir_1971_ir_anthology_bibtex)
+            self.assertEqual(len(fake_dblp.requests), 2)
+
+            # unchanged entries: only the API is requested, the bibtex file is not rewritten
+            self.assertIsNone(scraper.update_bibtex("sigir", 1971))
+            self.assertEqual(len(fake_dblp.requests), 3)
+
+            # changed entry: only its bibtex is requested again
+            fake_dblp.entry_list[1]["info"]["title"] = "Changed."
+            fake_dblp.bibtex["conf/sigir/ChouekaCDFS71"] = fake_dblp.bibtex["conf/sigir/ChouekaCDFS71"].replace(
+                "Full Text Document Retrieval", "Changed")
+            self.assertEqual(scraper.update_bibtex("sigir", 1971), bib_filepath)
+            self.assertEqual(fake_dblp.requests[3:], ["/search/publ/api", "/rec/conf/sigir/ChouekaCDFS71.bib"])
+            with open(bib_filepath) as file:
+                self.assertIn("title        = {Changed: Hebrew Legal Texts},", file.read())
+        scraper.close()
+        rmtree(output_directory)
+
+    def test_update_bibtex_after_failure(self):
+        output_directory = mkdtemp()
+        with FakeDblpServer(self.sigir_1971_dblp_json, self.sigir_1971_dblp_bibtex) as fake_dblp:
+            scraper = Scraper(venuetype="conf",
+                              output_directory=output_directory,
+                              bibtex_cache_filepath=None,
+                              rate_limiter=RateLimiter(default_rate=None))
+            scraper.dblp_entry_scraper.api_endpoint = fake_dblp.api_endpoint
+            scraper.dblp_bibtex_scraper.bulk_endpoint = fake_dblp.api_endpoint
+            bib_filepath = scraper.update_bibtex("sigir", 1971)
+
+            # the bibtex of the changed entry fails once: neither the file nor the entries are updated
+            fake_dblp.entry_list[1]["info"]["title"] = "Changed."
+            fake_dblp.bibtex["conf/sigir/ChouekaCDFS71"] = fake_dblp.bibtex["conf/sigir/ChouekaCDFS71"].replace(
+                "Full Text Document Retrieval", "Changed")
+            scrape_bibtex = scraper.dblp_bibtex_scraper.scrape_bibtex
+            def scrape_bibtex_failing(entry, refresh=False):
+                scraper.dblp_bibtex_scraper.scrape_bibtex = scrape_bibtex
+                raise ValueError(entry["info"]["key"])
+            scraper.dblp_bibtex_scraper.scrape_bibtex = scrape_bibtex_failing
+            self.assertIsNone(scraper.update_bibtex("sigir", 1971))
+            self.assertEqual(scraper.journal.get_stage("sigir", 1971), Journal.FAILED)
+            self.assertEqual([entry["info"]["title"] for entry in scraper.entry_store.load("sigir", 1971)],
+                             [entry["info"]["title"] for entry in self.sigir_1971_dblp_json])
+
+            # the retry still finds the changed entry and rewrites the file
+            self.assertEqual(scraper.update_bibtex("sigir", 1971), bib_filepath)
+            self.assertEqual(scraper.journal.get_stage("sigir", 1971), Journal.FILE_WRITTEN)
+            with open(bib_filepath) as file:
+                bibtex = file.read()
+            self.assertIn("title        = {Changed: Hebrew Legal Texts},", bibtex)
+
+            # unchanged entries whose last run failed: the file is rewritten nevertheless
+            with open(bib_filepath, "w") as file:
+                file.write("")
+            scraper.journal.record("sigir", 1971, Journal.FAILED)
+            self.assertEqual(scraper.update_bibtex("sigir", 1971), bib_filepath)
+            self.assertEqual(scraper.journal.get_stage("sigir", 1971), Journal.FILE_WRITTEN)
+            with open(bib_filepath) as file:
+                self.assertEqual(file.read(), bibtex)
+        scraper.close()
+        rmtree(output_directory)
 
     def test_join_bibtex_lines(self):
         bibtex_lines = ["@inproceedings{test-2023-author,",
@@ -80,7 +239,7 @@ class TestBibtexScraper(unittest.TestCase):
                          self.dblp_bibtex_scraper._join_bibtex_lines(bibtex_lines))
 
     def test_get_personid_string_from_entry(self):
-        self.assertEqual(self.dblp_bibtex_scraper._get_personid_string_from_entry(self.PotthastGBBBFKN21_dblp_json[0]),
+        self.assertEqual(self.dblp_bibtex_scraper._get_personid_string_from_entry(Entry.from_dict(self.PotthastGBBBFKN21_dblp_json[0])),
                          ("87/6573 and " +
                           "67/6306-2 and " +
                           "195/5852 and " +
@@ -94,20 +253,21 @@ class TestBibtexScraper(unittest.TestCase):
                           "95/1130"))
 
     def test_get_venue_string_from_entry(self):
-        mocked_entry = {"info":{"venue":["venue1", "venue2"]}}
-        self.assertEqual(self.dblp_bibtex_scraper._get_venue_string_from_entry(mocked_entry), "venue1 and venue2")
-        mocked_entry = {"info":{"venue":"venue"}}
-        self.assertEqual(self.dblp_bibtex_scraper._get_venue_string_from_entry(mocked_entry), "venue")
-        mocked_entry = {"info":{}}
-        self.assertEqual(self.dblp_bibtex_scraper._get_venue_string_from_entry(mocked_entry), "")
+        mocked_entry = {"info":{"key":"conf/test/Doe23", "type":"Conference and Workshop Papers", "year":"2023",
+                                "url":"https://dblp.org/rec/conf/test/Doe23", "venue":["venue1", "venue2"]}}
+        self.assertEqual(self.dblp_bibtex_scraper._get_venue_string_from_entry(Entry.from_dict(mocked_entry)), "venue1 and venue2")
+        mocked_entry["info"]["venue"] = "venue"
+        self.assertEqual(self.dblp_bibtex_scraper._get_venue_string_from_entry(Entry.from_dict(mocked_entry)), "venue")
+        del mocked_entry["info"]["venue"]
+        self.assertEqual(self.dblp_bibtex_scraper._get_venue_string_from_entry(Entry.from_dict(mocked_entry)), "")
 
     
     def test_get_dblp_bibkey_from_entry(self):
-        self.assertEqual(self.dblp_bibtex_scraper._get_dblp_bibkey_from_entry(self.PotthastGBBBFKN21_dblp_json[0]),
+        self.assertEqual(self.dblp_bibtex_scraper._get_dblp_bibkey_from_entry(Entry.from_dict(self.PotthastGBBBFKN21_dblp_json[0])),
                          "DBLP:conf/sigir/PotthastGBBBFKN21")
 
     def test_get_ir_anthology_bibkey_from_entry(self):
-        self.assertEqual(self.dblp_bibtex_scraper._get_ir_anthology_bibkey_from_entry(self.PotthastGBBBFKN21_dblp_json[0]),
+        self.assertEqual(self.dblp_bibtex_scraper._get_ir_anthology_bibkey_from_entry(Entry.from_dict(self.PotthastGBBBFKN21_dblp_json[0])),
                          "conf-sigir-2021-potthast")
 
     #def test_convert_name(self):
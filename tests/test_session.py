@@ -0,0 +1,64 @@
+from json import load
+from os.path import sep
+from shutil import rmtree
+from tempfile import mkdtemp
+import unittest
+
+from tests.fake_dblp_server import FakeDblpServer
+from utils.session import Session
+
+
+class TestSession(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        with open("tests/resources/sigir_1971_dblp.json") as file:
+            cls.sigir_1971_dblp_json = load(file)
+        with open("tests/resources/sigir_1971_dblp.bib") as file:
+            cls.sigir_1971_dblp_bibtex = "".join(file.readlines()).split("\n\n\n\n")
+
+    def setUp(self):
+        self.output_directory = mkdtemp()
+        self.validators_filepath = self.output_directory + sep + "dblp_http_validators.sqlite"
+
+    def tearDown(self):
+        rmtree(self.output_directory)
+
+    def test_get(self):
+        with FakeDblpServer(self.sigir_1971_dblp_json, self.sigir_1971_dblp_bibtex) as fake_dblp:
+            session = Session(timeout=5, validators_filepath=self.validators_filepath)
+            response = session.get(fake_dblp.url + "/rec/conf/sigir/C71.bib")
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.headers["Content-Encoding"], "gzip")
+            self.assertEqual(response.text.strip(), self.sigir_1971_dblp_bibtex[0].strip())
+        summary = session.summary()
+        self.assertEqual(summary["requests"], 1)
+        self.assertEqual(summary["bytes"], len(response.content))
+        self.assertLess(summary["wire_bytes"], summary["bytes"])
+
+    def test_get_conditional(self):
+        with FakeDblpServer(self.sigir_1971_dblp_json, self.sigir_1971_dblp_bibtex) as fake_dblp:
+            parameters = {"q":"streamid:conf/sigir:year:1971", "format":"json", "h":"1000", "f":"0"}
+            session = Session(validators_filepath=self.validators_filepath)
+            text = session.get(fake_dblp.api_endpoint, parameters).text
+            session.close()
+            # validators are loaded from file by a new session, but the body is taken from the caller's cache
+            session = Session(validators_filepath=self.validators_filepath)
+            response = session.get(fake_dblp.api_endpoint, parameters, cached_text=lambda: text)
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(response.text, text)
+            self.assertEqual(response.json()["result"]["hits"]["@total"], "21")
+            # without a cached body, the request is not conditional
+            self.assertEqual(session.get(fake_dblp.api_endpoint, parameters, cached_text=lambda: None).status_code, 200)
+            self.assertEqual(session.get(fake_dblp.api_endpoint, parameters).status_code, 200)
+        self.assertEqual(session.summary()["requests"], 3)
+        self.assertEqual(session.summary()["not_modified"], 1)
+        # only validators are stored, one row per URL
+        with session._lock:
+            rows = session._connection.execute("SELECT * FROM validators").fetchall()
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(len(rows[0]), 3)
+        session.close()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,30 @@
+from unicodedata import normalize
+import unittest
+
+from utils.utils import convert_string_to_ascii, get_ascii_last_name
+
+
+class TestUtils(unittest.TestCase):
+
+    def _convert_string_to_ascii(self, string):
+        # character-wise conversion the translation table replaces
+        return "".join([{"ä":"ae","ö":"oe","ü":"ue","ß":"ss"}.get(character,
+                                                                 normalize("NFD", character).encode("ASCII", "ignore").decode("ASCII"))
+                        for character in string])
+
+    def test_convert_string_to_ascii(self):
+        self.assertEqual(convert_string_to_ascii("Günther Größ Hörmann Ændersøn Ça"), "Guenther Groess Hoermann ndersn Ca")
+        self.assertEqual(convert_string_to_ascii("potthast"), "potthast")
+        self.assertEqual(convert_string_to_ascii("ä"), "a")
+        strings = ["".join(chr(codepoint) for codepoint in range(start, start + 64)) for start in range(0, 0x30000, 64)]
+        for string in strings + ["Ä Ö Ü ä́ö", "Åström", "Nguyễn", "Dvořák"]:
+            self.assertEqual(convert_string_to_ascii(string), self._convert_string_to_ascii(string))
+
+    def test_get_ascii_last_name(self):
+        self.assertEqual(get_ascii_last_name("Sebastian Günther 0002"), "guenther")
+        self.assertEqual(get_ascii_last_name("Jean-Pierre  Lefèvre"), "lefevre")
+        self.assertEqual(get_ascii_last_name(""), "")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+from os.path import sep
+from shutil import rmtree
+from tempfile import mkdtemp
+from time import sleep
+import unittest
+
+from scripts.work_queue import WorkQueue
+
+
+class TestWorkQueue(unittest.TestCase):
+
+    def setUp(self):
+        self.output_directory = mkdtemp()
+        self.work_queue = WorkQueue(self.output_directory + sep + "work_queue.sqlite", max_attempts=2)
+        self.work_queue.put([("sigir", 1971), ("sigir", 1975)])
+
+    def tearDown(self):
+        self.work_queue.close()
+        rmtree(self.output_directory)
+
+    def test_lease_and_complete(self):
+        task_id, venue, year = self.work_queue.lease("worker-1", 60)
+        self.assertEqual((venue, year), ("sigir", 1971))
+        self.assertEqual(self.work_queue.lease("worker-2", 60)[1:], ("sigir", 1975))
+        self.assertIsNone(self.work_queue.lease("worker-3", 60))
+        self.assertFalse(self.work_queue.complete(task_id, "worker-2", {}))
+        self.assertTrue(self.work_queue.renew(task_id, "worker-1", 60))
+        self.assertTrue(self.work_queue.complete(task_id, "worker-1", {"bib_filepath":"conf-sigir-1971.bib"}))
+        self.assertFalse(self.work_queue.renew(task_id, "worker-1", 60))
+        self.assertEqual(self.work_queue.get_tasks(WorkQueue.DONE),
+                         [(task_id, "sigir", 1971, {"bib_filepath":"conf-sigir-1971.bib"})])
+        self.assertFalse(self.work_queue.is_drained())
+        self.work_queue.mark_merged(task_id)
+        self.assertEqual(self.work_queue.counts(), {WorkQueue.MERGED:1, WorkQueue.LEASED:1})
+
+    def test_expired_lease(self):
+        task_id, _, _ = self.work_queue.lease("crashed-worker", 0.1)
+        self.work_queue.lease("worker-1", 60)
+        sleep(0.2)
+        # THE TASK OF THE CRASHED WORKER IS LEASED AGAIN ONCE ITS LEASE EXPIRED
+        self.assertEqual(self.work_queue.lease("worker-2", 0.1), (task_id, "sigir", 1971))
+        self.assertFalse(self.work_queue.complete(task_id, "crashed-worker", {}))
+        sleep(0.2)
+        # ... UNTIL IT WAS LEASED max_attempts TIMES
+        self.assertIsNone(self.work_queue.lease("worker-3", 60))
+        self.assertEqual([task[1:3] for task in self.work_queue.get_tasks(WorkQueue.FAILED)], [("sigir", 1971)])
+
+    def test_release(self):
+        task_id, _, _ = self.work_queue.lease("worker-1", 60)
+        self.work_queue.release(task_id, "worker-1")
+        self.assertEqual(self.work_queue.lease("worker-2", 60), (task_id, "sigir", 1971))
+        self.work_queue.release(task_id, "worker-2")
+        self.assertEqual(self.work_queue.counts()[WorkQueue.FAILED], 1)
+
+    def test_put(self):
+        task_id, _, _ = self.work_queue.lease("worker-1", 60)
+        self.work_queue.complete(task_id, "worker-1", {})
+        other_task_id, _, _ = self.work_queue.lease("worker-1", 60)
+        # TASKS ARE RESET UNLESS LEASED
+        self.work_queue.put([("sigir", 1971), ("sigir", 1975), ("www", 2021)])
+        self.assertEqual(self.work_queue.counts(), {WorkQueue.PENDING:2, WorkQueue.LEASED:1})
+        self.assertTrue(self.work_queue.complete(other_task_id, "worker-1", {}))
+
+
+if __name__ == "__main__":
+    unittest.main()
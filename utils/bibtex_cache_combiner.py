@@ -1,25 +1,199 @@
-from json import loads, dumps
-from os.path import exists
+"""
+Combine any number of bibtex cache files, e.g. of several scraping machines, into one
+bibtex cache of either backend:
 
-bibtex_dump_filepaths = ["dblp_bibtex_cache1.txt",
-                         "dblp_bibtex_cache2.txt"]
+python -m utils.bibtex_cache_combiner dblp_bibtex_cache1.txt dblp_bibtex_cache2.sqlite --output dblp_bibtex_cache.sqlite
 
-entries = {}
+The input caches are split into sorted runs of at most run_size records (one worker
+process per input cache), which are merged in URL order (k-way merge) into the output
+cache, so memory use is bounded by the size of the runs instead of the size of the caches.
 
-for bibtex_dump_filepath in bibtex_dump_filepaths:
+Records of one URL are compared by the SHA-256 hash of their bibtex. Within an input cache,
+the last record of a URL is the current one (as when loading the cache); across input caches,
+the record of the first input cache is kept. URLs whose bibtex differs between input caches
+are written to a conflict report (JSON lines), e.g.
 
-    with open(bibtex_dump_filepath) as file:
-        for line in file:
-            url, bibtex = loads(line)
-            if url not in entries:
-                entries[url] = bibtex
+{"url": "https://dblp.org/rec/conf/sigir/C71", "kept": "dblp_bibtex_cache1.txt",
+ "versions": [{"sha256": "...", "inputs": ["dblp_bibtex_cache1.txt"], "bibtex": "..."}, ...]}
+"""
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
+from hashlib import sha256
+from heapq import merge
+from itertools import groupby
+import json
+from os import cpu_count
+from os.path import exists, sep, splitext
+from shutil import rmtree
+from tempfile import mkdtemp
+
+from scripts.dblp.bibtex_cache import JsonlBibtexCache, open_bibtex_cache
+from utils.utils import loads_json
+
+
+def combine_bibtex_caches(input_filepaths, output_filepath, conflicts_filepath=None, run_size=100000,
+                          workers=None, temp_directory=None):
+    """
+    Combine bibtex cache files into one bibtex cache file.
+
+    Args:
+        input_filepaths: List of paths to the input cache files (JSON lines or SQLite, by
+                         file extension as in open_bibtex_cache), in order of precedence.
+        output_filepath: The path to the output cache file, which must not exist yet; the
+                         backend is chosen by file extension as in open_bibtex_cache.
+        conflicts_filepath: The path to the conflict report (default: the output file path
+                            without extension, followed by '_conflicts.jsonl').
+        run_size: The maximum number of records of a sorted run (default: 100000).
+        workers: The number of worker processes sorting runs (default: one per input cache,
+                 at most the number of CPUs).
+        temp_directory: The directory in which the runs are stored temporarily (default:
+                        the temporary directory of the system).
+    Returns:
+        A dictionary of the number of records read, of URLs written and of conflicts.
+    """
+    if exists(output_filepath):
+        raise FileExistsError("Output file " + output_filepath + " already exists!")
+    if conflicts_filepath is None:
+        conflicts_filepath = splitext(output_filepath)[0] + "_conflicts.jsonl"
+    run_directory = mkdtemp(dir=temp_directory)
+    try:
+        with ProcessPoolExecutor(max_workers=workers or min(len(input_filepaths), cpu_count() or 1)) as executor:
+            results = list(executor.map(_write_runs, range(len(input_filepaths)), input_filepaths,
+                                        [run_directory] * len(input_filepaths), [run_size] * len(input_filepaths)))
+        run_filepaths = [run_filepath for run_filepaths, _ in results for run_filepath in run_filepaths]
+        stats = {"records":sum(count for _, count in results), "urls":0, "conflicts":0}
+
+        output_cache = open_bibtex_cache(output_filepath, batch_size=1000, load=False)
+        # JSON LINES ARE APPENDED TO THE FILE DIRECTLY, AS JsonlBibtexCache KEEPS ALL RECORDS IN MEMORY
+        jsonl = isinstance(output_cache, JsonlBibtexCache)
+        output_file = open(output_filepath, "w") if jsonl else None
+        try:
+            with open(conflicts_filepath, "w") as conflicts_file:
+                records = merge(*[_read_run(run_filepath) for run_filepath in run_filepaths], key=lambda record: record[:3])
+                for url, url_records in groupby(records, key=lambda record: record[0]):
+                    # LATER RECORDS OF AN INPUT CACHE REPLACE EARLIER ONES
+                    versions = {input_index:(digest, bibtex) for _, input_index, _, digest, bibtex in url_records}
+                    kept_index = min(versions)
+                    bibtex = versions[kept_index][1]
+                    if len({digest for digest, _ in versions.values()}) > 1:
+                        conflicts_file.write(json.dumps(_get_conflict(url, versions, input_filepaths, kept_index)) + "\n")
+                        stats["conflicts"] += 1
+                    if jsonl:
+                        output_file.write(json.dumps([url,bibtex]) + "\n")
+                    else:
+                        output_cache.put(url, bibtex)
+                    stats["urls"] += 1
+        finally:
+            if jsonl:
+                output_file.close()
             else:
-                if bibtex != entries[url]:
-                    print("Bibtex mismatch:", url)
+                output_cache.close()
+    finally:
+        rmtree(run_directory)
+    return stats
+
+def _read_records(filepath):
+    """
+    Read the records of a bibtex cache file one by one, without loading the cache into memory.
+
+    Args:
+        filepath: The path to the cache file.
+    Returns:
+        An iterator of (url, bibtex) tuples, in the order of the file.
+    """
+    if filepath.endswith((".sqlite", ".db")):
+        bibtex_cache = open_bibtex_cache(filepath)
+        try:
+            yield from bibtex_cache.items()
+        finally:
+            bibtex_cache.close()
+    else:
+        with open(filepath) as file:
+            for line in file:
+                try:
+                    url, bibtex = loads_json(line)
+                except json.decoder.JSONDecodeError:
+                    # partially written record of an interrupted run
+                    continue
+                yield url, bibtex
+
+def _write_runs(input_index, filepath, run_directory, run_size):
+    """
+    Split the records of a bibtex cache file into sorted runs, i.e. files of at most run_size
+    records sorted by URL and position in the cache file. Each record of a run is a JSON list
+    of URL, input index, position, SHA-256 hash of the bibtex and bibtex.
+
+    Args:
+        input_index: The index of the cache file among the input caches.
+        filepath: The path to the cache file.
+        run_directory: The directory of the runs.
+        run_size: The maximum number of records of a run.
+    Returns:
+        A tuple of the list of paths to the runs and the number of records read.
+    """
+    run_filepaths = []
+    run = []
+    count = 0
+    for position, (url, bibtex) in enumerate(_read_records(filepath)):
+        run.append([url, input_index, position, sha256(bibtex.encode("utf-8")).hexdigest(), bibtex])
+        count += 1
+        if len(run) >= run_size:
+            run_filepaths.append(_write_run(run, run_directory + sep + str(input_index) + "-" + str(len(run_filepaths)) + ".jsonl"))
+            run = []
+    if run:
+        run_filepaths.append(_write_run(run, run_directory + sep + str(input_index) + "-" + str(len(run_filepaths)) + ".jsonl"))
+    return run_filepaths, count
+
+def _write_run(run, filepath):
+    run.sort(key=lambda record: (record[0], record[2]))
+    with open(filepath, "w") as file:
+        file.write("".join(json.dumps(record) + "\n" for record in run))
+    return filepath
+
+def _read_run(filepath):
+    with open(filepath) as file:
+        for line in file:
+            yield loads_json(line)
+
+def _get_conflict(url, versions, input_filepaths, kept_index):
+    """
+    Describe the differing bibtex of a URL in the input caches.
+
+    Args:
+        url: The dblp URL of the entry.
+        versions: Dictionary of input index and (SHA-256 hash, bibtex) key-value pairs.
+        input_filepaths: List of paths to the input cache files.
+        kept_index: The index of the input cache whose bibtex is kept.
+    Returns:
+        A dictionary of the URL, the input cache whose bibtex is kept and the distinct
+        versions of the bibtex with their hash and the input caches containing them.
+    """
+    distinct_versions = {}
+    for input_index, (digest, bibtex) in sorted(versions.items()):
+        if digest not in distinct_versions:
+            distinct_versions[digest] = {"sha256":digest, "inputs":[], "bibtex":bibtex}
+        distinct_versions[digest]["inputs"].append(input_filepaths[input_index])
+    return {"url":url, "kept":input_filepaths[kept_index], "versions":list(distinct_versions.values())}
 
-print(len(entries))
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Combine bibtex cache files into one bibtex cache file.")
+    parser.add_argument("inputs", nargs="+",
+                        help="paths of the input cache files, in order of precedence")
+    parser.add_argument("--output", default="dblp_bibtex_cache.txt",
+                        help="path of the output cache file; '.sqlite' or '.db' for an SQLite cache (default: dblp_bibtex_cache.txt)")
+    parser.add_argument("--conflicts", default=None,
+                        help="path of the conflict report (default: [output]_conflicts.jsonl)")
+    parser.add_argument("--run-size", type=int, default=100000,
+                        help="maximum number of records sorted in memory per run (default: 100000)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="number of worker processes (default: one per input cache, at most the number of CPUs)")
+    parser.add_argument("--temp-directory", default=None,
+                        help="directory of the temporary runs (default: the temporary directory of the system)")
+    args = parser.parse_args()
 
-if not exists("dblp_bibtex_cache.txt"):
-    with open("dblp_bibtex_cache.txt", "w") as file:
-        for url in sorted(entries.keys(),key = lambda url: url.split("/")[4]):
-            file.write(dumps([url,entries[url]]) + "\n")
+    if exists(args.output):
+        print("Output file " + args.output + " already exists!")
+    else:
+        stats = combine_bibtex_caches(args.inputs, args.output, args.conflicts, args.run_size, args.workers, args.temp_directory)
+        print(str(stats["records"]) + " records read, " + str(stats["urls"]) + " URLs written, " +
+              str(stats["conflicts"]) + " conflicts.")
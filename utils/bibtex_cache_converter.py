@@ -0,0 +1,26 @@
+"""
+Convert a bibtex cache file between backends, e.g. import a JSON lines cache
+into an SQLite cache or export an SQLite cache to JSON lines:
+
+python -m utils.bibtex_cache_converter dblp_bibtex_cache.txt dblp_bibtex_cache.sqlite
+python -m utils.bibtex_cache_converter dblp_bibtex_cache.sqlite dblp_bibtex_cache.txt
+"""
+from os.path import exists
+from sys import argv
+
+from scripts.dblp.bibtex_cache import open_bibtex_cache
+
+input_filepath, output_filepath = argv[1:3]
+
+if exists(output_filepath):
+    print("Output file " + output_filepath + " already exists!")
+else:
+    input_cache = open_bibtex_cache(input_filepath)
+    if output_filepath.endswith((".sqlite", ".db")):
+        output_cache = open_bibtex_cache(output_filepath, batch_size=1000)
+        for url, bibtex in input_cache.items():
+            output_cache.put(url, bibtex)
+        output_cache.close()
+    else:
+        input_cache.export_jsonl(output_filepath)
+    input_cache.close()
@@ -0,0 +1,165 @@
+from contextlib import contextmanager
+from threading import Lock
+from time import perf_counter
+
+
+class Metrics:
+    """
+    Counters, histograms and spans of a run, e.g. of requests, cache lookups and the time spent
+    scraping and formatting. Metrics are identified by name and labels; the metrics of a run are
+    summarized or exported in the Prometheus text format.
+
+    Attributes:
+        buckets: Upper bounds of the histogram buckets (in seconds for spans).
+        counters: Dictionary of (name, labels) and value key-value pairs.
+        histograms: Dictionary of (name, labels) and [bucket counts, count, sum] key-value pairs.
+    """
+
+    BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60)
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counters = {}
+        self.histograms = {}
+        self.lock = Lock()
+
+    def increment(self, name, value=1, **labels):
+        """
+        Increment a counter.
+
+        Args:
+            name: The name of the counter, e.g. 'http_responses_total'.
+            value: The value added to the counter (default: 1).
+            labels: The labels of the counter, e.g. status=200.
+        """
+        key = self._get_key(name, labels)
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        """
+        Add an observation to a histogram.
+
+        Args:
+            name: The name of the histogram, e.g. 'http_request_seconds'.
+            value: The observed value.
+            labels: The labels of the histogram.
+        """
+        key = self._get_key(name, labels)
+        with self.lock:
+            if key not in self.histograms:
+                self.histograms[key] = [[0] * len(self.buckets), 0, 0]
+            histogram = self.histograms[key]
+            for index, bucket in enumerate(self.buckets):
+                if value <= bucket:
+                    histogram[0][index] += 1
+                    break
+            histogram[1] += 1
+            histogram[2] += value
+
+    @contextmanager
+    def span(self, name, **labels):
+        """
+        Measure the duration of a block, which is added to the histogram [name]_seconds.
+
+        Args:
+            name: The name of the span, e.g. 'scrape_entries'.
+            labels: The labels of the span.
+        """
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name + "_seconds", perf_counter() - start, **labels)
+
+    def get_counter(self, name, **labels):
+        """
+        Get the value of a counter.
+
+        Args:
+            name: The name of the counter.
+            labels: The labels of the counter.
+        Returns:
+            The value of the counter (0 if it was never incremented).
+        """
+        with self.lock:
+            return self.counters.get(self._get_key(name, labels), 0)
+
+    def get_histogram(self, name, **labels):
+        """
+        Get the number and sum of the observations of a histogram.
+
+        Args:
+            name: The name of the histogram.
+            labels: The labels of the histogram.
+        Returns:
+            A tuple of the number and the sum of the observations.
+        """
+        with self.lock:
+            histogram = self.histograms.get(self._get_key(name, labels))
+            return (histogram[1], histogram[2]) if histogram else (0, 0)
+
+    def summary(self):
+        """
+        Summarize the metrics of the run.
+
+        Returns:
+            A dictionary with the value of each counter and the number, sum and mean of the
+            observations of each histogram, keyed by name and labels; histograms are ordered
+            by the sum of their observations, so spans taking most of the time come first.
+        """
+        with self.lock:
+            counters = dict(self.counters)
+            histograms = {key:(histogram[1], histogram[2]) for key, histogram in self.histograms.items()}
+        return {"counters":{self._format_key(*key):value for key, value in sorted(counters.items())},
+                "histograms":{self._format_key(*key):{"count":count, "sum":total, "mean":total / count}
+                              for key, (count, total) in sorted(histograms.items(), key=lambda item: -item[1][1])}}
+
+    def export_prometheus(self):
+        """
+        Export the metrics in the Prometheus text format.
+
+        Returns:
+            A string of all counters and histograms.
+        """
+        with self.lock:
+            counters = sorted(self.counters.items())
+            histograms = sorted((key, [list(histogram[0])] + histogram[1:]) for key, histogram in self.histograms.items())
+        lines = []
+        previous_name = None
+        for (name, labels), value in counters:
+            if name != previous_name:
+                lines.append("# TYPE " + name + " counter")
+                previous_name = name
+            lines.append(self._format_key(name, labels) + " " + str(value))
+        for (name, labels), (bucket_counts, count, total) in histograms:
+            if name != previous_name:
+                lines.append("# TYPE " + name + " histogram")
+                previous_name = name
+            cumulative_count = 0
+            for bucket, bucket_count in zip(self.buckets, bucket_counts):
+                cumulative_count += bucket_count
+                lines.append(self._format_key(name + "_bucket", labels + (("le", str(bucket)),)) + " " + str(cumulative_count))
+            lines.append(self._format_key(name + "_bucket", labels + (("le", "+Inf"),)) + " " + str(count))
+            lines.append(self._format_key(name + "_sum", labels) + " " + str(total))
+            lines.append(self._format_key(name + "_count", labels) + " " + str(count))
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, filepath):
+        """
+        Write the metrics in the Prometheus text format to a file.
+
+        Args:
+            filepath: The path of the file.
+        """
+        with open(filepath, "w") as file:
+            file.write(self.export_prometheus())
+
+    def _get_key(self, name, labels):
+        return (name, tuple(sorted((label, str(value)) for label, value in labels.items())))
+
+    def _format_key(self, name, labels):
+        if not labels:
+            return name
+        return name + "{" + ",".join(label + "=\"" + value.replace("\\", "\\\\").replace("\"", "\\\"") + "\""
+                                     for label, value in labels) + "}"
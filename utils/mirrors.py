@@ -0,0 +1,115 @@
+from threading import Lock
+from time import monotonic
+
+
+class MirrorRouter:
+    """
+    Route requests to dblp across mirrors, e.g. https://dblp.org,
+    https://dblp.uni-trier.de and https://dblp.dagstuhl.de.
+
+    URLs of any of the mirrors are rewritten to the healthy mirrors in turn, so the
+    requests are spread across the mirrors; since the rate limiter keeps one bucket
+    per host, each mirror has a rate budget of its own (see RateLimiter.rates) and the
+    total request rate grows with the number of mirrors. A mirror is unhealthy for
+    cooldown seconds after a failed request and receives no requests while unhealthy,
+    unless all mirrors are unhealthy.
+
+    Attributes:
+        mirrors: List of base URLs of the mirrors; the first one is the canonical
+                 mirror, to which URLs are rewritten by canonicalize.
+        cooldown: Seconds a mirror is unhealthy after a failed request.
+    """
+
+    def __init__(self, mirrors, cooldown=60):
+        self.mirrors = [mirror.rstrip("/") for mirror in mirrors]
+        self.cooldown = cooldown
+        self._unhealthy = {}
+        self._next = 0
+        self._lock = Lock()
+
+    def get_mirror(self, url):
+        """
+        Get the mirror of a URL.
+
+        Args:
+            url: A URL, e.g. 'https://dblp.uni-trier.de/rec/conf/sigir/C71.bib'.
+        Returns:
+            The base URL of the mirror, e.g. 'https://dblp.uni-trier.de', or
+            None if the URL does not belong to any of the mirrors.
+        """
+        for mirror in self.mirrors:
+            if url == mirror or url.startswith(mirror + "/"):
+                return mirror
+        return None
+
+    def canonicalize(self, url):
+        """
+        Rewrite a URL of any of the mirrors to the canonical mirror.
+
+        Args:
+            url: A URL, e.g. 'https://dblp.uni-trier.de/rec/conf/sigir/C71'.
+        Returns:
+            The URL on the canonical mirror, e.g. 'https://dblp.org/rec/conf/sigir/C71';
+            URLs not belonging to any of the mirrors are returned unchanged.
+        """
+        mirror = self.get_mirror(url)
+        return self.mirrors[0] + url[len(mirror):] if mirror else url
+
+    def route(self, url):
+        """
+        Rewrite a URL of any of the mirrors to the next healthy mirror.
+
+        Args:
+            url: A URL, e.g. 'https://dblp.org/rec/conf/sigir/C71.bib'.
+        Returns:
+            The URL on the next healthy mirror (or, if all mirrors are unhealthy, on the
+            mirror healthy again first); URLs not belonging to any of the mirrors are
+            returned unchanged.
+        """
+        mirror = self.get_mirror(url)
+        if mirror is None:
+            return url
+        with self._lock:
+            now = monotonic()
+            healthy = [mirror for mirror in self.mirrors if self._unhealthy.get(mirror, 0) <= now]
+            if not healthy:
+                healthy = [min(self.mirrors, key=lambda mirror: self._unhealthy[mirror])]
+            routed = healthy[self._next % len(healthy)]
+            self._next += 1
+        return routed + url[len(mirror):]
+
+    def record_success(self, url):
+        """
+        Record a successful request, which makes its mirror healthy.
+
+        Args:
+            url: The requested URL.
+        """
+        mirror = self.get_mirror(url)
+        if mirror:
+            with self._lock:
+                self._unhealthy.pop(mirror, None)
+
+    def record_failure(self, url):
+        """
+        Record a failed request, which makes its mirror unhealthy for cooldown seconds.
+
+        Args:
+            url: The requested URL.
+        """
+        mirror = self.get_mirror(url)
+        if mirror:
+            with self._lock:
+                self._unhealthy[mirror] = monotonic() + self.cooldown
+
+    def is_healthy(self, mirror):
+        """
+        Check whether a mirror is healthy.
+
+        Args:
+            mirror: The base URL of the mirror.
+        Returns:
+            True if the mirror is healthy, False otherwise.
+        """
+        with self._lock:
+            return self._unhealthy.get(mirror.rstrip("/"), 0) <= monotonic()
@@ -0,0 +1,115 @@
+from threading import Lock
+from time import monotonic, sleep
+from urllib.parse import urlparse
+
+
+class RateLimiter:
+    """
+    Token bucket rate limiter shared by all requests to dblp, with one bucket per host.
+
+    Each request takes one token from the bucket of its host; tokens are refilled at
+    the rate configured for the host. Requests that find the bucket empty reserve the
+    next token and sleep until it becomes available, so concurrent callers are served
+    in order and the overall request rate per host never exceeds the configured rate.
+
+    If adaptive, the rate of each host starts at the configured rate and is adapted
+    to the responses of the host (additive increase, multiplicative decrease): every
+    successful request increases the rate by increase, up to max_rate, and every
+    request answered with 429 (Too Many Requests) multiplies the rate by decrease,
+    down to min_rate.
+
+    Attributes:
+        rates: Dictionary of host and requests-per-second key-value pairs.
+        default_rate: Requests per second for hosts not contained in rates;
+                      set to one request every 3 seconds by default. A rate of
+                      None or 0 disables rate limiting.
+        burst: Maximum number of tokens a bucket can hold.
+        adaptive: Whether to adapt the rate of each host to its responses.
+        min_rate: Minimum requests per second of an adapted rate.
+        max_rate: Maximum requests per second of an adapted rate; never lower
+                  than the configured rate.
+        increase: Requests per second added to the rate after each successful request.
+        decrease: Factor the rate is multiplied with after each throttled request.
+    """
+
+    def __init__(self, rates=None, default_rate=1/3, burst=1, adaptive=False,
+                 min_rate=1/60, max_rate=1, increase=0.01, decrease=0.5):
+        self.rates = rates if rates else {}
+        self.default_rate = default_rate
+        self.burst = burst
+        self.adaptive = adaptive
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self._adapted_rates = {}
+        self._buckets = {}
+        self._lock = Lock()
+
+    def get_rate(self, host):
+        """
+        Get the current rate of a host, i.e. the configured rate or,
+        if adaptive, the rate adapted to the responses of the host.
+
+        Args:
+            host: The host name, e.g. 'dblp.org'.
+        Returns:
+            The number of requests per second allowed for the host.
+        """
+        rate = self.rates.get(host, self.default_rate)
+        if not rate:
+            return rate
+        return self._adapted_rates.get(host, rate)
+
+    def on_success(self, url):
+        """
+        Increase the rate of the host of the given URL after a successful request,
+        if adaptive.
+
+        Args:
+            url: The requested URL.
+        """
+        host = urlparse(url).netloc
+        rate = self.rates.get(host, self.default_rate)
+        if self.adaptive and rate:
+            with self._lock:
+                self._adapted_rates[host] = min(max(self.max_rate, rate),
+                                                self._adapted_rates.get(host, rate) + self.increase)
+
+    def on_throttle(self, url):
+        """
+        Decrease the rate of the host of the given URL after a request
+        answered with 429 (Too Many Requests), if adaptive.
+
+        Args:
+            url: The requested URL.
+        """
+        host = urlparse(url).netloc
+        rate = self.rates.get(host, self.default_rate)
+        if self.adaptive and rate:
+            with self._lock:
+                self._adapted_rates[host] = max(self.min_rate,
+                                                self._adapted_rates.get(host, rate) * self.decrease)
+
+    def acquire(self, url):
+        """
+        Block until a request to the host of the given URL is allowed.
+
+        Args:
+            url: The URL to be requested.
+        Returns:
+            The number of seconds waited.
+        """
+        host = urlparse(url).netloc
+        rate = self.get_rate(host)
+        if not rate:
+            return 0
+        with self._lock:
+            now = monotonic()
+            tokens, last = self._buckets.get(host, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - last) * rate) - 1
+            self._buckets[host] = (tokens, now)
+        delay = -tokens / rate if tokens < 0 else 0
+        if delay:
+            sleep(delay)
+        return delay
@@ -0,0 +1,144 @@
+from email.utils import parsedate_to_datetime
+from random import uniform
+from threading import Lock
+from time import monotonic, time
+from urllib.parse import urlparse
+
+
+class RetryError(TimeoutError):
+    """
+    Raised if a request still fails after the maximum number of attempts.
+    """
+
+
+class CircuitOpenError(RetryError):
+    """
+    Raised if a request is not sent because the circuit of its host is open.
+    """
+
+
+class RetryPolicy:
+    """
+    Retry policy for requests to dblp with jittered exponential backoff and
+    one circuit breaker per host.
+
+    Requests answered with 429 (Too Many Requests) or a 5xx status code, and
+    requests failing with a connection error or timeout, are retried. The delay
+    before a retry is taken from the Retry-After header of the response if present
+    and drawn uniformly from [0, min(max_delay, base_delay * 2^attempt)] otherwise
+    ("full jitter"), so concurrent callers do not retry in lockstep.
+
+    The circuit of a host opens after failure_threshold consecutive failures
+    (5xx or connection errors; 429 only signals throttling) and requests to the
+    host then fail immediately with CircuitOpenError. After reset_timeout seconds
+    a single trial request is let through; its success closes the circuit again.
+
+    Attributes:
+        max_attempts: Maximum number of attempts per request.
+        base_delay: Delay in seconds before the first retry, doubled for each further retry.
+        max_delay: Maximum delay in seconds before a retry.
+        failure_threshold: Number of consecutive failures after which the circuit of a host opens.
+        reset_timeout: Seconds after which an open circuit lets a trial request through.
+    """
+
+    def __init__(self, max_attempts=6, base_delay=5, max_delay=120, failure_threshold=5, reset_timeout=300):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._circuits = {}
+        self._lock = Lock()
+
+    def is_retryable(self, response):
+        """
+        Check whether a response shall be retried.
+
+        Args:
+            response: The response to a request.
+        Returns:
+            True if the response has status code 429 or 5xx, False otherwise.
+        """
+        return response.status_code == 429 or response.status_code >= 500
+
+    def get_delay(self, attempt, response=None):
+        """
+        Get the delay before retrying a request.
+
+        Args:
+            attempt: The number of the failed attempt, starting at 0.
+            response: The response to the failed attempt (optional).
+        Returns:
+            The delay in seconds.
+        """
+        retry_after = self.get_retry_after(response) if response is not None else None
+        if retry_after is not None:
+            return min(retry_after, self.max_delay)
+        return uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def get_retry_after(self, response):
+        """
+        Get the delay requested by the Retry-After header of a response.
+
+        Args:
+            response: The response to a request.
+        Returns:
+            The delay in seconds, or None if the response has no valid Retry-After header.
+        """
+        retry_after = response.headers.get("Retry-After")
+        if retry_after is None:
+            return None
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time())
+        except (TypeError, ValueError):
+            return None
+
+    def check(self, url):
+        """
+        Check whether a request to the host of the given URL may be sent.
+
+        Args:
+            url: The URL to be requested.
+        Throws:
+            CircuitOpenError if the circuit of the host is open.
+        """
+        host = urlparse(url).netloc
+        with self._lock:
+            failures, opened = self._circuits.get(host, (0, None))
+            if opened is None:
+                return
+            if monotonic() - opened < self.reset_timeout:
+                raise CircuitOpenError("Circuit of " + host + " is open after " +
+                                       str(failures) + " consecutive failures.")
+            # half-open: let one trial request through and keep the others waiting for its result
+            self._circuits[host] = (failures, monotonic())
+
+    def record_success(self, url):
+        """
+        Record a successful request, which closes the circuit of its host.
+
+        Args:
+            url: The requested URL.
+        """
+        with self._lock:
+            self._circuits.pop(urlparse(url).netloc, None)
+
+    def record_failure(self, url):
+        """
+        Record a failed request, which opens the circuit of its host after
+        failure_threshold consecutive failures.
+
+        Args:
+            url: The requested URL.
+        """
+        host = urlparse(url).netloc
+        with self._lock:
+            failures, opened = self._circuits.get(host, (0, None))
+            failures += 1
+            if failures >= self.failure_threshold:
+                opened = monotonic()
+            self._circuits[host] = (failures, opened)
@@ -0,0 +1,137 @@
+import sqlite3
+from threading import Lock
+from time import perf_counter
+
+from requests import Request, Session as RequestsSession
+from requests.adapters import HTTPAdapter
+
+
+class Session:
+    """
+    Shared HTTP session for all requests to dblp.
+
+    Connections are pooled and kept alive, responses are requested gzip-compressed
+    and every request has a timeout. ETag and Last-Modified validators of responses
+    are stored in an SQLite table keyed by URL (optionally persisted to file), so
+    repeated requests whose body the caller has cached (e.g. in the API or bibtex
+    cache) are sent as conditional requests and unchanged resources are not
+    downloaded again. Latency and bytes of the requests are totalled.
+
+    Attributes:
+        timeout: Timeout of each request in seconds.
+        validators_filepath: The path to the database file of persisted validators (optional).
+        totals: Dictionary of the number of requests, the number of requests answered with
+                304 (Not Modified), the latency and the bytes of response bodies and the
+                bytes transferred, totalled over all requests.
+    """
+
+    def __init__(self, timeout=30, pool_size=10, validators_filepath=None):
+        self.timeout = timeout
+        self.validators_filepath = validators_filepath
+        self.totals = {"requests":0, "not_modified":0, "latency":0, "bytes":0, "wire_bytes":0}
+        self._lock = Lock()
+        self._session = RequestsSession()
+        self._session.headers.update({"Accept-Encoding":"gzip, deflate"})
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+        self._connection = sqlite3.connect(validators_filepath or ":memory:", check_same_thread=False)
+        self._connection.execute("CREATE TABLE IF NOT EXISTS validators (url TEXT PRIMARY KEY, etag TEXT, " +
+                                 "last_modified TEXT)")
+        self._connection.commit()
+
+    def _get_validators(self, url):
+        """
+        Get the stored validators of a URL.
+
+        Args:
+            url: The full URL of the request, including query parameters.
+        Returns:
+            A tuple of etag and last_modified, or None if no validators are stored.
+        """
+        with self._lock:
+            return self._connection.execute("SELECT etag, last_modified FROM validators WHERE url = ?",
+                                            (url,)).fetchone()
+
+    def _store_validators(self, url, response):
+        """
+        Store the validators of a response, if it has any, replacing those stored for the URL.
+
+        Args:
+            url: The full URL of the request, including query parameters.
+            response: The response to the request.
+        """
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if etag or last_modified:
+            with self._lock, self._connection:
+                self._connection.execute("INSERT OR REPLACE INTO validators (url, etag, last_modified) VALUES (?, ?, ?)",
+                                         (url, etag, last_modified))
+
+    def get(self, url, parameters = {}, cached_text = None):
+        """
+        Send a (conditional) GET request.
+
+        The request is sent as a conditional request if validators of the URL are stored
+        and cached_text provides the body of the cached response. If the server responds
+        with 304 (Not Modified), that body is used as the text of the response.
+
+        Args:
+            url: The URL to request.
+            parameters: Dictionary of query parameters (optional).
+            cached_text: Function returning the body of the cached response to the request,
+                         or None if it is not cached (optional).
+        Returns:
+            The response to the request.
+        """
+        request = self._session.prepare_request(Request("GET", url, params=parameters))
+        validators = self._get_validators(request.url) if cached_text else None
+        text = cached_text() if validators else None
+        if text is not None:
+            etag, last_modified = validators
+            if etag:
+                request.headers["If-None-Match"] = etag
+            if last_modified:
+                request.headers["If-Modified-Since"] = last_modified
+        start = perf_counter()
+        response = self._session.send(request, timeout=self.timeout)
+        latency = perf_counter() - start
+        wire_bytes = int(response.headers.get("Content-Length", len(response.content)))
+        if response.status_code == 304 and text is not None:
+            response._content = text.encode("utf-8")
+            response.encoding = "utf-8"
+        elif response.status_code == 200:
+            self._store_validators(request.url, response)
+        with self._lock:
+            self.totals["requests"] += 1
+            self.totals["not_modified"] += response.status_code == 304
+            self.totals["latency"] += latency
+            self.totals["bytes"] += len(response.content)
+            self.totals["wire_bytes"] += wire_bytes
+        return response
+
+    def summary(self):
+        """
+        Summarize the requests sent.
+
+        Returns:
+            A dictionary with the number of requests, the number of requests answered
+            with 304 (Not Modified), the total and mean latency in seconds, the number
+            of bytes of response bodies and the number of bytes transferred.
+        """
+        with self._lock:
+            totals = dict(self.totals)
+        return {"requests":totals["requests"],
+                "not_modified":totals["not_modified"],
+                "latency":totals["latency"],
+                "mean_latency":totals["latency"] / totals["requests"] if totals["requests"] else 0,
+                "bytes":totals["bytes"],
+                "wire_bytes":totals["wire_bytes"]}
+
+    def close(self):
+        """
+        Close the session and the validators database.
+        """
+        self._session.close()
+        with self._lock:
+            self._connection.close()
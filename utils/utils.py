@@ -1,10 +1,44 @@
+from functools import lru_cache
+import json
 from time import sleep
 from unicodedata import normalize
-from requests import get as GET
+
+from requests.exceptions import ConnectionError as RequestsConnectionError, Timeout
+
+from utils.retry import CircuitOpenError, RetryError, RetryPolicy
+from utils.session import Session
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+default_session = None
+default_retry_policy = None
+
+ASCII_EXCEPTIONS = str.maketrans({"ä":"ae","ö":"oe","ü":"ue","ß":"ss"})
+
+def loads_json(text):
+    """
+    Decode a JSON document, using orjson if installed (several times faster than json
+    for the large responses of the dblp API).
+
+    Args:
+        text: The JSON document (string or bytes).
+    Returns:
+        The decoded object.
+    Raises:
+        json.JSONDecodeError: If the document is no valid JSON (orjson.JSONDecodeError
+                              is a subclass).
+    """
+    if orjson:
+        return orjson.loads(text)
+    return json.loads(text)
 
 def normalize_to_ascii(character):
     return normalize("NFD",character).encode("ASCII","ignore").decode("ASCII")
 
+@lru_cache(maxsize=1 << 16)
 def convert_string_to_ascii(string):
     """
     Format string to ASCII, excluding the following exceptions:
@@ -14,40 +48,151 @@ def convert_string_to_ascii(string):
     ü -> ue
     ß -> ss
 
+    The exceptions are replaced via a precomputed translation table before the whole string
+    is decomposed (NFD) and stripped of non-ASCII characters; results are memoized, as the
+    same names recur throughout the anthology.
+
     Args:
         string: A string.
     Returns:
         ASCII-formatted version of the input string.
     """
-    return "".join([{"ä":"ae","ö":"oe","ü":"ue","ß":"ss"}.get(character, normalize_to_ascii(character)) for character in string])
+    if string.isascii():
+        return string
+    return normalize_to_ascii(string.translate(ASCII_EXCEPTIONS))
+
+@lru_cache(maxsize=1 << 18)
+def get_ascii_last_name(name):
+    """
+    Get the last name of a person name (lowercase and ASCII-formatted),
+    ignoring all characters but letters and spaces. Results are memoized.
+
+    Args:
+        name: A person name as provided by dblp, e.g. 'Sebastian Günther 0002'.
+    Returns:
+        The last name, e.g. 'guenther'.
+    """
+    return convert_string_to_ascii("".join([c for c in name if (c.isalpha() or c == " ")])
+                                   .strip()
+                                   .split(" ")[-1]
+                                   .lower())
+
+def get_default_session():
+    """
+    Get the session shared by all requests not sent with a session of their own.
+
+    Returns:
+        The default session.
+    """
+    global default_session
+    if default_session is None:
+        default_session = Session()
+    return default_session
 
-def get(logger, url, parameters = {}):
+def get_default_retry_policy():
+    """
+    Get the retry policy shared by all requests not sent with a retry policy of their own.
+
+    Returns:
+        The default retry policy.
+    """
+    global default_retry_policy
+    if default_retry_policy is None:
+        default_retry_policy = RetryPolicy()
+    return default_retry_policy
+
+def get(logger, url, parameters = {}, rate_limiter = None, session = None, retry_policy = None, mirror_router = None,
+        cached_text = None):
         """
-        Wrapper function for GET request. If the server responds with Error 429,
-        the request is repeated after a delay starting at 10 seconds and incrementing
-        by 10 seconds until the delay is greater than 60 seconds, at which point this
-        function throws a TimeoutError.
+        Wrapper function for GET request. Requests answered with 429 (Too Many Requests)
+        or a 5xx status code and requests failing with a connection error or timeout are
+        retried with jittered exponential backoff, honoring the Retry-After header, until
+        the maximum number of attempts of the retry policy is reached. The outcome of each
+        attempt is reported to the rate limiter (to adapt its rate) and to the circuit
+        breaker of the retry policy.
+
+        If a mirror router is provided, each attempt is routed to the next healthy mirror;
+        a failed attempt makes its mirror unhealthy, and the request is retried on another
+        mirror right away (without backoff) if there is one.
+
+        The responses, errors, retries and the time spent waiting for the rate limiter,
+        waiting for responses and backing off are recorded in the metrics of the logger.
 
         Args:
+            logger: The logger used.
             url: The url of the API endpoint.
             parameters: Dictionary of query parameters (optional).
+            rate_limiter: RateLimiter each request waits for before being sent (optional).
+            session: Session used to send the requests (optional); the default
+                     session is used if none is provided.
+            retry_policy: RetryPolicy of the request (optional); the default
+                          retry policy is used if none is provided.
+            mirror_router: MirrorRouter routing the request across mirrors (optional).
+            cached_text: Function returning the body of the cached response to the request, which
+                         makes the request conditional (optional, see Session.get).
         Returns:
             The API response to the request.
         Throws:
-            TimeoutError if server responds with Error 429 and delay has increased to 60 seconds.
+            RetryError if the request still fails after the maximum number of attempts.
+            CircuitOpenError if the circuit of the host of the url is open.
         """
-        response = GET(url, parameters)
-        delay = 10
-        while response.status_code == 429:
-            if delay > 60:
-                raise TimeoutError("Scrape aborted due to repeated status code 429.")
+        session = session if session else get_default_session()
+        retry_policy = retry_policy if retry_policy else get_default_retry_policy()
+        metrics = logger.metrics
+        request_url = mirror_router.route(url) if mirror_router else url
+        for attempt in range(retry_policy.max_attempts):
+            response = None
+            try:
+                retry_policy.check(request_url)
+            except CircuitOpenError as exception:
+                metrics.increment("http_circuit_open_total")
+                if not mirror_router:
+                    raise
+                reason = str(exception)
             else:
-                logger("Server responded with 429 (Too Many Requests); waiting " + 
-                       str(delay) + " seconds...")
+                if rate_limiter:
+                    with metrics.span("rate_limit_wait"):
+                        rate_limiter.acquire(request_url)
+                try:
+                    with metrics.span("http_request"):
+                        response = session.get(request_url, parameters, cached_text)
+                except (RequestsConnectionError, Timeout) as exception:
+                    retry_policy.record_failure(request_url)
+                    reason = type(exception).__name__
+                    metrics.increment("http_errors_total", error=reason)
+                else:
+                    metrics.increment("http_responses_total", status=response.status_code)
+                    metrics.increment("http_response_bytes_total", len(response.content))
+                    if not retry_policy.is_retryable(response):
+                        retry_policy.record_success(request_url)
+                        if rate_limiter:
+                            rate_limiter.on_success(request_url)
+                        if mirror_router:
+                            mirror_router.record_success(request_url)
+                        return response
+                    reason = str(response.status_code)
+                    if response.status_code == 429:
+                        if rate_limiter:
+                            rate_limiter.on_throttle(request_url)
+                    else:
+                        retry_policy.record_failure(request_url)
+            if mirror_router:
+                mirror_router.record_failure(request_url)
+            if attempt + 1 < retry_policy.max_attempts:
+                metrics.increment("http_retries_total")
+                failed_url = request_url
+                request_url = mirror_router.route(url) if mirror_router else url
+                if mirror_router and mirror_router.get_mirror(request_url) != mirror_router.get_mirror(failed_url):
+                    logger.log("Request to " + failed_url + " failed (" + reason + "); retrying on " +
+                               mirror_router.get_mirror(request_url) + "...")
+                    continue
+                delay = retry_policy.get_delay(attempt, response)
+                logger.log("Request to " + failed_url + " failed (" + reason + "); retrying in " +
+                           "{:.1f}".format(delay) + " seconds...")
+                metrics.observe("retry_backoff_seconds", delay)
                 sleep(delay)
-            response = GET(url, parameters)
-            delay += 10
-        return response
+        raise RetryError("Request to " + url + " failed " + str(retry_policy.max_attempts) +
+                         " times (" + reason + ").")
 
 def stats(entry_list):
     """